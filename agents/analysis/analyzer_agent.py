@@ -1,7 +1,9 @@
 # AnalyzerAgent – sentence-level sentiment only
-import json, logging, re
+import logging
 from typing import Dict, Any, List
-from agents.hf_cache import get_sentiment_pipe     # ✓ yalnızca sentiment
+from agents.hf_batching import get_batcher
+from agents.analysis.transcript import ParsedTranscript
+from agents.analysis.chunking import aggregate, approx_tokens, budget_for, split_lines
 
 logger = logging.getLogger("care_monitor")
 
@@ -9,34 +11,48 @@ class AnalyzerAgent:
     """
     Returns overall sentiment plus per-utterance sentiment scores.
     - Child ve Caregiver cümlelerinin tamamını inceler
+    - uzun cümleler parçalara bölünür, skorlar token-ağırlıklı ortalanır
     """
 
-    SPEAKER_TAGS = ("Child:", "Caregiver:", "Mother:", "Dad:", "Mum:", "Woman:")
-
     def __init__(self, batch_size: int = 8):
-        self.pipe = get_sentiment_pipe()
+        self.batcher = get_batcher("sentiment")
         self.batch = batch_size
+        self.max_tokens = budget_for("sentiment")
+
+    # ❗ Negatif cümlelere daha fazla ağırlık ver
+    @staticmethod
+    def weight(score: float) -> float:
+        if score < -0.5:
+            return 2.5  # çok negatif
+        if score < -0.2:
+            return 1.5
+        return 1.0      # normal ağırlık
 
-    def _extract_lines(self, txt: str) -> List[str]:
-        lines = []
-        for ln in txt.splitlines():
-            if any(tag in ln for tag in self.SPEAKER_TAGS):
-                clean = re.sub(r"^\s*\[\d{1,2}:\d{2}\]\s*", "", ln)
-                text  = clean.split(":", 1)[-1].strip()
-                if text:
-                    lines.append(text)
-        return lines or [txt]
+    @staticmethod
+    def labels(weighted_avg: float) -> Dict[str, str]:
+        overall = (
+            "Positive" if weighted_avg > 0.2
+            else "Negative" if weighted_avg < -0.2
+            else "Neutral"
+        )
+        tone = "Harsh" if overall == "Negative" else "Playful" if overall == "Positive" else "Calm"
+        empathy = "High" if overall == "Positive" else "Low" if overall == "Negative" else "Moderate"
+        responsiveness = "Engaged" if overall != "Negative" else "Passive"
+        return {"sentiment": overall, "tone": tone, "empathy": empathy,
+                "responsiveness": responsiveness}
 
     async def run(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Compatibility wrapper – ``messages[-1]["content"]`` is JSON."""
+        return await self.run_parsed(ParsedTranscript.from_messages(messages))
+
+    async def run_parsed(self, tr: ParsedTranscript) -> Dict[str, Any]:
         try:
-            payload = json.loads(messages[-1]["content"])
-            txt     = payload.get("transcript", "")
-            lines   = self._extract_lines(txt)[:128]          # güvenlik limiti
+            lines   = tr.speaker_lines() or [tr.raw]
+            pieces, owner = split_lines(lines, self.max_tokens)
 
-            results = self.pipe(lines, batch_size=self.batch)
+            results = await self.batcher.submit(pieces, batch_size=self.batch)
 
-            score_list = []
-            weights = []
+            piece_scores = []
             for r in results:
                 if isinstance(r, list):
                     r = {x['label']: x['score'] for x in r}
@@ -44,38 +60,31 @@ class AnalyzerAgent:
                     r = {r['label']: r['score']}
                 pos = r.get("LABEL_2", 0.0)
                 neg = r.get("LABEL_0", 0.0)
-                score = round(pos - neg, 3)
-                score_list.append(score)
+                piece_scores.append(pos - neg)
+            line_scores = aggregate(piece_scores, owner, len(lines), rule="wmean",
+                                    weights=[approx_tokens(p) for p in pieces])
 
-                # ❗ Negatif cümlelere daha fazla ağırlık ver
-                if score < -0.5:
-                    weights.append(2.5)  # çok negatif
-                elif score < -0.2:
-                    weights.append(1.5)
-                else:
-                    weights.append(1.0)  # normal ağırlık
+            score_list = []
+            weights = []
+            for s in line_scores:
+                score = round(s, 3)
+                score_list.append(score)
+                weights.append(self.weight(score))
 
             # 🎯 Ağırlıklı ortalama hesapla
             weighted_sum = sum(s * w for s, w in zip(score_list, weights))
             total_weight = sum(weights)
             weighted_avg = weighted_sum / total_weight if total_weight > 0 else 0.0
 
-            overall = (
-                "Positive" if weighted_avg > 0.2
-                else "Negative" if weighted_avg < -0.2
-                else "Neutral"
-            )
-            tone = "Harsh" if overall == "Negative" else "Playful" if overall == "Positive" else "Calm"
-            empathy = "High" if overall == "Positive" else "Low" if overall == "Negative" else "Moderate"
-            responsiveness = "Engaged" if overall != "Negative" else "Passive"
+            lbl = self.labels(weighted_avg)
 
             return {
-                "sentiment": overall,
+                "sentiment": lbl["sentiment"],
                 "sentiment_score": round(weighted_avg, 3),
                 "sentiment_scores": score_list,
-                "tone": tone,
-                "empathy": empathy,
-                "responsiveness": responsiveness
+                "tone": lbl["tone"],
+                "empathy": lbl["empathy"],
+                "responsiveness": lbl["responsiveness"]
             }
 
 
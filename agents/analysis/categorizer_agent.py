@@ -14,10 +14,30 @@ Compatible with the *new* categories.json schema:
   ...
 }
 An old list-only JSON will also load for backwards compatibility.
+A group may also carry optional example phrases for the embedding engine:
+  "Meals": { ..., "examples": { "Snack": ["want some crackers?"] } }
+
+Ranking engine (see category_engines.py): BART zero-shot (default) or the
+precomputed label-embedding classifier – ``engine=`` or
+RAGOS_CATEGORIZER_ENGINE.
+
+Mode – ``mode=`` or RAGOS_CATEGORIZER_MODE:
+  • flat          score every leaf label (default)
+  • hierarchical  stage 1 ranks the ~13 groups, stage 2 scores only the
+                  leaves of the top ``top_groups`` groups
+                  (RAGOS_CATEGORIZER_TOP_GROUPS, default 2) – cost scales
+                  with groups + chosen leaves instead of all leaves
+
+Long transcripts are cut into token-budgeted windows on line boundaries
+(chunking.py); every window is ranked and the rankings are merged –
+RAGOS_CHUNK_AGG_CATEGORIZER=wmean (token-weighted mean, default) | vote.
 """
-from typing import Dict, Any, List, Tuple
-import json, logging, pathlib
-from agents.hf_cache import get_categorizer_pipe  # facebook/bart-large-mnli
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio, json, logging, os, pathlib
+from agents.analysis.transcript import ParsedTranscript
+from agents.analysis.category_engines import make_engine
+from agents.analysis.chunking import (aggregate_rankings, budget_for,
+                                      windows, Window)
 
 logger = logging.getLogger("CategorizerAgent")
 logger.setLevel(logging.INFO)
@@ -26,23 +46,44 @@ logger.addHandler(logging.StreamHandler())
 
 class CategorizerAgent:
     # ───────────────────────────────────────────────
-    def __init__(self) -> None:
-        self.pipe = get_categorizer_pipe()
-        self.groups, self.labels, self.reverse = self._load_structure()
+    def __init__(self, engine: Optional[str] = None,
+                 mode: Optional[str] = None,
+                 top_groups: Optional[int] = None) -> None:
+        (self.groups, self.labels,
+         self.reverse, self.examples) = self._load_structure()
+
+        self.mode = (mode or os.getenv("RAGOS_CATEGORIZER_MODE", "flat")).lower()
+        if self.mode not in ("flat", "hierarchical"):
+            raise ValueError(f"Unknown categorizer mode: {self.mode!r}")
+        self.top_groups = max(1, top_groups or
+                              int(os.getenv("RAGOS_CATEGORIZER_TOP_GROUPS", "2")))
+
+        labels, examples = self.labels, self.examples
+        if self.mode == "hierarchical":
+            # a group's leaves double as its example phrases (embedding engine)
+            labels   = self.labels + list(self.groups)
+            examples = {**self.groups, **self.examples}
+        self.engine = make_engine(engine, labels, examples)
+        self.max_tokens = budget_for("categorizer")
+        self.agg_rule = os.getenv("RAGOS_CHUNK_AGG_CATEGORIZER", "wmean").lower()
 
     # ─────────────────────────────────────────────── helpers
     @staticmethod
-    def _load_structure() -> Tuple[Dict[str, List[str]], List[str], Dict[str, str]]:
+    def _load_structure() -> Tuple[Dict[str, List[str]], List[str],
+                                   Dict[str, str], Dict[str, List[str]]]:
         base = pathlib.Path(__file__).parent
         path = base / "categories.json"
         with open(path, "r", encoding="utf-8") as f:
             raw = json.load(f)
 
         groups: Dict[str, List[str]] = {}
+        examples: Dict[str, List[str]] = {}
         for parent, meta in raw.items():
             # new format: {"items":[...]}
             if isinstance(meta, dict) and "items" in meta:
                 groups[parent] = list(meta["items"])
+                for lbl, phrases in meta.get("examples", {}).items():
+                    examples[lbl] = list(phrases)
             # old format: ["Breakfast", "Lunch", ...]
             elif isinstance(meta, list):
                 groups[parent] = list(meta)
@@ -57,26 +98,44 @@ class CategorizerAgent:
 
         if not labels:
             raise ValueError("categories.json produced zero labels!")
-        return groups, labels, reverse
+        return groups, labels, reverse, examples
+
+    async def _rank_windows(self, wins: List[Window],
+                            labels: List[str]) -> List[Tuple[str, float]]:
+        rankings = await asyncio.gather(
+            *(self.engine.rank(w.text, labels) for w in wins))
+        return aggregate_rankings(rankings, [w.tokens for w in wins],
+                                  self.agg_rule)
+
+    async def _rank(self, wins: List[Window]) -> List[Tuple[str, float]]:
+        if self.mode == "flat":
+            return await self._rank_windows(wins, self.labels)
+
+        # stage 1 – groups, stage 2 – leaves of the top-k groups only
+        groups = await self._rank_windows(wins, list(self.groups))
+        leaves = [leaf for g, _ in groups[:self.top_groups]
+                  for leaf in self.groups[g]]
+        return await self._rank_windows(wins, leaves)
 
     # ─────────────────────────────────────────────── main
     async def run(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         messages[-1]["content"] == JSON string with a `transcript` field.
         """
+        return await self.run_parsed(ParsedTranscript.from_messages(messages))
+
+    async def run_parsed(self, tr: ParsedTranscript) -> Dict[str, Any]:
         try:
-            payload = json.loads(messages[-1]["content"])
-            txt = payload.get("transcript", "").strip()
+            txt = tr.raw.strip()
             if not txt:
                 return {"error": "Empty transcript"}
 
-            snippet = txt[:512]  # safety
-            out = self.pipe(snippet, candidate_labels=self.labels, multi_label=False)
+            lines  = [ln for ln in txt.splitlines() if ln.strip()]
+            ranked = await self._rank(windows(lines, self.max_tokens))
 
-            best_label = out["labels"][0] if out.get("labels") else "Uncategorised"
+            best_label = ranked[0][0] if ranked else "Uncategorised"
             group = self.reverse.get(best_label, "General")
 
-            ranked = list(zip(out.get("labels", []), out.get("scores", [])))
             secondary = [l for l, _ in ranked[1:3] if l != best_label]
 
             return {
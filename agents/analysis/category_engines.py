@@ -0,0 +1,92 @@
+# agents/analysis/category_engines.py
+"""
+Ranking engines behind CategorizerAgent.
+
+Both expose ``await engine.rank(text, labels) -> [(label, score), ...]``
+sorted best-first, so the agent does not care which one is configured.
+
+• ZeroShotEngine  – facebook/bart-large-mnli; one NLI pass per label
+• EmbeddingEngine – MiniLM sentence embeddings; labels (+ optional example
+                    phrases) are embedded ONCE at start-up, each request
+                    costs one embedding + a NumPy dot product
+
+Select with ``RAGOS_CATEGORIZER_ENGINE=zeroshot|embedding`` (default zeroshot).
+"""
+from __future__ import annotations
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from agents.hf_cache import get_embedder
+from agents.hf_batching import get_batcher
+from agents.executors import run_in
+
+Ranking = List[Tuple[str, float]]
+
+
+class ZeroShotEngine:
+    name = "zeroshot"
+
+    def __init__(self) -> None:
+        self.batcher = get_batcher("categorizer")
+
+    async def rank(self, text: str, labels: List[str]) -> Ranking:
+        out, = await self.batcher.submit([text], candidate_labels=labels,
+                                         multi_label=False)
+        return list(zip(out.get("labels", []), out.get("scores", [])))
+
+
+class EmbeddingEngine:
+    name = "embedding"
+
+    def __init__(self, labels: Iterable[str],
+                 examples: Optional[Dict[str, List[str]]] = None) -> None:
+        self.embed    = get_embedder()
+        self.examples = examples or {}
+        self._index: Dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._add(list(dict.fromkeys(labels)))
+
+    # ─────────────────────────────────────────────── label matrix
+    def _add(self, labels: List[str]) -> None:
+        """Embed label name + example phrases, average, re-normalise."""
+        labels = [l for l in labels if l not in self._index]
+        if not labels:
+            return
+        texts, owner = [], []
+        for i, lbl in enumerate(labels):
+            for t in [lbl, *self.examples.get(lbl, [])]:
+                texts.append(t)
+                owner.append(i)
+        vecs  = self.embed(texts)
+        owner = np.asarray(owner)
+        rows  = np.stack([vecs[owner == i].mean(axis=0) for i in range(len(labels))])
+        rows /= np.linalg.norm(rows, axis=1, keepdims=True).clip(min=1e-9)
+
+        base = len(self._index)
+        self._matrix = (np.vstack([self._matrix, rows]) if self._matrix.size
+                        else rows.astype(np.float32))
+        for i, lbl in enumerate(labels):
+            self._index[lbl] = base + i
+
+    # ─────────────────────────────────────────────── API
+    async def rank(self, text: str, labels: List[str]) -> Ranking:
+        self._add(labels)                         # no-op for known labels
+        vec  = (await run_in("categorizer", self.embed, [text]))[0]
+        rows = np.fromiter((self._index[l] for l in labels), dtype=np.int64,
+                           count=len(labels))
+        sims = self._matrix[rows] @ vec
+        order = np.argsort(-sims)
+        return [(labels[i], float(sims[i])) for i in order]
+
+
+def make_engine(name: Optional[str], labels: Iterable[str],
+                examples: Optional[Dict[str, List[str]]] = None):
+    name = (name or os.getenv("RAGOS_CATEGORIZER_ENGINE", "zeroshot")).lower()
+    if name == "embedding":
+        return EmbeddingEngine(labels, examples)
+    if name == "zeroshot":
+        return ZeroShotEngine()
+    raise ValueError(f"Unknown categorizer engine: {name!r}")
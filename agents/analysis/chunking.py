@@ -0,0 +1,242 @@
+# agents/analysis/chunking.py
+"""
+Token-budgeted chunking on utterance boundaries – replaces the hard
+``[:2048]`` / ``[:512]`` / ``[:128]`` cuts, so long daycare sessions are
+scored end to end.
+
+• ``split_lines``   – per-line agents: any utterance longer than the model
+                      budget is split into pieces on sentence / word
+                      boundaries; ``owner[i]`` maps a piece back to its line
+• ``windows``       – whole-transcript agents: consecutive utterances are
+                      packed into windows of at most ``max_tokens``
+• ``aggregate``     – folds piece scores back to one value per line
+                      (``max`` | ``mean`` | ``wmean``)
+• ``aggregate_rankings`` – folds per-window label rankings into one
+                      (``wmean`` of scores | token-weighted ``vote``)
+• ``salient_excerpt`` – LLM prompts: the highest-risk utterances (plus the
+                      opening line) in original order, within a char budget
+
+Token counts are estimated from characters (no tokenizer load); the
+default budgets leave head-room below each model's hard limit.
+Everything is O(n) in the transcript length.
+
+Budgets (env): RAGOS_CHUNK_TOKENS_<NAME>  e.g. RAGOS_CHUNK_TOKENS_CATEGORIZER=600
+"""
+from __future__ import annotations
+
+import math, os, re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from agents.analysis.transcript import ParsedTranscript
+
+# ~3.5 chars / BPE token for English chat text; rounded up to stay safe
+CHARS_PER_TOKEN = 3.5
+
+# model → window budget in tokens (hard limit: 512 RoBERTa/BERT, 1024 BART)
+TOKEN_BUDGETS: Dict[str, int] = {
+    "sentiment":   400,
+    "toxicity":    400,
+    "sarcasm":     400,
+    "categorizer": 400,      # BART sees premise + hypothesis, keep it short
+}
+
+_SENT_RE = re.compile(r"(?<=[.!?…])\s+")
+
+
+def budget_for(name: str) -> int:
+    raw = os.getenv(f"RAGOS_CHUNK_TOKENS_{name.upper()}")
+    return max(8, int(raw)) if raw else TOKEN_BUDGETS.get(name, 400)
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+# ─────────────────────────────────────────────── splitting
+def _split_long(text: str, max_tokens: int) -> List[str]:
+    """Sentence boundaries first, then words, then a hard char cut."""
+    max_chars = int(max_tokens * CHARS_PER_TOKEN)
+    pieces: List[str] = []
+    cur = ""
+    for unit in _SENT_RE.split(text):
+        if len(unit) > max_chars:                   # run-on sentence → words
+            for w in unit.split():
+                while len(w) > max_chars:           # pathological token
+                    pieces.append(w[:max_chars])
+                    w = w[max_chars:]
+                if cur and len(cur) + 1 + len(w) > max_chars:
+                    pieces.append(cur)
+                    cur = ""
+                cur = f"{cur} {w}" if cur else w
+            continue
+        if cur and len(cur) + 1 + len(unit) > max_chars:
+            pieces.append(cur)
+            cur = ""
+        cur = f"{cur} {unit}" if cur else unit
+    if cur:
+        pieces.append(cur)
+    return pieces or [text]
+
+
+def split_lines(lines: Sequence[str], max_tokens: int) -> Tuple[List[str], List[int]]:
+    """Flatten lines into model-sized pieces; ``owner[i]`` = source line."""
+    pieces: List[str] = []
+    owner: List[int] = []
+    for i, ln in enumerate(lines):
+        parts = [ln] if approx_tokens(ln) <= max_tokens else _split_long(ln, max_tokens)
+        pieces.extend(parts)
+        owner.extend([i] * len(parts))
+    return pieces, owner
+
+
+class Window:
+    """A run of consecutive utterances that fits one model call."""
+
+    __slots__ = ("text", "start", "end", "tokens")
+
+    def __init__(self, text: str, start: int, end: int, tokens: int) -> None:
+        self.text   = text
+        self.start  = start     # first line index (inclusive)
+        self.end    = end       # last line index (exclusive)
+        self.tokens = tokens
+
+    def __repr__(self) -> str:
+        return f"Window({self.start}:{self.end}, {self.tokens} tok)"
+
+
+def windows(lines: Sequence[str], max_tokens: int) -> List[Window]:
+    """Greedy packing; an over-long single line becomes its own windows."""
+    out: List[Window] = []
+    buf: List[str] = []
+    start, used = 0, 0
+    for i, ln in enumerate(lines):
+        n = approx_tokens(ln) + 1                       # +1 for the newline
+        if buf and used + n > max_tokens:
+            out.append(Window("\n".join(buf), start, i, used))
+            buf, used = [], 0
+        if not buf:
+            start = i
+        if n > max_tokens:
+            for piece in _split_long(ln, max_tokens):
+                out.append(Window(piece, i, i + 1, approx_tokens(piece)))
+            start = i + 1
+            continue
+        buf.append(ln)
+        used += n
+    if buf:
+        out.append(Window("\n".join(buf), start, len(lines), used))
+    return out
+
+
+# ─────────────────────────────────────────────── aggregation
+def aggregate(values: Sequence[float], owner: Sequence[int], n: int,
+              rule: str = "max",
+              weights: Optional[Sequence[float]] = None) -> List[float]:
+    """Fold piece-level scores back to ``n`` line-level scores."""
+    if rule not in ("max", "mean", "wmean"):
+        raise ValueError(f"Unknown aggregation rule: {rule!r}")
+    if weights is None or rule == "mean":
+        weights = [1.0] * len(values)
+    acc = [0.0] * n
+    wsum = [0.0] * n
+    seen = [False] * n
+    for v, o, w in zip(values, owner, weights):
+        if rule == "max":
+            acc[o] = v if not seen[o] else max(acc[o], v)
+        else:
+            acc[o] += v * w
+            wsum[o] += w
+        seen[o] = True
+    if rule != "max":
+        acc = [a / ws if ws else 0.0 for a, ws in zip(acc, wsum)]
+    return acc
+
+
+def aggregate_rankings(rankings: Sequence[Sequence[Tuple[str, float]]],
+                       weights: Sequence[float],
+                       rule: str = "wmean") -> List[Tuple[str, float]]:
+    """
+    Merge per-window ``[(label, score), ...]`` into one best-first ranking.
+
+    wmean – token-weighted mean score per label (labels missing from a
+            window count as 0 there)
+    vote  – each window's top label gets the window's weight; ties and the
+            tail are ordered by the wmean score
+    """
+    if len(rankings) == 1:
+        return list(rankings[0])
+    total = sum(weights) or 1.0
+    mean: Dict[str, float] = {}
+    for ranking, w in zip(rankings, weights):
+        for lbl, sc in ranking:
+            mean[lbl] = mean.get(lbl, 0.0) + sc * w / total
+    if rule == "wmean":
+        return sorted(mean.items(), key=lambda kv: -kv[1])
+    if rule != "vote":
+        raise ValueError(f"Unknown ranking aggregation rule: {rule!r}")
+    votes: Dict[str, float] = {}
+    for ranking, w in zip(rankings, weights):
+        if ranking:
+            votes[ranking[0][0]] = votes.get(ranking[0][0], 0.0) + w
+    order = sorted(mean, key=lambda l: (-votes.get(l, 0.0), -mean[l]))
+    return [(l, votes.get(l, 0.0) / total) for l in order]
+
+
+# ─────────────────────────────────────────────── LLM excerpts
+def _line_at(raw: str, offset: int) -> str:
+    end = raw.find("\n", offset)
+    return raw[offset:end if end >= 0 else len(raw)].strip()
+
+
+def salient_excerpt(transcript: str, max_chars: int,
+                    ctx: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Transcript text for an LLM prompt, at most ``max_chars`` long.
+
+    Short transcripts pass through untouched.  Longer ones keep the opening
+    line and then the most concerning utterances (toxicity, sarcasm,
+    negative sentiment from ``ctx``) in their original order; skipped
+    stretches are marked with "[…]".
+    """
+    if len(transcript) <= max_chars:
+        return transcript
+    ctx = ctx or {}
+    tr = ParsedTranscript.parse(transcript)
+    utts = tr.utterances
+    if not utts:
+        return transcript[:max_chars]
+
+    # per-utterance salience, aligned like the agents align their scores
+    sal = [0.0] * len(utts)
+    spoken = [i for i, u in enumerate(utts) if u.text]
+    care   = [i for i in tr.caregiver_idx if utts[i].text]
+    for key, idx, sign in (("sentiment_scores", spoken, -1.0),
+                           ("toxicity_scores",  care,   1.0),
+                           ("sarcasm_scores",   care,   1.0)):
+        scores = ctx.get(key) or []
+        if len(scores) != len(idx):
+            continue
+        for i, s in zip(idx, scores):
+            try:
+                sal[i] = max(sal[i], float(s) * sign)
+            except (TypeError, ValueError):
+                pass
+
+    lines = [_line_at(transcript, u.offset) for u in utts]
+    picked, used = {0}, len(lines[0]) + 1
+    for i in sorted(range(len(utts)), key=lambda i: (-sal[i], i)):
+        cost = len(lines[i]) + 5                    # newline + gap marker
+        if i in picked or used + cost > max_chars:
+            continue
+        picked.add(i)
+        used += cost
+
+    out, prev = [], -1
+    for i in sorted(picked):
+        if i != prev + 1:
+            out.append("[…]")
+        out.append(lines[i])
+        prev = i
+    if prev != len(utts) - 1:
+        out.append("[…]")
+    return "\n".join(out)[:max_chars]
@@ -1,6 +1,10 @@
-import json, re, logging
+import logging
 from typing import Dict, Any, List
+import numpy as np
 from agents.hf_cache import get_sarcasm_pipe
+from agents.hf_batching import get_batcher
+from agents.analysis.transcript import ParsedTranscript
+from agents.analysis.chunking import CHARS_PER_TOKEN, aggregate, split_lines
 
 logger = logging.getLogger("care_monitor")
 
@@ -17,13 +21,16 @@ class SarcasmDetectionAgent:
     }
     """
 
-    CAREGIVER_TAGS = ("Caregiver:", "Woman:", "Mother:", "Dad:", "Mum:")
+    SHORT_CAP = 0.30      # max irony prob for ultra-short lines
 
-    def __init__(self, max_chars: int = 256):
+    def __init__(self, max_chars: int = 256, batch_size: int = 8):
         self.pipe = get_sarcasm_pipe()
+        self.batcher = get_batcher("sarcasm")
         self.max_chars = max_chars
+        self.batch = batch_size
 
-        id2label = getattr(self.pipe.model.config, "id2label",
+        config   = getattr(getattr(self.pipe, "model", None), "config", None)
+        id2label = getattr(config, "id2label",
                            {0: "non_irony", 1: "irony"})
         self.LBL_IRONY = next(
             (v for v in id2label.values() if v.lower() == "irony"), "irony"
@@ -42,47 +49,42 @@ class SarcasmDetectionAgent:
             out.append(tok)
         return " ".join(out)
 
+    def _irony_prob(self, preds) -> float:
+        if isinstance(preds, dict):
+            preds = [preds]
+        return {p["label"]: p["score"] for p in preds}.get(self.LBL_IRONY, 0.0)
+
     # --------------------------------------------------------
     async def run(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
-        try:
-            raw_ctx = json.loads(messages[-1]["content"])
-            transcript = raw_ctx.get("transcript", "")
-
-            # 1) caregiver satırlarını çek
-            care_lines: List[str] = []
-            for line in filter(None, transcript.splitlines()):
-                if any(tag in line for tag in self.CAREGIVER_TAGS):
-                    txt = re.sub(r"^\s*\[\d{1,2}:\d{2}\]\s*", "", line)
-                    txt = txt.split(":", 1)[-1].strip()
-                    if txt:
-                        care_lines.append(txt)
-
-            if not care_lines:
-                care_lines = [transcript]  # fallback
-
-            sarcasm_scores, max_irony = [], 0.0
+        """Compatibility wrapper – ``messages[-1]["content"]`` is JSON."""
+        return await self.run_parsed(ParsedTranscript.from_messages(messages))
 
-            for line in care_lines:
-                clean = self._preprocess(line)[-self.max_chars:]
-
-                preds = self.pipe(clean, top_k=None)
-                if isinstance(preds, dict):
-                    preds = [preds]
-
-                prob_irony = {p["label"]: p["score"] for p in preds}.get(
-                    self.LBL_IRONY, 0.0
-                )
-
-                # Heuristic down-weight for ultra-short neutral lines
-                if len(line) < 25 or len(line.split()) < 4:
-                    prob_irony = min(prob_irony, 0.30)
-
-                sarcasm_scores.append(round(prob_irony, 3))
-                max_irony = max(max_irony, prob_irony)
+    async def run_parsed(self, tr: ParsedTranscript) -> Dict[str, Any]:
+        try:
+            # 1) caregiver satırları (parse edilmiş görünümden)
+            care_lines: List[str] = tr.caregiver_lines() or [tr.raw]  # fallback
+
+            # 2) tek batch halinde model çağrısı – uzun satırlar tweet
+            #    boyutunda (max_chars) parçalara bölünür, satır skoru = max
+            clean = [self._preprocess(l) for l in care_lines]
+            pieces, owner = split_lines(
+                clean, max(1, int(self.max_chars / CHARS_PER_TOKEN)))
+            preds = await self.batcher.submit(pieces, top_k=None,
+                                              batch_size=self.batch)
+
+            n     = len(care_lines)
+            probs = np.asarray(aggregate([self._irony_prob(p) for p in preds],
+                                         owner, n, rule="max"),
+                               dtype=np.float64)
+
+            # 3) heuristic down-weight for ultra-short neutral lines
+            short = np.fromiter((len(l) < 25 or len(l.split()) < 4
+                                 for l in care_lines), dtype=bool, count=n)
+            probs = np.where(short, np.minimum(probs, self.SHORT_CAP), probs)
 
             return {
-                "sarcasm": round(max_irony, 3),
-                "sarcasm_scores": sarcasm_scores,
+                "sarcasm": round(float(probs.max()), 3),
+                "sarcasm_scores": [round(float(p), 3) for p in probs],
             }
 
         except Exception as exc:
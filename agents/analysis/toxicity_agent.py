@@ -1,35 +1,36 @@
 # agents/analysis/toxicity_agent.py
 from typing import Dict, Any, List
-import json, re
-from agents.hf_cache import get_toxicity_pipe
+from agents.hf_batching import get_batcher
+from agents.analysis.transcript import ParsedTranscript
+from agents.analysis.chunking import aggregate, budget_for, split_lines
 
 class ToxicityAgent:
     """
     Returns toxicity score for EACH caregiver utterance.
+    Over-long utterances are split into model-sized pieces; a line is as
+    toxic as its worst piece (max).
     """
-    CAREGIVER_TAGS = ("Caregiver:", "Mother:", "Woman:", "Dad:", "Mum:")
 
     def __init__(self):
-        self.pipe = get_toxicity_pipe()
+        self.batcher = get_batcher("toxicity")
+        self.max_tokens = budget_for("toxicity")
 
-    def _caregiver_lines(self, text: str) -> List[str]:
-        lines = []
-        for ln in text.splitlines():
-            if any(tag in ln for tag in self.CAREGIVER_TAGS):
-                # “[00:04] Caregiver:” → “Oh, perfect…”
-                ln = re.sub(r"^\s*\[\d{1,2}:\d{2}\]\s*", "", ln)
-                ln = ln.split(":", 1)[-1].strip()
-                lines.append(ln)
-        return lines or [text]           # fallback
+    def _caregiver_lines(self, tr: ParsedTranscript) -> List[str]:
+        # “[00:04] Caregiver:” → “Oh, perfect…”  (whole transcript, no cap)
+        utts  = tr.utterances
+        lines = [utts[i].text for i in tr.caregiver_idx]
+        return lines or [tr.raw]                            # fallback
 
     async def run(self, msgs) -> Dict[str, Any]:
-        data = json.loads(msgs[-1]["content"])
-        txt  = data.get("transcript", "")[:2048]
-        sarcasm = float(data.get("sarcasm", 0.0))
+        """Compatibility wrapper – ``msgs[-1]["content"]`` is JSON."""
+        return await self.run_parsed(ParsedTranscript.from_messages(msgs))
 
-        care_lines = self._caregiver_lines(txt)
-        preds = self.pipe(care_lines, top_k=None)
-        scores = [max(p, key=lambda x: x["score"])["score"] for p in preds]
+    async def run_parsed(self, tr: ParsedTranscript) -> Dict[str, Any]:
+        care_lines = self._caregiver_lines(tr)
+        pieces, owner = split_lines(care_lines, self.max_tokens)
+        preds = await self.batcher.submit(pieces, top_k=None)
+        scores = aggregate([max(p, key=lambda x: x["score"])["score"] for p in preds],
+                           owner, len(care_lines), rule="max")
 
         tox_max, tox_mean = max(scores), sum(scores)/len(scores)
 
@@ -0,0 +1,109 @@
+# agents/analysis/transcript.py
+"""
+Shared transcript parse layer.
+
+The orchestrator parses the raw transcript ONCE per request and hands the
+same ``ParsedTranscript`` to every fast agent – no JSON round-trip, no
+repeated ``splitlines`` + timestamp regex.
+
+    tr = ParsedTranscript.parse("[00:01] Child: hi\\n[00:02] Caregiver: hello")
+    tr.caregiver_lines()   -> ["hello"]
+    tr.speaker_lines()     -> ["hi", "hello"]
+"""
+from __future__ import annotations
+
+import json, re
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# "[00:04]", "(15:01)", "[1:02:33]" …
+_TS_RE = re.compile(r"^\s*[\[(](\d{1,2}:\d{2}(?::\d{2})?)[\])]\s*")
+
+CAREGIVER_TAGS: Tuple[str, ...] = ("Caregiver:", "Mother:", "Woman:", "Dad:", "Mum:")
+CHILD_TAGS: Tuple[str, ...]     = ("Child:",)
+SPEAKER_TAGS: Tuple[str, ...]   = CHILD_TAGS + CAREGIVER_TAGS
+# speaker prefix at the START of the (timestamp-stripped) line only –
+# "Caregiver: Child: stop that!" is a caregiver line
+_SPEAKER_RE = re.compile(r"^\s*(" + "|".join(re.escape(t[:-1]) for t in SPEAKER_TAGS)
+                         + r")\s*:")
+
+
+class Utterance:
+    """One speaker-tagged transcript line."""
+
+    __slots__ = ("speaker", "timestamp", "text", "offset")
+
+    def __init__(self, speaker: str, timestamp: Optional[str],
+                 text: str, offset: int) -> None:
+        self.speaker   = speaker      # "Caregiver", "Child", "Mum" …
+        self.timestamp = timestamp    # "00:04" or None
+        self.text      = text         # utterance body, stripped
+        self.offset    = offset       # char offset of the line in the raw text
+
+    def __repr__(self) -> str:
+        return f"Utterance({self.speaker!r}, {self.timestamp!r}, {self.text!r})"
+
+
+class ParsedTranscript:
+    """
+    Immutable, parse-once view of a transcript.
+
+    • ``utterances``     – speaker-tagged lines in order
+    • ``caregiver_idx``  – indices into ``utterances`` (array-backed)
+    • ``child_idx``      – indices into ``utterances`` (array-backed)
+    """
+
+    __slots__ = ("raw", "utterances", "caregiver_idx", "child_idx")
+
+    def __init__(self, raw: str, utterances: List[Utterance]) -> None:
+        self.raw        = raw
+        self.utterances = utterances
+        self.caregiver_idx = array("I")
+        self.child_idx     = array("I")
+        for i, u in enumerate(utterances):
+            tag = u.speaker + ":"
+            if tag in CAREGIVER_TAGS:
+                self.caregiver_idx.append(i)
+            elif tag in CHILD_TAGS:
+                self.child_idx.append(i)
+
+    # ─────────────────────────────────────────────── builders
+    @classmethod
+    def parse(cls, text: str) -> "ParsedTranscript":
+        utts: List[Utterance] = []
+        offset = 0
+        for ln in text.splitlines(keepends=True):
+            start, offset = offset, offset + len(ln)
+            m  = _TS_RE.match(ln)
+            ts = m.group(1) if m else None
+            body = ln[m.end():] if m else ln
+            sp = _SPEAKER_RE.match(body)
+            if sp is None:
+                continue
+            utts.append(Utterance(sp.group(1), ts, body[sp.end():].strip(), start))
+        return cls(text, utts)
+
+    @classmethod
+    def from_messages(cls, messages: List[Dict[str, Any]]) -> "ParsedTranscript":
+        """Compatibility path for the ``[{"content": json.dumps(...)}]`` API."""
+        payload = json.loads(messages[-1]["content"])
+        return cls.parse(payload.get("transcript", ""))
+
+    # ─────────────────────────────────────────────── views
+    def __len__(self) -> int:
+        return len(self.utterances)
+
+    def _texts(self, idx: Iterable[int], skip_empty: bool) -> List[str]:
+        utts = self.utterances
+        return [utts[i].text for i in idx
+                if not skip_empty or utts[i].text]
+
+    def caregiver_lines(self, skip_empty: bool = True) -> List[str]:
+        return self._texts(self.caregiver_idx, skip_empty)
+
+    def child_lines(self, skip_empty: bool = True) -> List[str]:
+        return self._texts(self.child_idx, skip_empty)
+
+    def speaker_lines(self, skip_empty: bool = True) -> List[str]:
+        return self._texts(range(len(self.utterances)), skip_empty)
+
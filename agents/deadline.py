@@ -0,0 +1,103 @@
+# agents/deadline.py
+"""
+Request-level deadline, propagated to every agent through a contextvar.
+
+``Orchestrator.process_transcript`` opens a ``Deadline`` for the whole
+request; tasks spawned inside it (``asyncio.gather``) inherit it.  The
+Ollama client caps each HTTP call at the time that is left and skips
+retries that could not finish, and the orchestrator runs every LLM stage
+through ``Deadline.run`` – a stage that would overrun is cancelled and
+replaced by its fallback.  Each stage's timing ends up in
+``ctx["stage_timings"]``.
+
+    dl = Deadline(30_000)
+    with dl.active():
+        out = await dl.run("star", agent.run(ctx), fallback=lambda: {...})
+
+Budget (env): RAGOS_DEADLINE_MS   default 60000, 0 = no deadline
+"""
+from __future__ import annotations
+
+import asyncio, contextvars, logging, os, time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger("care_monitor")
+
+_CURRENT: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar(
+    "ragos_deadline", default=None)
+
+
+def current() -> Optional["Deadline"]:
+    return _CURRENT.get()
+
+
+def remaining_s() -> Optional[float]:
+    """Seconds left on the active deadline (``None`` = unbounded)."""
+    dl = _CURRENT.get()
+    return dl.remaining() if dl is not None else None
+
+
+def default_budget_ms() -> Optional[float]:
+    raw = float(os.getenv("RAGOS_DEADLINE_MS", "60000"))
+    return raw if raw > 0 else None
+
+
+class Deadline:
+    def __init__(self, budget_ms: Optional[float] = None) -> None:
+        self.t0       = time.perf_counter()
+        self.budget_s = budget_ms / 1000.0 if budget_ms else None
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self.degraded: list = []
+
+    @classmethod
+    def from_env(cls, budget_ms: Optional[float] = None) -> "Deadline":
+        return cls(budget_ms if budget_ms is not None else default_budget_ms())
+
+    def remaining(self) -> Optional[float]:
+        if self.budget_s is None:
+            return None
+        return max(0.0, self.budget_s - (time.perf_counter() - self.t0))
+
+    @property
+    def expired(self) -> bool:
+        left = self.remaining()
+        return left is not None and left <= 0.0
+
+    @contextmanager
+    def active(self) -> Iterator["Deadline"]:
+        token = _CURRENT.set(self)
+        try:
+            yield self
+        finally:
+            _CURRENT.reset(token)
+
+    # ─────────────────────────────────────────────── stages
+    def record(self, stage: str, t_start: float, status: str = "ok") -> None:
+        self.timings[stage] = {
+            "ms": round((time.perf_counter() - t_start) * 1000.0, 1),
+            "status": status,
+        }
+
+    async def run(self, stage: str, aw: Awaitable[Any],
+                  fallback: Callable[[], Any]) -> Any:
+        """Await ``aw`` within the time left; on overrun → ``fallback()``."""
+        t_start = time.perf_counter()
+        left = self.remaining()
+        if left is not None and left <= 0.0:
+            if asyncio.iscoroutine(aw):
+                aw.close()                       # never started
+            self.record(stage, t_start, "skipped")
+            self.degraded.append(stage)
+            logger.warning("[Deadline] %s skipped – budget exhausted", stage)
+            return fallback()
+        try:
+            out = await asyncio.wait_for(aw, timeout=left)
+        except asyncio.TimeoutError:
+            self.record(stage, t_start, "timeout")
+            self.degraded.append(stage)
+            logger.warning("[Deadline] %s cancelled after %.0f ms",
+                           stage, (time.perf_counter() - t_start) * 1000.0)
+            return fallback()
+        self.record(stage, t_start)
+        return out
@@ -0,0 +1,52 @@
+# agents/executors.py
+"""
+Dedicated thread pools per model family.
+
+transformers / torch and ``requests`` are blocking; running them directly in
+an ``async def`` serialises the "parallel" agents and stalls the FastAPI
+event loop.  Every blocking call goes through one of these pools instead:
+
+    from agents.executors import run_in
+    preds = await run_in("toxicity", self.pipe, lines, top_k=None)
+
+Threads (not processes) are used on purpose: torch releases the GIL inside
+its kernels, and the pipelines are far too large to copy into subprocesses.
+
+Worker counts (env):
+    RAGOS_WORKERS_<FAMILY>   e.g. RAGOS_WORKERS_LLM=4, RAGOS_WORKERS_TOXICITY=2
+"""
+from __future__ import annotations
+
+import asyncio, os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict
+
+# family → default worker count
+FAMILY_WORKERS: Dict[str, int] = {
+    "sentiment":   1,
+    "toxicity":    1,
+    "sarcasm":     1,
+    "categorizer": 1,
+    "translate":   1,
+    "llm":         4,     # network bound – a few concurrent calls is fine
+    "io":          4,     # Firestore / FCM side-effects (backend/work_queue.py)
+}
+
+
+def workers_for(family: str) -> int:
+    raw = os.getenv(f"RAGOS_WORKERS_{family.upper()}")
+    return max(1, int(raw)) if raw else FAMILY_WORKERS.get(family, 1)
+
+
+@lru_cache(maxsize=None)
+def get_executor(family: str) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=workers_for(family),
+                              thread_name_prefix=f"ragos-{family}")
+
+
+async def run_in(family: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable on the family pool without blocking the loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(family),
+                                      partial(fn, *args, **kwargs))
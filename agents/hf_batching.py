@@ -0,0 +1,219 @@
+# agents/hf_batching.py
+"""
+Cross-request dynamic micro-batching in front of the hf_cache pipelines.
+
+Concurrent ``/analyze`` requests each submit their utterances; a worker
+thread per pipeline collects submissions for up to ``max_wait_ms`` or
+``max_items`` utterances, runs ONE padded batch and scatters the results
+back to the waiting callers (coroutines or threads).  Batches execute on the
+pipeline's family pool from ``agents.executors``; while every worker is busy
+the collector keeps gathering, so batches grow under load.  Each batcher
+fronts a per-model ``UtteranceCache``: only cache misses (deduplicated) are
+queued, and hits are merged back in order.
+
+Usage:
+    from agents.hf_batching import get_batcher
+    scores = await get_batcher("toxicity").submit(lines, top_k=None)
+
+Tuning (env, per-pipeline override wins):
+    RAGOS_BATCH_WINDOW_MS / RAGOS_BATCH_WINDOW_MS_<NAME>   default 5
+    RAGOS_BATCH_MAX_ITEMS / RAGOS_BATCH_MAX_ITEMS_<NAME>   default 64
+"""
+from __future__ import annotations
+
+import asyncio, json, logging, os, queue, threading, time
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents import hf_cache
+from agents.executors import get_executor, workers_for
+from agents.utterance_cache import UtteranceCache, normalize_utterance
+
+logger = logging.getLogger("care_monitor")
+
+# name → lazy pipeline getter
+PIPELINES: Dict[str, Callable[[], Any]] = {
+    "sentiment":   hf_cache.get_sentiment_pipe,
+    "toxicity":    hf_cache.get_toxicity_pipe,
+    "sarcasm":     hf_cache.get_sarcasm_pipe,
+    "categorizer": hf_cache.get_categorizer_pipe,
+}
+
+_DEFAULT_PIPE_BATCH = 16      # padding batch inside the HF pipeline
+
+
+def _env_num(key: str, name: str, default: float) -> float:
+    raw = os.getenv(f"{key}_{name.upper()}", os.getenv(key))
+    return float(raw) if raw else default
+
+
+def _kw_key(kwargs: Dict[str, Any]) -> str:
+    return json.dumps(kwargs, sort_keys=True, default=str)
+
+
+class _Job:
+    __slots__ = ("texts", "kwargs", "key", "future")
+
+    def __init__(self, texts: List[str], kwargs: Dict[str, Any]) -> None:
+        self.texts  = texts
+        self.kwargs = kwargs
+        self.key    = _kw_key(kwargs)
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """Collects utterances from many callers and runs them as one batch."""
+
+    def __init__(self, name: str, pipe_getter: Callable[[], Any],
+                 max_wait_ms: float = 5.0, max_items: int = 64,
+                 cache: Optional[UtteranceCache] = None) -> None:
+        self.name        = name
+        self.pipe_getter = pipe_getter
+        self.cache       = cache
+        self.max_wait    = max_wait_ms / 1000.0
+        self.max_items   = max(1, int(max_items))
+        self._q: "queue.Queue[_Job]" = queue.Queue()
+        self._lock   = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._slots  = threading.BoundedSemaphore(workers_for(name))
+        # simple counters – handy for /metrics style logging
+        self.batches   = 0
+        self.items     = 0
+
+    # ─────────────────────────────────────────────── public API
+    def submit_future(self, texts: List[str], **kwargs) -> Future:
+        texts = list(texts)
+        if self.cache is None or not texts:
+            return self._enqueue(texts, kwargs)
+
+        prefix = _kw_key(kwargs) + "\x00"
+        keys   = [prefix + normalize_utterance(t) for t in texts]
+        found  = self.cache.get_many(keys)
+
+        miss_at: Dict[str, int] = {}                 # key → slot in the batch
+        for k, v in zip(keys, found):
+            if v is None and k not in miss_at:
+                miss_at[k] = len(miss_at)
+        outer: Future = Future()
+        if not miss_at:
+            outer.set_result(found)
+            return outer
+
+        def _merge(inner: Future) -> None:
+            if inner.cancelled():                    # outer cancelled before the batch ran
+                return
+            exc = inner.exception()
+            if exc is None:
+                fresh = inner.result()
+                self.cache.put_many(list(miss_at), fresh)   # cache even if nobody waits
+            # claim outer: False → caller already cancelled (deadline / disconnect)
+            if not outer.set_running_or_notify_cancel():
+                return
+            if exc is not None:
+                outer.set_exception(exc)
+            else:
+                outer.set_result([v if v is not None else fresh[miss_at[k]]
+                                  for k, v in zip(keys, found)])
+
+        misses = [k[len(prefix):] for k in miss_at]
+        inner = self._enqueue(misses, kwargs)
+        outer.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+        inner.add_done_callback(_merge)
+        return outer
+
+    def _enqueue(self, texts: List[str], kwargs: Dict[str, Any]) -> Future:
+        job = _Job(texts, kwargs)
+        if not job.texts:
+            job.future.set_result([])
+            return job.future
+        self._ensure_worker()
+        self._q.put(job)
+        return job.future
+
+    def submit_sync(self, texts: List[str], **kwargs) -> List[Any]:
+        return self.submit_future(texts, **kwargs).result()
+
+    async def submit(self, texts: List[str], **kwargs) -> List[Any]:
+        return await asyncio.wrap_future(self.submit_future(texts, **kwargs))
+
+    # ─────────────────────────────────────────────── worker
+    def _ensure_worker(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name=f"batcher-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[_Job]:
+        jobs  = [self._q.get()]
+        count = len(jobs[0].texts)
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_items:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            try:
+                job = self._q.get(timeout=left)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            count += len(job.texts)
+        return jobs
+
+    def _loop(self) -> None:
+        while True:
+            jobs = self._collect()
+            groups: Dict[str, List[_Job]] = {}
+            for job in jobs:
+                groups.setdefault(job.key, []).append(job)
+            for group in groups.values():
+                self._slots.acquire()             # wait for a free worker
+                fut = get_executor(self.name).submit(self._run_group, group)
+                fut.add_done_callback(lambda _: self._slots.release())
+
+    def _run_group(self, group: List[_Job]) -> None:
+        # claim every job: cancelled ones drop out, claimed ones can no longer
+        # be cancelled from the loop thread → set_result below cannot race
+        group = [job for job in group if job.future.set_running_or_notify_cancel()]
+        if not group:
+            return
+        texts: List[str] = []
+        spans: List[Tuple[int, int]] = []
+        for job in group:
+            spans.append((len(texts), len(texts) + len(job.texts)))
+            texts.extend(job.texts)
+
+        kwargs = dict(group[0].kwargs)
+        kwargs.setdefault("batch_size", _DEFAULT_PIPE_BATCH)
+        try:
+            results = list(self.pipe_getter()(texts, **kwargs))
+            if len(results) != len(texts):
+                raise RuntimeError(
+                    f"{self.name}: pipeline returned {len(results)} results "
+                    f"for {len(texts)} inputs")
+        except Exception as exc:
+            logger.exception("[MicroBatcher:%s] batch failed", self.name)
+            for job in group:
+                job.future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.items   += len(texts)
+        for job, (a, b) in zip(group, spans):
+            job.future.set_result(results[a:b])
+
+
+# ─────────────────────────────────────────────── registry
+@lru_cache(maxsize=None)
+def get_batcher(name: str) -> MicroBatcher:
+    cache_items = int(_env_num("RAGOS_UTTERANCE_CACHE_ITEMS", name, 4096))
+    return MicroBatcher(
+        name,
+        PIPELINES[name],
+        max_wait_ms=_env_num("RAGOS_BATCH_WINDOW_MS", name, 5.0),
+        max_items=int(_env_num("RAGOS_BATCH_MAX_ITEMS", name, 64)),
+        cache=UtteranceCache(cache_items) if cache_items > 0 else None,
+    )
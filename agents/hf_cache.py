@@ -4,39 +4,118 @@ Lazy-initialised, GPU–aware HuggingFace pipelines & models.
 
 Usage:
     from agents.hf_cache import get_sentiment_pipe, get_toxicity_pipe, ...
+
+torch / transformers are imported on first model build, not at import time,
+so importing this module (and everything that only needs MODEL_IDS or the
+backend table) stays cheap.
 """
 
 from functools import lru_cache
-import torch
-from transformers import (
-    pipeline,
-    AutoModelForSequenceClassification,
-    AutoTokenizer,
-)
+from pathlib import Path
+import os
+
 
 # helpers
-_DEVICE = 0 if torch.cuda.is_available() else -1
+@lru_cache(maxsize=1)
+def _device() -> int:
+    import torch
+    return 0 if torch.cuda.is_available() else -1
+
+# pipeline name → HF model id (also part of the result-cache version key)
+MODEL_IDS = {
+    "sentiment":   "cardiffnlp/twitter-roberta-base-sentiment",
+    "toxicity":    "unitary/toxic-bert",
+    "sarcasm":     "cardiffnlp/twitter-roberta-base-irony",
+    "categorizer": "facebook/bart-large-mnli",
+    "embedding":   "sentence-transformers/all-MiniLM-L6-v2",
+}
+
+
+# -------------------------  BACKENDS  ---------------------------------
+#   torch  – full-precision PyTorch (default)
+#   int8   – torch dynamic int8 quantisation of every nn.Linear (CPU)
+#   onnx   – ONNX Runtime graph via optimum; exported once to RAGOS_ONNX_DIR
+#            (optional dependency: pip install "optimum[onnxruntime]")
+# RAGOS_HF_BACKEND picks the default, RAGOS_HF_BACKEND_<NAME> overrides
+# one pipeline (e.g. RAGOS_HF_BACKEND_CATEGORIZER=onnx).
+BACKENDS = ("torch", "int8", "onnx")
+_ONNX_DIR = Path(os.getenv("RAGOS_ONNX_DIR", "models/onnx"))
+
+# task + extra pipeline kwargs per classifier
+_TASKS = {
+    "sentiment":   ("text-classification", {}),
+    "toxicity":    ("text-classification", {"top_k": None}),
+    # ⚠ no return_all_scores for irony; callers ask for top_k=None per call
+    "sarcasm":     ("text-classification", {}),
+    "categorizer": ("zero-shot-classification", {}),
+}
+_MODEL_KW = {"sarcasm": {"use_safetensors": False}}
+
+
+def backend_for(name: str) -> str:
+    backend = os.getenv(f"RAGOS_HF_BACKEND_{name.upper()}",
+                        os.getenv("RAGOS_HF_BACKEND", "torch")).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HF backend {backend!r} for {name}")
+    return backend
+
+
+def hf_backends() -> dict:
+    return {name: backend_for(name) for name in _TASKS}
+
+
+def _onnx_model(model_id: str):
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    export_dir = _ONNX_DIR / model_id.replace("/", "__")
+    if (export_dir / "model.onnx").exists():
+        return ORTModelForSequenceClassification.from_pretrained(export_dir)
+    mdl = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+    mdl.save_pretrained(export_dir)
+    return mdl
+
+
+def _remote(name: str):
+    """RemotePipe when a shared model host is configured (agents.model_host)."""
+    from agents.model_host import host_address, RemotePipe
+    addr = host_address()
+    return RemotePipe(name, addr) if addr else None
+
+
+def build_pipe(name: str, backend: str = "torch"):
+    """Uncached builder – the getters below cache one pipe per name."""
+    import torch
+    from transformers import (pipeline, AutoModelForSequenceClassification,
+                              AutoTokenizer)
+
+    task, pipe_kw = _TASKS[name]
+    model_id = MODEL_IDS[name]
+    tok = AutoTokenizer.from_pretrained(model_id)
+
+    if backend == "onnx":
+        mdl, device = _onnx_model(model_id), -1
+    else:
+        mdl = AutoModelForSequenceClassification.from_pretrained(
+            model_id, **_MODEL_KW.get(name, {}))
+        if backend == "int8":
+            mdl = torch.quantization.quantize_dynamic(
+                mdl, {torch.nn.Linear}, dtype=torch.qint8)
+            device = -1                          # quantised kernels are CPU-only
+        else:
+            device = _device()
+            mdl = mdl.to("cuda" if device == 0 else "cpu")
+
+    return pipeline(task, model=mdl, tokenizer=tok, device=device, **pipe_kw)
 
 
 @lru_cache(maxsize=1)
 def get_sentiment_pipe():
-    return pipeline(
-        "text-classification",
-        model="cardiffnlp/twitter-roberta-base-sentiment",
-        tokenizer="cardiffnlp/twitter-roberta-base-sentiment",
-        device=_DEVICE,
-    )
+    return _remote("sentiment") or build_pipe("sentiment", backend_for("sentiment"))
 
 
 @lru_cache(maxsize=1)
 def get_toxicity_pipe():
-    return pipeline(
-        "text-classification",
-        model="unitary/toxic-bert",
-        tokenizer="unitary/toxic-bert",
-        device=_DEVICE,
-        top_k=None,
-    )
+    return _remote("toxicity") or build_pipe("toxicity", backend_for("toxicity"))
 
 
 @lru_cache(maxsize=1)
@@ -45,25 +124,21 @@ def get_sarcasm_pipe():
     Sarcasm / irony detector → Cardiff NLP RoBERTa.
     Labels:  'irony' / 'non_irony'
     """
-    model_id = "cardiffnlp/twitter-roberta-base-irony"
+    remote = _remote("sarcasm")
+    if remote:
+        return remote              # the host applies its own fallback
     try:
-        mdl = AutoModelForSequenceClassification.from_pretrained(
-            model_id,
-            use_safetensors=False
-        ).to("cuda" if _DEVICE == 0 else "cpu")
-        tok = AutoTokenizer.from_pretrained(model_id)
-        # ⚠ We do *not* set return_all_scores here; we’ll ask for all scores
-        #    when we call the pipeline (top_k=None).
-        return pipeline(
-            "text-classification",
-            model=mdl,
-            tokenizer=tok,
-            device=_DEVICE,
-        )
+        return build_pipe("sarcasm", backend_for("sarcasm"))
     except Exception as e:
         print(f"[SarcasmPipe] Fallback, model load failed: {e}")
-        return lambda txt, **_: [[{"label": "non_irony", "score": 1.0},
-                                  {"label": "irony",      "score": 0.0}]]
+        neutral = [{"label": "non_irony", "score": 1.0},
+                   {"label": "irony",      "score": 0.0}]
+
+        def fallback(txt, **_):
+            return [list(neutral) for _ in txt] if isinstance(txt, list) else [neutral]
+        fallback.is_fallback = True           # warmup → "degraded", /ready stays false
+        fallback.load_error  = str(e)
+        return fallback
 
 # -------------------------  CATEGORIZER  ------------------------------
 @lru_cache(maxsize=1)
@@ -72,9 +147,38 @@ def get_categorizer_pipe():
     Zero-shot konu sınıflandırıcısı → facebook/bart-large-mnli.
     Çok kez çağrılsa da yalnızca tek seferde belleğe yüklenir.
     """
-    return pipeline(
-        "zero-shot-classification",
-        model="facebook/bart-large-mnli",
-        tokenizer="facebook/bart-large-mnli",
-        device=_DEVICE,
-    )
\ No newline at end of file
+    return _remote("categorizer") or build_pipe("categorizer", backend_for("categorizer"))
+
+# -------------------------  EMBEDDINGS  -------------------------------
+@lru_cache(maxsize=1)
+def get_embedder():
+    """
+    Sentence embedder (mean-pooled MiniLM, L2-normalised) for the
+    label-embedding categorizer.  Returns ``embed(texts) -> np.ndarray``.
+    """
+    from agents.model_host import host_address, RemoteEmbedder
+    if host_address():
+        return RemoteEmbedder(host_address())
+
+    import numpy as np
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tok = AutoTokenizer.from_pretrained(MODEL_IDS["embedding"])
+    mdl = AutoModel.from_pretrained(MODEL_IDS["embedding"]).to(
+        "cuda" if _device() == 0 else "cpu").eval()
+
+    @torch.no_grad()
+    def embed(texts, batch_size: int = 32):
+        out = []
+        for i in range(0, len(texts), batch_size):
+            enc = tok(list(texts[i:i + batch_size]), padding=True,
+                      truncation=True, max_length=256,
+                      return_tensors="pt").to(mdl.device)
+            hidden = mdl(**enc).last_hidden_state
+            mask   = enc["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            vec    = (hidden * mask).sum(1) / mask.sum(1).clamp(min=1e-9)
+            out.append(torch.nn.functional.normalize(vec, dim=-1).cpu().numpy())
+        return np.concatenate(out) if out else np.zeros((0, mdl.config.hidden_size))
+
+    return embed
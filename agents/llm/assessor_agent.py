@@ -0,0 +1,58 @@
+# agents/llm/assessor_agent.py
+import logging
+from typing import Dict, Any
+from .base_agent import BaseAgent
+from .review_prompt import ROLE, SCHEMA, as_bool, build_prompt, parse_review, review_error
+
+logger = logging.getLogger("care_monitor")
+
+class AssessorAgent(BaseAgent):
+    """
+    StarReviewer + ShouldNotify in ONE call ("combined" LLM mode).
+    • caregiver_score, tone, empathy, responsiveness  ⇒ 1-10
+    • summary, justification, abuse_flag
+    • notify, reason                                  ⇒ push kararı
+    Same metrics block + transcript, sent once instead of twice.
+    """
+
+    def __init__(self):
+        super().__init__(
+            name="CaregiverAssessor",
+            instructions=(
+                f"{ROLE} AND decide whether parents need a push-notification.\n"
+                "Notify when: potential harm, yelling, shaming or threats; repetition "
+                "of unhealthy patterns; developmental milestones parents would value. "
+                "If unsure, notify=false.\n"
+                "Return STRICT JSON with keys:\n"
+                f"{{ {SCHEMA}, notify:bool, reason:str(max 20 words) }}"
+            )
+        )
+
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        payload = super()._payload(prompt)
+        payload["max_tokens"] = 384          # two agents' worth of JSON
+        return payload
+
+    # ------------------------------------------------------------------ #
+    async def run(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
+        """ctx = orchestrator’ın topladığı tam analiz sözlüğü"""
+        try:
+            prompt = build_prompt(
+                ctx,
+                extra_task='Also decide if the parents should get a notification '
+                           '("notify") and why ("reason").\n',
+                extra_format=(("notify", "true/false"), ("reason", '"..."')))
+            raw = await self._aquery_ollama(prompt)
+            if isinstance(raw, str):
+                raw = self._extract_json(raw)
+            if not isinstance(raw, dict) or "error" in raw:
+                raise ValueError((raw or {}).get("error", "non-JSON reply"))
+
+            out = parse_review(raw)
+            out["notify"] = as_bool(raw.get("notify", False))
+            out["reason"] = raw.get("reason", "") if "notify" in raw else "parse error"
+            return out
+
+        except Exception as e:
+            logger.exception("[Assessor] crash")
+            return {**review_error(e), "notify": False, "reason": "parse error"}
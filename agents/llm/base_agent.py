@@ -1,51 +1,143 @@
-import json
-import requests
-from typing import Dict, Any
+import json, os, threading, time
+from contextlib import aclosing
+from typing import Dict, Any, List, Optional
 import logging
+from agents.llm.http_client import get_ollama_client
+from agents.llm.json_stream import IncrementalJSONObject
 logger = logging.getLogger("care_monitor")     # global project logger
 
+# RAGOS_LLM_STREAM=1 → read SSE and hang up once the JSON object is closed
+STREAM_DEFAULT = os.getenv("RAGOS_LLM_STREAM", "0").lower() in ("1", "true", "yes")
+
+# agent name → running latency counters (see ``llm_metrics``)
+_METRICS: Dict[str, Dict[str, float]] = {}
+_METRICS_LOCK = threading.Lock()                 # agents also run on worker threads
+
+
+def _record_metrics(name: str, m: Dict[str, Any]) -> None:
+    with _METRICS_LOCK:
+        agg = _METRICS.setdefault(name, {"calls": 0, "streamed": 0, "early_stops": 0,
+                                         "ttft_ms_sum": 0.0, "json_ms_sum": 0.0,
+                                         "total_ms_sum": 0.0})
+        agg["calls"]        += 1
+        agg["total_ms_sum"] += m["total_ms"]
+        if m.get("ttft_ms") is not None:
+            agg["streamed"]    += 1
+            agg["ttft_ms_sum"] += m["ttft_ms"]
+        if m.get("json_ms") is not None:
+            agg["early_stops"] += 1
+            agg["json_ms_sum"] += m["json_ms"]
+
+
+def llm_metrics() -> Dict[str, Dict[str, Optional[float]]]:
+    """Per-agent mean total / time-to-first-token / time-to-complete-JSON (ms)."""
+    with _METRICS_LOCK:
+        snapshot = {name: dict(a) for name, a in _METRICS.items()}
+    out: Dict[str, Dict[str, Optional[float]]] = {}
+    for name, a in snapshot.items():
+        out[name] = {
+            "calls":        a["calls"],
+            "early_stops":  a["early_stops"],
+            "mean_total_ms": round(a["total_ms_sum"] / a["calls"], 1),
+            "mean_ttft_ms": (round(a["ttft_ms_sum"] / a["streamed"], 1)
+                             if a["streamed"] else None),
+            "mean_json_ms": (round(a["json_ms_sum"] / a["early_stops"], 1)
+                             if a["early_stops"] else None),
+        }
+    return out
 
 
 class BaseAgent:
     # ──────────────────────────────────────────────────────────────
     def __init__(self, name: str, instructions: str, 
-                 model: str = "openhermes:7b-mistral-v2.5-q5_1"):
+                 model: str = "openhermes:7b-mistral-v2.5-q5_1",
+                 stream: Optional[bool] = None):
         self.name = name
         self.instructions = instructions
         self.model = model
-        self.base_url = "http://localhost:11434/v1"  # Ollama endpoint
+        self.base_url = os.getenv("OLLAMA_BASE_URL",
+                                  "http://localhost:11434/v1")  # Ollama endpoint
+        self.stream = STREAM_DEFAULT if stream is None else stream
+        self.last_metrics: Dict[str, Any] = {}
 
     # ──────────────────────────────────────────────────────────────
-    def _query_ollama(self, prompt: str) -> Dict[str, Any]:
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.instructions},
+                {"role": "user",   "content": prompt},
+            ],
+            "temperature": 0.7,
+            "max_tokens": 256,
+        }
+
+    # ──────────────────────────────────────────────────────────────
+    async def _aquery_ollama(self, prompt: str) -> Dict[str, Any]:
         """
-        Send a prompt to the local Ollama server and try to return a JSON
-        dictionary. If the model returns free-text instead of JSON, we fall
-        back to returning it under the key ``raw_output`` so the UI can still
-        display something rather than crash.
+        Send a prompt to Ollama on the shared pooled client (keep-alive,
+        per-model concurrency limit, retry with backoff) and return a JSON
+        dict; free text comes back under ``raw_output``, failures under
+        ``error`` – never raises, so callers are safe.
         """
+        if self.stream:
+            return await self._astream_json(prompt)
         try:
-            url = f"{self.base_url}/chat/completions"
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": self.instructions},
-                    {"role": "user",   "content": prompt},
-                ],
-                "temperature": 0.7,
-                "max_tokens": 256,
-            }
-
-            resp = requests.post(url, json=payload, timeout=300)
-            resp.raise_for_status()
-            raw = resp.json()["choices"][0]["message"]["content"].strip()
+            t0   = time.perf_counter()
+            data = await get_ollama_client().chat_completion(self._payload(prompt))
+            raw  = data["choices"][0]["message"]["content"].strip()
+            self._finish_metrics(t0)
             logger.debug(f"[{self.name}] raw LLM output:\n{raw}\n---")
             return self._extract_json(raw)
 
         except Exception as e:
-            # network/timeout/JSON issues – always return dict so callers are safe
             logger.exception("[Base Agent] crashed")
             return {"error": f"Ollama request failed: {e}"}
 
+    async def _astream_json(self, prompt: str) -> Dict[str, Any]:
+        """
+        Streaming variant: feed SSE deltas to an incremental JSON scanner and
+        close the connection as soon as the top-level object is complete,
+        so no tokens are spent on trailing chatter.
+        """
+        try:
+            t0 = time.perf_counter()
+            ttft: Optional[float] = None
+            parts: List[str] = []
+            scanner = IncrementalJSONObject()
+            obj: Optional[str] = None
+
+            stream = get_ollama_client().stream_chat_completion(self._payload(prompt))
+            async with aclosing(stream):
+                async for delta in stream:
+                    if ttft is None:
+                        ttft = time.perf_counter() - t0
+                    parts.append(delta)
+                    obj = scanner.feed(delta)
+                    if obj is not None:
+                        break                          # hang up early
+
+            self._finish_metrics(t0, ttft=ttft, complete=obj is not None,
+                                 chunks=len(parts))
+            raw = obj if obj is not None else "".join(parts).strip()
+            logger.debug(f"[{self.name}] streamed LLM output:\n{raw}\n---")
+            return self._extract_json(raw)
+
+        except Exception as e:
+            logger.exception("[Base Agent] stream crashed")
+            return {"error": f"Ollama request failed: {e}"}
+
+    def _finish_metrics(self, t0: float, ttft: Optional[float] = None,
+                        complete: bool = False, chunks: int = 0) -> None:
+        total = (time.perf_counter() - t0) * 1000.0
+        self.last_metrics = {
+            "total_ms": round(total, 1),
+            "ttft_ms":  round(ttft * 1000.0, 1) if ttft is not None else None,
+            "json_ms":  round(total, 1) if complete else None,
+            "chunks":   chunks,
+        }
+        _record_metrics(self.name, self.last_metrics)
+
     # ──────────────────────────────────────────────────────────────
     @staticmethod
     def _extract_json(text: str) -> Dict[str, Any]:
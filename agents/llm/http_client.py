@@ -0,0 +1,179 @@
+# agents/llm/http_client.py
+"""
+Shared asyncio HTTP client for the Ollama-compatible ``/v1`` endpoint.
+
+• keep-alive connection pool (httpx.AsyncClient), shared by every BaseAgent
+• per-model concurrency semaphore – a 7B model on one GPU gains nothing
+  from 20 parallel requests, it just queues them server-side
+• separate connect / read timeouts
+• retry with exponential backoff on transport errors, 429 and 5xx
+• optional SSE streaming of content deltas (``stream_chat_completion``)
+
+Config (env):
+    OLLAMA_BASE_URL              default http://localhost:11434/v1
+    RAGOS_LLM_CONNECT_TIMEOUT    seconds, default 5
+    RAGOS_LLM_READ_TIMEOUT       seconds, default 300
+    RAGOS_LLM_CONCURRENCY        in-flight requests per model, default 2
+    RAGOS_LLM_RETRIES            extra attempts after the first, default 2
+    RAGOS_LLM_MAX_CONNECTIONS    pool size, default 16
+
+Point OLLAMA_BASE_URL at ``ollama_stub_server.py`` to run without a GPU.
+"""
+from __future__ import annotations
+
+import asyncio, json, logging, os, random
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Tuple
+from weakref import WeakKeyDictionary
+
+import httpx
+
+from agents.deadline import remaining_s
+
+logger = logging.getLogger("care_monitor")
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class OllamaClient:
+    def __init__(self, base_url: str, *,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 300.0,
+                 concurrency: int = 2,
+                 retries: int = 2,
+                 backoff: float = 0.5,
+                 max_connections: int = 16) -> None:
+        self.base_url    = base_url.rstrip("/")
+        self.timeout     = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.concurrency = max(1, concurrency)
+        self.retries     = max(0, retries)
+        self.backoff     = backoff
+        self.limits      = httpx.Limits(max_connections=max_connections,
+                                        max_keepalive_connections=max_connections)
+        # httpx clients and asyncio semaphores are bound to one event loop;
+        # Streamlit spins up a fresh loop per click, so keep one set per loop.
+        self._per_loop: WeakKeyDictionary = WeakKeyDictionary()
+
+    # ─────────────────────────────────────────────── plumbing
+    def _state(self) -> Tuple[httpx.AsyncClient, Dict[str, asyncio.Semaphore]]:
+        loop  = asyncio.get_running_loop()
+        state = self._per_loop.get(loop)
+        if state is None or state[0].is_closed:
+            client = httpx.AsyncClient(base_url=self.base_url,
+                                       timeout=self.timeout, limits=self.limits)
+            state = (client, {})
+            self._per_loop[loop] = state
+        return state
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        sems = self._state()[1]
+        if model not in sems:
+            sems[model] = asyncio.Semaphore(self.concurrency)
+        return sems[model]
+
+    async def _sleep_before_retry(self, attempt: int) -> None:
+        delay = self.backoff * (2 ** attempt)
+        left  = remaining_s()
+        if left is not None and left <= delay:
+            # a retry could not finish before the request deadline
+            raise asyncio.TimeoutError("request deadline reached before retry")
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    def _call_timeout(self) -> httpx.Timeout:
+        """Read timeout capped at what is left of the request deadline."""
+        left = remaining_s()
+        if left is None:
+            return self.timeout
+        return httpx.Timeout(max(0.1, min(self.timeout.read, left)),
+                             connect=min(self.timeout.connect, max(0.1, left)))
+
+    # ─────────────────────────────────────────────── API
+    async def chat_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /chat/completions and return the decoded JSON response."""
+        client = self._state()[0]
+        async with self._semaphore(payload.get("model", "")):
+            for attempt in range(self.retries + 1):
+                last = attempt == self.retries
+                try:
+                    resp = await client.post("/chat/completions", json=payload,
+                                             timeout=self._call_timeout())
+                    if resp.status_code in RETRY_STATUS and not last:
+                        logger.warning("[OllamaClient] HTTP %s – retry %d",
+                                       resp.status_code, attempt + 1)
+                        await self._sleep_before_retry(attempt)
+                        continue
+                    resp.raise_for_status()
+                    return resp.json()
+                except httpx.TransportError as exc:
+                    if last:
+                        raise
+                    logger.warning("[OllamaClient] %s – retry %d",
+                                   exc.__class__.__name__, attempt + 1)
+                    await self._sleep_before_retry(attempt)
+        raise RuntimeError("unreachable")               # pragma: no cover
+
+    async def stream_chat_completion(self, payload: Dict[str, Any]
+                                     ) -> AsyncIterator[str]:
+        """
+        POST with ``stream: true`` and yield content deltas from the SSE
+        stream.  Closing the generator early closes the HTTP connection, so
+        the server stops generating.  Retries only happen before the first
+        delta – a half-consumed stream is never replayed.
+        """
+        client  = self._state()[0]
+        payload = {**payload, "stream": True}
+        yielded = False
+        async with self._semaphore(payload.get("model", "")):
+            for attempt in range(self.retries + 1):
+                last = attempt == self.retries
+                try:
+                    async with client.stream("POST", "/chat/completions",
+                                             json=payload,
+                                             timeout=self._call_timeout()) as resp:
+                        if resp.status_code in RETRY_STATUS and not last:
+                            logger.warning("[OllamaClient] HTTP %s – retry %d",
+                                           resp.status_code, attempt + 1)
+                            await resp.aread()
+                            await self._sleep_before_retry(attempt)
+                            continue
+                        resp.raise_for_status()
+                        async for line in resp.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                return
+                            choice = json.loads(data)["choices"][0]
+                            delta  = choice.get("delta", {}).get("content")
+                            if delta:
+                                yielded = True
+                                yield delta
+                        return
+                except httpx.TransportError as exc:
+                    if last or yielded:
+                        raise
+                    logger.warning("[OllamaClient] %s – retry %d",
+                                   exc.__class__.__name__, attempt + 1)
+                    await self._sleep_before_retry(attempt)
+
+    async def aclose(self) -> None:
+        for client, _ in list(self._per_loop.values()):
+            await client.aclose()
+        self._per_loop.clear()
+
+
+def _env(key: str, default: float) -> float:
+    raw = os.getenv(key)
+    return float(raw) if raw else default
+
+
+@lru_cache(maxsize=1)
+def get_ollama_client() -> OllamaClient:
+    return OllamaClient(
+        os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1"),
+        connect_timeout=_env("RAGOS_LLM_CONNECT_TIMEOUT", 5.0),
+        read_timeout=_env("RAGOS_LLM_READ_TIMEOUT", 300.0),
+        concurrency=int(_env("RAGOS_LLM_CONCURRENCY", 2)),
+        retries=int(_env("RAGOS_LLM_RETRIES", 2)),
+        max_connections=int(_env("RAGOS_LLM_MAX_CONNECTIONS", 16)),
+    )
@@ -0,0 +1,63 @@
+# agents/llm/json_stream.py
+"""
+Incremental detector for the first complete top-level JSON object in a
+token stream.
+
+    p = IncrementalJSONObject()
+    for delta in stream:
+        obj_text = p.feed(delta)
+        if obj_text is not None:      # "{...}" closed → stop reading
+            break
+
+Anything before the first ``{`` (chatter, ```json fences) is skipped;
+braces inside strings and escaped quotes are handled.
+"""
+from __future__ import annotations
+
+from typing import List, Optional
+
+
+class IncrementalJSONObject:
+    __slots__ = ("_parts", "_depth", "_in_str", "_escape", "done")
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._depth  = 0
+        self._in_str = False
+        self._escape = False
+        self.done    = False
+
+    @property
+    def started(self) -> bool:
+        return self._depth > 0 or self.done
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consume ``chunk``; return the object text once it is complete."""
+        if self.done:
+            return None
+        start = 0 if self._depth else None
+        for i, ch in enumerate(chunk):
+            if self._depth == 0:
+                if ch == "{":                    # skip pre-object chatter
+                    self._depth, start = 1, i
+                continue
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+            elif ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:i + 1])
+                    self.done = True
+                    return "".join(self._parts)
+        if start is not None:
+            self._parts.append(chunk[start:])
+        return None
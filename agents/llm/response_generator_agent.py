@@ -2,12 +2,8 @@
 import json, logging
 from typing import Dict, Any, List
 
-from chromadb import PersistentClient
-from langchain_community.vectorstores import Chroma
-from langchain_chroma import Chroma
-from langchain_community.embeddings import OllamaEmbeddings
-
 from .base_agent import BaseAgent
+from agents.analysis.chunking import salient_excerpt
 
 logger = logging.getLogger("care_monitor")
 
@@ -30,12 +26,26 @@ class ResponseGeneratorAgent(BaseAgent):
             ),
         )
 
-        # optional best-practice retrieval (same as önceki kod)
-        #client = PersistentClient(path="embeddings/chroma_index", settings=Settings(allow_reset=True))
-        self.retriever = Chroma(
-            embedding_function=OllamaEmbeddings(model="openhermes:7b-mistral-v2.5-q5_1"),
-            persist_directory="embeddings/chroma_index",  # ✅ Sadece bu yeterli
-        )
+        self._retriever = None
+
+    # optional best-practice retrieval (same as önceki kod) – chromadb and
+    # langchain are only imported the first time someone asks for it
+    @property
+    def retriever(self):
+        if self._retriever is None:
+            from langchain_chroma import Chroma
+            from langchain_community.embeddings import OllamaEmbeddings
+
+            self._retriever = Chroma(
+                embedding_function=OllamaEmbeddings(model="openhermes:7b-mistral-v2.5-q5_1"),
+                persist_directory="embeddings/chroma_index",  # ✅ Sadece bu yeterli
+            )
+        return self._retriever
+
+    @staticmethod
+    def messages(ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """``run`` input for a ctx – datetimes / numpy values go through str()."""
+        return [{"content": json.dumps(ctx, default=str)}]
 
     # ------------------------------------------------------------------ #
     async def run(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -48,7 +58,7 @@ class ResponseGeneratorAgent(BaseAgent):
 
              # ---------------- LLM’e prompt --------------------
             cat = ctx.get("primary_category", "General")
-            transcript = ctx.get("transcript", "")[:1200]
+            transcript = salient_excerpt(ctx.get("transcript", ""), 1200, ctx)
             tox_scores = ctx.get("toxicity_scores", [])
             sent_scores = ctx.get("sentiment_scores", [])
             sarcasm_scores = ctx.get("sarcasm_scores", [])
@@ -83,7 +93,7 @@ class ResponseGeneratorAgent(BaseAgent):
             "parent_notification": "...",
             "recommendations":[{{"category":"...","description":"..."}}]}}
             """
-            raw = self._query_ollama(prompt)
+            raw = await self._aquery_ollama(prompt)
 
             # LLM çıktısını güvenli şekilde ayrıştır
             if isinstance(raw, dict):
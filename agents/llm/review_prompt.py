@@ -0,0 +1,86 @@
+# agents/llm/review_prompt.py
+"""
+Caregiver-review prompt and reply parsing shared by StarReviewerAgent
+(scores only) and AssessorAgent (scores + notify in one call) – one copy,
+so the two prompts cannot drift apart.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence, Tuple
+
+from agents.analysis.chunking import salient_excerpt
+
+SCORE_KEYS: Tuple[str, ...] = ("caregiver_score", "tone", "empathy", "responsiveness")
+
+ROLE = ("You are a child-development expert. "
+        "Given a full analysis context, rate the caregiver on a 1-10 scale")
+SCHEMA = ("caregiver_score:int(1-10), tone:int(1-10), empathy:int(1-10), "
+          "responsiveness:int(1-10), summary:str(max 20 words), abuse_flag:bool, "
+          "justification:str(max 20 words)")
+
+_TASK = """Evaluate the ADULT caregiver’s overall performance on a **1-10** scale
+(10 = outstanding).  Also give 1-10 sub-scores for tone, empathy and
+responsiveness.  Base your judgement ONLY on the numbers & dialogue below.
+• "summary": 1-sentence (≤20 words), what happened — no judgment.
+• "justification": 1-sentence (≤20 words), why this score."""
+
+_FORMAT: Tuple[Tuple[str, str], ...] = (
+    ("caregiver_score", "1-10"), ("tone", "1-10"), ("empathy", "1-10"),
+    ("responsiveness", "1-10"), ("summary", '"..."'), ("abuse_flag", "true/false"),
+    ("justification", '"..."'),
+)
+
+
+def build_prompt(ctx: Dict[str, Any], extra_task: str = "",
+                 extra_format: Sequence[Tuple[str, str]] = ()) -> str:
+    """Review prompt; ``extra_task`` / ``extra_format`` add the caller's own keys."""
+    tx  = salient_excerpt(ctx.get("transcript", ""), 2000, ctx)
+    fmt = ",\n".join(f'"{k}": {v}' for k, v in (*_FORMAT, *extra_format))
+    return f"""### TASK
+{_TASK}
+{extra_task}
+Return STRICT JSON – no extra keys.
+
+### NUMERICAL CONTEXT
+Primary topic: {ctx.get("primary_category", "Unknown")}
+Avg sentiment score: {ctx.get("sentiment_score", 0.0):.3f}
+Sentence sentiments[]: {ctx.get("sentiment_scores", [])}
+Avg toxicity: {ctx.get("toxicity", 0.0):.3f}
+Toxicity per Caregiver sentence[]: {ctx.get("toxicity_scores", [])}
+Avg sarcasm: {ctx.get("sarcasm", 0.0):.3f}
+Sarcasm per Caregiver sentence[]: {ctx.get("sarcasm_scores", [])}
+
+### CONVERSATION (key excerpts if long)
+{tx}
+
+### OUTPUT FORMAT
+{{
+{fmt}
+}}
+"""
+
+
+# ─────────────────────────────────────────────── reply parsing
+def as_bool(v: Any) -> bool:
+    """Strict: only JSON true or the string "true" – "false", "no", 1 … are False."""
+    return v is True or (isinstance(v, str) and v.strip().lower() == "true")
+
+
+def clamp_score(v: Any) -> int:
+    try:
+        return max(1, min(10, int(round(float(v)))))
+    except Exception:
+        return 0
+
+
+def parse_review(raw: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {k: clamp_score(raw.get(k, 0)) for k in SCORE_KEYS}
+    out["summary"]       = raw.get("summary", "No summary.")
+    out["abuse_flag"]    = as_bool(raw.get("abuse_flag", False))
+    out["justification"] = raw.get("justification", "No explanation.")
+    return out
+
+
+def review_error(e: Exception) -> Dict[str, Any]:
+    return {**{k: 0 for k in SCORE_KEYS}, "summary": f"Error: {e}",
+            "abuse_flag": False, "justification": f"Error: {e}"}
@@ -2,6 +2,8 @@
 import json, logging
 from typing import Dict, Any, List
 from .base_agent import BaseAgent
+from .review_prompt import as_bool
+from agents.analysis.chunking import salient_excerpt
 
 logger = logging.getLogger("care_monitor")
 
@@ -44,11 +46,11 @@ class ShouldNotifyAgent(BaseAgent):
         primary_category: {ctx.get('primary_category')}
         secondary_cat[] : {ctx.get('secondary_categories')}
         ### CONVERSATION
-        {ctx.get('transcript')[:1200]}
+        {salient_excerpt(ctx.get('transcript') or "", 1200, ctx)}
         ### STRICT OUTPUT JSON
         {{ "notify": false, "reason": "" }}
         """
-        out = self._query_ollama(prompt)
+        out = await self._aquery_ollama(prompt)
 
         # Güvenle JSON çek
         if isinstance(out, str):
@@ -57,5 +59,5 @@ class ShouldNotifyAgent(BaseAgent):
             except Exception:
                 pass
         if isinstance(out, dict) and "notify" in out:
-            return out
+            return {**out, "notify": as_bool(out["notify"])}
         return {"notify": False, "reason": "parse error"}
@@ -1,7 +1,8 @@
 # agents/llm/star_reviewer_agent.py
-import logging, json
+import logging
 from typing import Dict, Any
 from .base_agent import BaseAgent
+from .review_prompt import ROLE, SCHEMA, build_prompt, parse_review, review_error
 
 logger = logging.getLogger("care_monitor")
 
@@ -16,11 +17,9 @@ class StarReviewerAgent(BaseAgent):
         super().__init__(
             name="CaregiverScorer",
             instructions=(
-                "You are a child-development expert. "
-                "Given a full analysis context, rate the caregiver on a 1-10 scale.\n"
+                f"{ROLE}.\n"
                 "Return STRICT JSON with keys:\n"
-                "{ caregiver_score:int(1-10), tone:int(1-10), empathy:int(1-10), "
-                "responsiveness:int(1-10), summary:str(max 20 words), abuse_flag:bool, justification:str(max 20 words) }"
+                f"{{ {SCHEMA} }}"
             )
         )
 
@@ -28,73 +27,12 @@ class StarReviewerAgent(BaseAgent):
     async def run(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """ctx = orchestrator’ın topladığı tam analiz sözlüğü"""
         try:
-            # Prompta dâhil edeceğimiz veriler
-            tx          = ctx.get("transcript", "")[:2000]
-            tox_avg     = ctx.get("toxicity", 0.0)
-            tox_scores  = ctx.get("toxicity_scores", [])
-            sent_avg    = ctx.get("sentiment_score", 0.0)
-            sent_scores = ctx.get("sentiment_scores", [])
-            sarcasm_avg = ctx.get("sarcasm", 0.0)
-            sarcasm_sc  = ctx.get("sarcasm_scores", [])
-            category    = ctx.get("primary_category", "Unknown")
-
-            prompt = f"""
-            ### TASK
-            Evaluate the ADULT caregiver’s overall performance on a **1-10** scale
-            (10 = outstanding).  Also give 1-10 sub-scores for tone, empathy and
-            responsiveness.  Base your judgement ONLY on the numbers & dialogue below.
-            
-            Also return:
-            • "summary": 1-sentence (≤20 words), what happened — no judgment.  
-            • "justification": 1-sentence (≤20 words), why this score.
-
-            Return STRICT JSON – no extra keys.
-
-            ### NUMERICAL CONTEXT
-            Primary topic: {category}
-            Avg sentiment score: {sent_avg:.3f}
-            Sentence sentiments[]: {sent_scores}
-            Avg toxicity: {tox_avg:.3f}
-            Toxicity per Caregiver sentence[]: {tox_scores}
-            Avg sarcasm: {sarcasm_avg:.3f}
-            Sarcasm per Caregiver sentence[]: {sarcasm_sc}
-
-            ### CONVERSATION (truncated)
-            {tx}
-
-            ### OUTPUT FORMAT
-            {{
-            "caregiver_score": 1-10,
-            "tone": 1-10,
-            "empathy": 1-10,
-            "responsiveness": 1-10,
-            "summary": "...",
-            "abuse_flag": true/false,
-            "justification": "..."
-            }}
-            """
-            raw = self._query_ollama(prompt)
+            raw = await self._aquery_ollama(build_prompt(ctx))
             if isinstance(raw, str):
                 raw = self._extract_json(raw)
-
             # güvenlik: zorunlu alanlar + int(1-10)
-            def _clamp(v):  # type: ignore
-                try:
-                    v = int(round(float(v)))
-                    return max(1, min(10, v))
-                except Exception:
-                    return 0
-
-            keys = ["caregiver_score", "tone", "empathy", "responsiveness"]
-            out = {k: _clamp(raw.get(k, 0)) for k in keys}
-            out["summary"] = raw.get("summary", "No summary.")
-            out["abuse_flag"] = bool(raw.get("abuse_flag", False))
-            out["justification"] = raw.get("justification", "No explanation.")
-            return out
+            return parse_review(raw)
 
         except Exception as e:
             logger.exception("[StarReviewer] crash")
-            return {
-                "caregiver_score": 0, "tone": 0, "empathy": 0,
-                "responsiveness": 0, "summary": f"Error: {e}", "abuse_flag": False, "justification": f"Error: {e}"
-            }
+            return review_error(e)
@@ -0,0 +1,143 @@
+# agents/model_host.py
+"""
+One process owns the model weights; API workers borrow them over local IPC.
+
+With N uvicorn workers every process used to load its own bart-large-mnli,
+toxic-bert and the two RoBERTa models through ``hf_cache``.  In host mode
+only the model host loads them; the workers' hf_cache getters hand out thin
+``RemotePipe`` proxies that ship a batch to the host and get the pipeline
+output back.  Memory scales with the number of models, not workers × models.
+
+Inside the host every request goes through the host's own ``MicroBatcher``
+(and its utterance cache), so batches from different workers are merged
+into one forward pass as well.
+
+    # 1) start the host (same RAGOS_HF_BACKEND* env as the workers)
+    $ export RAGOS_MODEL_HOST_AUTHKEY=$(python -c "import secrets; print(secrets.token_hex(32))")
+    $ python -m agents.model_host --address 127.0.0.1:50555
+    # 2) point the workers at it
+    $ RAGOS_MODEL_HOST=127.0.0.1:50555 uvicorn backend.main:app --workers 4
+
+Env:
+    RAGOS_MODEL_HOST          host:port or a unix-socket path; unset = in-process
+    RAGOS_MODEL_HOST_AUTHKEY  shared secret for the connection – REQUIRED; the
+                              manager channel unpickles what it receives, so
+                              there is no default key
+"""
+from __future__ import annotations
+
+import argparse, logging, os, threading
+from functools import lru_cache
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger("care_monitor")
+
+Address = Union[str, Tuple[str, int]]
+
+
+def host_address() -> Optional[str]:
+    return os.getenv("RAGOS_MODEL_HOST") or None
+
+
+def _parse(addr: str) -> Address:
+    """'host:port' → TCP tuple, anything else → unix-socket path."""
+    host, sep, port = addr.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return addr
+
+
+def _authkey() -> bytes:
+    key = os.getenv("RAGOS_MODEL_HOST_AUTHKEY", "")
+    if not key:
+        raise RuntimeError("RAGOS_MODEL_HOST_AUTHKEY is not set – the model host "
+                           "needs a shared secret (e.g. secrets.token_hex(32))")
+    return key.encode("utf-8")
+
+
+class _HostManager(BaseManager):
+    pass
+
+
+# ─────────────────────────────────────────────── server side
+class ModelHost:
+    """Runs on the host; every method is called through a manager proxy."""
+
+    def infer(self, name: str, texts: List[str], kwargs: Dict[str, Any]) -> List[Any]:
+        from agents.hf_batching import get_batcher
+        return get_batcher(name).submit_sync(texts, **kwargs)
+
+    def embed(self, texts: List[str]):
+        from agents.hf_cache import get_embedder
+        return get_embedder()(texts)
+
+    def status(self) -> Dict[str, Any]:
+        from agents.hf_cache import hf_backends
+        from agents.warmup import readiness
+        return {"pid": os.getpid(), "backends": hf_backends(), **readiness()}
+
+
+_HOST = ModelHost()
+
+
+def serve(address: str, warm: bool = True) -> None:
+    # the host must load real weights, never proxy to itself
+    os.environ.pop("RAGOS_MODEL_HOST", None)
+    authkey = _authkey()                           # fail before loading anything
+    _HostManager.register("ModelHost", callable=lambda: _HOST)
+    mgr = _HostManager(address=_parse(address), authkey=authkey)
+    server = mgr.get_server()
+    if warm:
+        from agents.warmup import warm_up
+        threading.Thread(target=warm_up, name="ragos-warmup", daemon=True).start()
+    logger.info("[ModelHost] serving on %s (pid %s)", address, os.getpid())
+    server.serve_forever()
+
+
+# ─────────────────────────────────────────────── client side
+@lru_cache(maxsize=None)
+def _host_proxy(address: str):
+    """One connection per worker process; proxies open one socket per thread."""
+    _HostManager.register("ModelHost")
+    mgr = _HostManager(address=_parse(address), authkey=_authkey())
+    mgr.connect()
+    logger.info("[ModelHost] worker pid %s connected to %s", os.getpid(), address)
+    return mgr.ModelHost()
+
+
+class RemotePipe:
+    """Drop-in for an HF pipeline called with a list (what MicroBatcher does)."""
+
+    def __init__(self, name: str, address: str) -> None:
+        self.name    = name
+        self.address = address
+
+    def __call__(self, texts: List[str], **kwargs) -> List[Any]:
+        return _host_proxy(self.address).infer(self.name, list(texts), kwargs)
+
+
+class RemoteEmbedder:
+    def __init__(self, address: str) -> None:
+        self.address = address
+
+    def __call__(self, texts, batch_size: int = 32):
+        return _host_proxy(self.address).embed(list(texts))
+
+
+def host_status(address: Optional[str] = None) -> Dict[str, Any]:
+    return _host_proxy(address or host_address()).status()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="RAGOS shared model host")
+    ap.add_argument("--address", default=host_address() or "127.0.0.1:50555",
+                    help="host:port or unix-socket path")
+    ap.add_argument("--no-warmup", action="store_true")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    serve(args.address, warm=not args.no_warmup)
+
+
+if __name__ == "__main__":
+    main()
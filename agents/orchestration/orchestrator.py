@@ -1,10 +1,8 @@
 # orchestrator.py
 from __future__ import annotations
-from typing import Dict, Any
-import json, re, logging, asyncio
+from typing import Dict, Any, Optional
+import json, re, logging, asyncio, hashlib, os, time
 from datetime import datetime
-import langdetect
-import argostranslate.package, argostranslate.translate
 
 # ────────── Agents
 from agents.analysis.analyzer_agent          import AnalyzerAgent
@@ -14,15 +12,41 @@ from agents.analysis.sarcasm_detection_agent import SarcasmDetectionAgent
 from agents.llm.star_reviewer_agent          import StarReviewerAgent
 from agents.llm.response_generator_agent     import ResponseGeneratorAgent
 from agents.llm.should_notify_agent   import ShouldNotifyAgent
+from agents.llm.assessor_agent        import AssessorAgent
+from agents.analysis.transcript       import ParsedTranscript
+from agents.executors                 import run_in
+from agents.hf_cache                  import MODEL_IDS, hf_backends
+from agents.analysis.chunking         import TOKEN_BUDGETS, budget_for
+from agents.orchestration.result_cache import ResultCache, cache_from_env, cache_key
+from agents.orchestration.pregate      import BenignGate
+from agents.orchestration.speculative  import SpeculativeNotifier
+from agents.deadline                  import Deadline, current as current_deadline
 
 
 logger = logging.getLogger("care_monitor")
 
+# Bump whenever a prompt template or post-processing rule changes –
+# it is part of the result-cache key, so stale cached results stop matching.
+PIPELINE_VERSION = "2025.06-2"
+
+# ────────── Deadline fallbacks (RAGOS_DEADLINE_MS / x-deadline-ms)
+# An LLM stage that would miss the request deadline is cancelled and
+# replaced by a deterministic answer from the HF metrics:
+#   star_review / assess → caregiver_score + sub-scores = BenignGate.score(ctx),
+#                          abuse_flag = toxicity ≥ FALLBACK_ABUSE_TOX
+#   notify_decision      → notify = abuse_flag or toxicity ≥ FALLBACK_NOTIFY_TOX
+#   notification         → short template text, no recommendations
+# Degraded stages are listed in ctx["degraded"] and such results are not cached.
+FALLBACK_NOTIFY_TOX = float(os.getenv("RAGOS_FALLBACK_NOTIFY_TOX", 0.7))
+FALLBACK_ABUSE_TOX  = float(os.getenv("RAGOS_FALLBACK_ABUSE_TOX", 0.85))
+
 class Orchestrator:
     """Runs all sub-agents and returns the merged context."""
 
     # ─────────────────────────── init
-    def __init__(self) -> None:
+    def __init__(self, cache: Optional[ResultCache] = None,
+                 pregate: Optional[BenignGate] = None,
+                 llm_mode: Optional[str] = None) -> None:
         self.use_translation = False
         self.analyzer_agent   = AnalyzerAgent()
         self.categorizer_agent= CategorizerAgent()
@@ -31,16 +55,46 @@ class Orchestrator:
         self.star_agent       = StarReviewerAgent()
         self.resp_agent       = ResponseGeneratorAgent()
         self.decider_agent = ShouldNotifyAgent()
-
+        self.assess_agent  = AssessorAgent()
+        # separate – StarReviewer → ShouldNotify (two calls, default)
+        # combined – AssessorAgent, one prompt / one JSON for both
+        self.llm_mode = (llm_mode or os.getenv("RAGOS_LLM_MODE", "separate")).lower()
+        if self.llm_mode not in ("separate", "combined"):
+            raise ValueError(f"Unknown LLM mode: {self.llm_mode!r}")
+        self.cache = cache if cache is not None else cache_from_env()
+        self.pregate = pregate or BenignGate.from_env()
+        self.speculative = SpeculativeNotifier.from_env(self.resp_agent)
+        self.version_tag = self._version_tag()
 
     # ─────────────────────────── helpers
     def set_translation_flag(self, flag: bool) -> None:
         self.use_translation = bool(flag)
 
+    def _version_tag(self) -> str:
+        llm = {a.name: [a.model, a.instructions]
+               for a in (self.star_agent, self.decider_agent, self.resp_agent,
+                         self.assess_agent)}
+        blob = json.dumps({"pipeline": PIPELINE_VERSION, "models": MODEL_IDS,
+                           "backends": hf_backends(),
+                           "categorizer": [self.categorizer_agent.engine.name,
+                                           self.categorizer_agent.mode,
+                                           self.categorizer_agent.top_groups,
+                                           self.categorizer_agent.agg_rule],
+                           "chunk_tokens": {n: budget_for(n) for n in TOKEN_BUDGETS},
+                           "pregate": self.pregate.config(),
+                           "llm_mode": self.llm_mode,
+                           "speculative": self.speculative.enabled,
+                           "llm": llm}, sort_keys=True)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
     def _detect_and_translate(self, text: str) -> Dict[str, Any]:
         if not self.use_translation:
             return {"transcript": text, "original_language": "en"}
 
+        # ağır bağımlılıklar: yalnızca çeviri açıkken yüklenir
+        import langdetect
+        import argostranslate.translate
+
         try:
             lang = langdetect.detect(text)
         except Exception:
@@ -65,49 +119,92 @@ class Orchestrator:
         return {"transcript": text, "original_language": lang,
                 "translation_used": False}
 
+    # ─────────────────────────── deadline fallbacks
+    @staticmethod
+    def _fallback_scores(ctx: Dict[str, Any]) -> Dict[str, Any]:
+        sc = BenignGate.score(ctx)
+        return {"caregiver_score": sc, "tone": sc, "empathy": sc,
+                "responsiveness": sc,
+                "summary": "Scores estimated from sentiment/toxicity metrics.",
+                "abuse_flag": float(ctx.get("toxicity", 0.0)) >= FALLBACK_ABUSE_TOX,
+                "justification": "LLM review exceeded the request deadline."}
+
+    @staticmethod
+    def _fallback_decision(ctx: Dict[str, Any]) -> Dict[str, Any]:
+        notify = (bool(ctx.get("abuse_flag"))
+                  or float(ctx.get("toxicity", 0.0)) >= FALLBACK_NOTIFY_TOX)
+        return {"notify": notify, "reason": "deadline fallback (HF metrics)"}
+
+    @staticmethod
+    def _fallback_notification(ctx: Dict[str, Any]) -> Dict[str, Any]:
+        cat = ctx.get("primary_category", "today's session")
+        return {"parent_notification":
+                    f"Something in {cat} may need your attention – "
+                    "please review the conversation in the app.",
+                "recommendations": []}
+
     # ─────────────────────────── main pipeline
-    async def process_transcript(self, transcript: str) -> Dict[str, Any]:
-        ctx: Dict[str, Any] = {}
+    async def process_transcript(self, transcript: str,
+                                 deadline_ms: Optional[float] = None) -> Dict[str, Any]:
+        """Cached front door – identical transcripts skip every model call.
+        ``deadline_ms`` overrides RAGOS_DEADLINE_MS for this request."""
+        dl = Deadline.from_env(deadline_ms)
+        with dl.active():
+            if self.cache is None:
+                return await self._run_pipeline(transcript, dl)
+
+            t0  = time.perf_counter()
+            key = cache_key(transcript, self.use_translation, self.version_tag)
+            hit = await run_in("io", self.cache.get, key)
+            if hit is not None:
+                # the cache holds no transcript text – restore it
+                text = transcript
+                if hit.get("translation_used"):
+                    text = (await run_in("translate", self._detect_and_translate,
+                                         transcript))["transcript"]
+                dl.record("cache", t0)
+                return {**hit, "transcript": text,
+                        "stage_timings": dl.timings, "degraded": []}
+
+            ctx = await self._run_pipeline(transcript, dl)
+            if "error" not in ctx and not ctx.get("degraded"):
+                await run_in("io", self.cache.put, key,
+                             {k: v for k, v in ctx.items()
+                              if k not in ("stage_timings", "degraded")})
+            return ctx
+
+    async def _run_pipeline(self, transcript: str,
+                            dl: Optional[Deadline] = None) -> Dict[str, Any]:
+        dl = dl or Deadline.from_env()
+        ctx: Dict[str, Any] = {"stage_timings": dl.timings, "degraded": dl.degraded}
         try:
             # 1. language / translation
-            lang_res = self._detect_and_translate(transcript)
+            t0 = time.perf_counter()
+            lang_res = await run_in("translate", self._detect_and_translate,
+                                    transcript)
+            dl.record("translate", t0)
             ctx.update({"transcript": transcript})
             ctx.update(lang_res)
             txt = ctx["transcript"]
 
-            # 2. fast parallel agents
+            # 2. fast parallel agents – transcript parsed once, shared by all
+            #    (timed, not cancelled: every fallback needs these metrics)
+            t0 = time.perf_counter()
+            parsed = ParsedTranscript.parse(txt)
             tasks = [
-                self.tox_agent.run       ([{"content": json.dumps({"transcript": txt})}]),
-                self.analyzer_agent.run  ([{"content": json.dumps({"transcript": txt})}]),
-                self.categorizer_agent.run([{"content": json.dumps({"transcript": txt})}]),
-                self.sarcasm_agent.run   ([{"content": json.dumps({"transcript": txt})}]),
+                self.tox_agent.run_parsed       (parsed),
+                self.analyzer_agent.run_parsed  (parsed),
+                self.categorizer_agent.run_parsed(parsed),
+                self.sarcasm_agent.run_parsed   (parsed),
             ]
             tox_r, ana_r, cat_r, sar_r = await asyncio.gather(*tasks)
             for r in (tox_r, ana_r, cat_r, sar_r):
                 if isinstance(r, dict):
                     ctx.update(r)
+            dl.record("hf_agents", t0)
 
-            # 3. caregiver scoring
-            score_r = await self.star_agent.run(ctx)
-            if isinstance(score_r, dict):
-                ctx.update(score_r)
-            
-            # 4. notification DECISION (LLM)
-            decide_r = await self.decider_agent.run(ctx)
-            ctx["send_notification"] = decide_r.get("notify", False)
-            ctx["notify_reason"]     = decide_r.get("reason", "")
-
-            # 5. parent notification (heavy)
-            if ctx["send_notification"]:
-                resp_r, = await asyncio.gather(
-                    self.resp_agent.run([{"content": json.dumps(ctx)}])
-                )
-                if isinstance(resp_r, dict):
-                    ctx.update(resp_r)
-            else:
-                # Boş placeholder – front-end karşılığı net olsun
-                ctx.update({"parent_notification": "",
-                            "recommendations": []})
+            # 3-5. LLM stages
+            await self.run_llm_stages(ctx, dl)
 
             # timestamp / id assignment is handled upstream
             return ctx
@@ -115,3 +212,64 @@ class Orchestrator:
         except Exception as exc:
             logger.exception("[Orchestrator] crash")
             return {"error": f"Orchestrator failed: {exc}"}
+
+    async def run_llm_stages(self, ctx: Dict[str, Any],
+                             dl: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Scoring → notify decision → notification; updates ``ctx`` in place.
+        Also used by live sessions (session.py) when a trigger fires.
+        Every LLM call runs under the request deadline (see fallbacks above)."""
+        dl = dl or current_deadline() or Deadline.from_env()
+        ctx.setdefault("stage_timings", dl.timings)
+        ctx.setdefault("degraded", dl.degraded)
+
+        # 3a. clearly benign → resolved from HF metrics, no LLM call
+        gated = self.pregate.decide(ctx)
+        if gated is not None:
+            ctx.update(gated)
+            return ctx
+        ctx["llm_path"] = "full"
+
+        if self.llm_mode == "combined":
+            # 3+4. scoring AND notification decision in one call
+            draft = self.speculative.maybe_start(ctx)
+            decide_r = await dl.run(
+                "assess", self.assess_agent.run(ctx),
+                lambda: {**self._fallback_scores(ctx), **self._fallback_decision(
+                    {**ctx, **self._fallback_scores(ctx)})})
+            ctx.update({k: v for k, v in decide_r.items()
+                        if k not in ("notify", "reason")})
+        else:
+            # 3. caregiver scoring
+            score_r = await dl.run("star_review", self.star_agent.run(ctx),
+                                   lambda: self._fallback_scores(ctx))
+            if isinstance(score_r, dict):
+                ctx.update(score_r)
+
+            # 4. notification DECISION (LLM) – high-risk → draft in parallel
+            draft = self.speculative.maybe_start(ctx)
+            decide_r = await dl.run("notify_decision", self.decider_agent.run(ctx),
+                                    lambda: self._fallback_decision(ctx))
+        ctx["send_notification"] = decide_r.get("notify", False)
+        ctx["notify_reason"]     = decide_r.get("reason", "")
+
+        if draft is not None and dl.expired:
+            draft.discard()                       # no time left to use it
+            draft = None
+
+        # 5. parent notification (heavy)
+        if ctx["send_notification"]:
+            if draft is not None:
+                aw = draft.use()
+            else:
+                aw = self.resp_agent.run(self.resp_agent.messages(ctx))
+            resp_r = await dl.run("notification", aw,
+                                  lambda: self._fallback_notification(ctx))
+            if isinstance(resp_r, dict):
+                ctx.update(resp_r)
+        else:
+            if draft is not None:
+                draft.discard()
+            # Boş placeholder – front-end karşılığı net olsun
+            ctx.update({"parent_notification": "",
+                        "recommendations": []})
+        return ctx
@@ -0,0 +1,97 @@
+# agents/orchestration/pregate.py
+"""
+Rule-based pre-gate in front of the LLM stages.
+
+StarReviewer + ShouldNotify are two sequential 7B calls of several seconds
+each.  When the HF metrics alone say the interaction is clearly benign
+(near-zero toxicity, low sarcasm, positive sentiment, no very negative
+line) the gate answers instead: a deterministic caregiver score and
+``send_notification = False``.  ``ctx["llm_path"]`` records what happened:
+
+    "gated"  – resolved here, no LLM call
+    "full"   – went through the LLM agents
+
+Measure agreement with the LLM path before tightening / loosening the
+thresholds:  python -m agents.test.pregate_agreement
+
+Config (env):
+    RAGOS_PREGATE                 1 = on (default 0 = off)
+    RAGOS_PREGATE_MAX_TOX         max toxicity              default 0.2
+    RAGOS_PREGATE_MAX_SARC        max sarcasm               default 0.4
+    RAGOS_PREGATE_MIN_SENT        min weighted sentiment    default 0.2
+    RAGOS_PREGATE_MIN_LINE_SENT   min per-line sentiment    default -0.5
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional
+
+
+def _env(key: str, default: float) -> float:
+    raw = os.getenv(key)
+    return float(raw) if raw else default
+
+
+class BenignGate:
+    def __init__(self, enabled: bool = False, max_tox: float = 0.2,
+                 max_sarc: float = 0.4, min_sent: float = 0.2,
+                 min_line_sent: float = -0.5) -> None:
+        self.enabled       = enabled
+        self.max_tox       = max_tox
+        self.max_sarc      = max_sarc
+        self.min_sent      = min_sent
+        self.min_line_sent = min_line_sent
+
+    @classmethod
+    def from_env(cls) -> "BenignGate":
+        return cls(enabled=os.getenv("RAGOS_PREGATE", "0") == "1",
+                   max_tox=_env("RAGOS_PREGATE_MAX_TOX", 0.2),
+                   max_sarc=_env("RAGOS_PREGATE_MAX_SARC", 0.4),
+                   min_sent=_env("RAGOS_PREGATE_MIN_SENT", 0.2),
+                   min_line_sent=_env("RAGOS_PREGATE_MIN_LINE_SENT", -0.5))
+
+    def config(self) -> Dict[str, Any]:
+        """Part of the result-cache version tag."""
+        return {"enabled": self.enabled, "max_tox": self.max_tox,
+                "max_sarc": self.max_sarc, "min_sent": self.min_sent,
+                "min_line_sent": self.min_line_sent}
+
+    # ─────────────────────────────────────────────── rules
+    def is_benign(self, ctx: Dict[str, Any]) -> bool:
+        if "sentiment_score" not in ctx or "toxicity" not in ctx:
+            return False                        # an HF agent failed → let the LLM look
+        lines = ctx.get("sentiment_scores") or []
+        return (float(ctx.get("toxicity", 1.0)) <= self.max_tox
+                and float(ctx.get("sarcasm", 1.0)) <= self.max_sarc
+                and float(ctx.get("sentiment_score", -1.0)) >= self.min_sent
+                and min(lines, default=0.0) >= self.min_line_sent)
+
+    @staticmethod
+    def score(ctx: Dict[str, Any]) -> int:
+        """Deterministic 1-10 score from the HF metrics."""
+        raw = (6.0 + 4.0 * float(ctx.get("sentiment_score", 0.0))
+               - 6.0 * float(ctx.get("toxicity", 0.0))
+               - 2.0 * float(ctx.get("sarcasm", 0.0)))
+        return max(1, min(10, round(raw)))
+
+    def decide(self, ctx: Dict[str, Any], force: bool = False) -> Optional[Dict[str, Any]]:
+        """LLM-stage output for benign ctx, else ``None`` (run the LLMs).
+        ``force`` evaluates the rules even when the gate is switched off."""
+        if not (self.enabled or force) or not self.is_benign(ctx):
+            return None
+        sc  = self.score(ctx)
+        cat = ctx.get("primary_category") or "Daily routine"
+        return {
+            "caregiver_score": sc,
+            "tone": sc,
+            "empathy": sc,
+            "responsiveness": sc,
+            "summary": f"{cat}: calm, positive interaction.",
+            "abuse_flag": False,
+            "justification": "Low toxicity and sarcasm, positive sentiment throughout.",
+            "send_notification": False,
+            "notify_reason": "Benign interaction (pre-gate).",
+            "parent_notification": "",
+            "recommendations": [],
+            "llm_path": "gated",
+        }
@@ -0,0 +1,168 @@
+# agents/orchestration/result_cache.py
+"""
+Content-addressed cache for whole ``Orchestrator.process_transcript`` runs.
+
+Parents and QA re-submit identical transcripts; a hit skips all four HF
+models and every Ollama call.
+
+• key    = sha256(normalised transcript, translation flag, version tag)
+• tier 1 = in-memory LRU (OrderedDict)
+• tier 2 = on-disk SQLite, shared by every process on the node
+• TTL on both tiers, size-bounded eviction (least recently used first)
+• hit / miss counters via ``stats()``
+• only derived fields are stored – the transcript text (``RAW_TEXT_KEYS``)
+  never reaches memory or disk; the caller puts it back on a hit
+
+Config (env):
+    RAGOS_RESULT_CACHE            "1" enables the cache           (default off)
+    RAGOS_RESULT_CACHE_PATH       SQLite file, "" = memory only   (data/result_cache.sqlite3)
+    RAGOS_RESULT_CACHE_TTL_S      default 86400
+    RAGOS_RESULT_CACHE_MEM_ITEMS  default 256
+    RAGOS_RESULT_CACHE_DISK_ITEMS default 20000
+"""
+from __future__ import annotations
+
+import copy, hashlib, json, logging, os, re, sqlite3, threading, time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("care_monitor")
+
+_WS_RE = re.compile(r"[ \t\r\f\v]+")
+
+# child / caregiver speech – not persisted, the key is only its hash
+RAW_TEXT_KEYS = ("transcript",)
+
+
+def normalize_transcript(text: str) -> str:
+    """Collapse whitespace runs and drop blank lines – formatting-only edits hit."""
+    lines = (_WS_RE.sub(" ", ln).strip() for ln in text.splitlines())
+    return "\n".join(ln for ln in lines if ln)
+
+
+def cache_key(transcript: str, translate: bool, version: str) -> str:
+    h = hashlib.sha256()
+    for part in (normalize_transcript(transcript), "1" if translate else "0", version):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path: Optional[str] = None, *, ttl_s: float = 86400.0,
+                 max_memory: int = 256, max_disk: int = 20000) -> None:
+        self.ttl        = ttl_s
+        self.max_memory = max(1, max_memory)
+        self.max_disk   = max(1, max_disk)
+        self._mem: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                        "puts": 0, "evictions": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False,
+                                       isolation_level=None)   # autocommit
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed)")
+
+    # ─────────────────────────────────────────────── API
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                created, value = item
+                if now - created <= self.ttl:
+                    self._mem.move_to_end(key)
+                    self._counts["memory_hits"] += 1
+                    return copy.deepcopy(value)
+                del self._mem[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM results WHERE key = ?",
+                    (key,)).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    self._db.execute("UPDATE results SET accessed = ? WHERE key = ?",
+                                     (now, key))
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self._counts["disk_hits"] += 1
+                    return copy.deepcopy(value)
+                if row is not None:
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+
+            self._counts["misses"] += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        value = copy.deepcopy({k: v for k, v in value.items() if k not in RAW_TEXT_KEYS})
+        with self._lock:
+            self._remember(key, now, value)
+            self._counts["puts"] += 1
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results(key, value, created, accessed)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, default=str), now, now))
+                self._evict_disk(now)
+            except sqlite3.Error:
+                logger.exception("[ResultCache] disk write failed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counts)
+            out["memory_items"] = len(self._mem)
+            if self._db is not None:
+                out["disk_items"] = self._db.execute(
+                    "SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = out["memory_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = round((lookups - out["misses"]) / lookups, 3) if lookups else 0.0
+        return out
+
+    # ─────────────────────────────────────────────── helpers (lock held)
+    def _remember(self, key: str, created: float, value: Dict[str, Any]) -> None:
+        self._mem[key] = (created, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_memory:
+            self._mem.popitem(last=False)
+            self._counts["evictions"] += 1
+
+    def _evict_disk(self, now: float) -> None:
+        cur = self._db.execute("DELETE FROM results WHERE created < ?",
+                               (now - self.ttl,))
+        self._counts["evictions"] += cur.rowcount
+        (count,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+        if count > self.max_disk:
+            cur = self._db.execute(
+                "DELETE FROM results WHERE key IN ("
+                " SELECT key FROM results ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_disk,))
+            self._counts["evictions"] += cur.rowcount
+
+
+def _env_num(key: str, default: float) -> float:
+    raw = os.getenv(key)
+    return float(raw) if raw else default
+
+
+def cache_from_env() -> Optional[ResultCache]:
+    if os.getenv("RAGOS_RESULT_CACHE", "0").lower() not in ("1", "true", "yes"):
+        return None
+    return ResultCache(
+        os.getenv("RAGOS_RESULT_CACHE_PATH", "data/result_cache.sqlite3"),
+        ttl_s=_env_num("RAGOS_RESULT_CACHE_TTL_S", 86400.0),
+        max_memory=int(_env_num("RAGOS_RESULT_CACHE_MEM_ITEMS", 256)),
+        max_disk=int(_env_num("RAGOS_RESULT_CACHE_DISK_ITEMS", 20000)),
+    )
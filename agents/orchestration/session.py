@@ -0,0 +1,248 @@
+# agents/orchestration/session.py
+"""
+Live sessions – incremental analysis for continuously produced transcripts.
+
+Devices push new transcript lines as they arrive.  Each batch of lines is
+parsed on its own and ONLY those utterances go through the HF agents; the
+session keeps per-line scores plus running aggregates:
+
+  • sentiment  – AnalyzerAgent's negative-weighted mean over all lines
+  • toxicity   – max over caregiver lines
+  • sarcasm    – max over caregiver lines
+
+The categorizer and the LLM stages (star review → notify decision →
+notification) run on the full transcript only when a trigger fires:
+
+  • "toxicity_spike"  a new caregiver line ≥ RAGOS_SESSION_TOX_TRIGGER   (0.7)
+  • "sarcasm_spike"   a new caregiver line ≥ RAGOS_SESSION_SARC_TRIGGER  (off)
+  • "every_n_lines"   RAGOS_SESSION_EVERY_N new utterances since last run (off)
+  • "session_end"     at end, unless an earlier run already saw every line
+
+    mgr  = SessionManager(get_orchestrator)
+    sess = await mgr.get("sess-1", "user_123")
+    snap = await sess.add("[00:01] Child: hi")
+    ctx  = await mgr.end("sess-1")          # same shape as process_transcript
+"""
+from __future__ import annotations
+
+import asyncio, logging, os, time
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.analysis.analyzer_agent import AnalyzerAgent
+from agents.analysis.transcript import ParsedTranscript
+from agents.executors import run_in
+
+logger = logging.getLogger("care_monitor")
+
+
+def _env_float(key: str, default: Optional[float]) -> Optional[float]:
+    raw = os.getenv(key)
+    if raw is None or raw == "":
+        return default
+    return None if raw.lower() in ("off", "none") else float(raw)
+
+
+class Triggers:
+    """When to run the LLM stages mid-session (``None`` = disabled)."""
+
+    def __init__(self, toxicity: Optional[float] = 0.7,
+                 sarcasm: Optional[float] = None,
+                 every_n: Optional[int] = None) -> None:
+        self.toxicity = toxicity
+        self.sarcasm  = sarcasm
+        self.every_n  = every_n
+
+    @classmethod
+    def from_env(cls) -> "Triggers":
+        every = _env_float("RAGOS_SESSION_EVERY_N", None)
+        return cls(toxicity=_env_float("RAGOS_SESSION_TOX_TRIGGER", 0.7),
+                   sarcasm=_env_float("RAGOS_SESSION_SARC_TRIGGER", None),
+                   every_n=int(every) if every else None)
+
+    def check(self, new_tox: List[float], new_sarc: List[float],
+              since_last: int) -> Optional[str]:
+        if self.toxicity is not None and any(s >= self.toxicity for s in new_tox):
+            return "toxicity_spike"
+        if self.sarcasm is not None and any(s >= self.sarcasm for s in new_sarc):
+            return "sarcasm_spike"
+        if self.every_n and since_last >= self.every_n:
+            return "every_n_lines"
+        return None
+
+
+class LiveSession:
+    """Per-line scores + running aggregates for one device session."""
+
+    def __init__(self, session_id: str, user_id: str, orch,
+                 triggers: Optional[Triggers] = None) -> None:
+        self.session_id = session_id
+        self.user_id    = user_id
+        self.orch       = orch
+        self.triggers   = triggers or Triggers.from_env()
+        self.started    = time.time()
+        self.touched    = self.started
+        self.ended      = False
+
+        self._chunks: List[str] = []
+        self.sentiment_scores: List[float] = []
+        self.toxicity_scores:  List[float] = []
+        self.sarcasm_scores:   List[float] = []
+        self._sent_wsum = 0.0
+        self._sent_w    = 0.0
+        self.toxicity   = 0.0
+        self.sarcasm    = 0.0
+
+        self.utterances      = 0
+        self._since_llm      = 0
+        self.llm_runs        = 0
+        self.last_llm: Dict[str, Any] = {}
+        self.notified   = False     # set by the API once a live alert went out
+        self._lock = asyncio.Lock()
+
+    # ─────────────────────────────────────────────── views
+    @property
+    def transcript(self) -> str:
+        return "\n".join(self._chunks)
+
+    def aggregates(self) -> Dict[str, Any]:
+        avg = self._sent_wsum / self._sent_w if self._sent_w else 0.0
+        return {
+            **AnalyzerAgent.labels(avg),
+            "sentiment_score":  round(avg, 3),
+            "sentiment_scores": list(self.sentiment_scores),
+            "toxicity":         round(self.toxicity, 3),
+            "toxicity_scores":  list(self.toxicity_scores),
+            "sarcasm":          round(self.sarcasm, 3),
+            "sarcasm_scores":   list(self.sarcasm_scores),
+        }
+
+    # ─────────────────────────────────────────────── incremental scoring
+    async def _score(self, tr: ParsedTranscript) -> Dict[str, List[float]]:
+        # agents fall back to the raw text when a view is empty – skip instead
+        has_care = any(tr.utterances[i].text for i in tr.caregiver_idx)
+        has_any  = any(u.text for u in tr.utterances)
+        o = self.orch
+        tasks = [
+            o.analyzer_agent.run_parsed(tr) if has_any  else None,
+            o.tox_agent.run_parsed(tr)      if has_care else None,
+            o.sarcasm_agent.run_parsed(tr)  if has_care else None,
+        ]
+        ana, tox, sar = await asyncio.gather(
+            *(t if t is not None else asyncio.sleep(0, {}) for t in tasks))
+        return {"sentiment": ana.get("sentiment_scores", []),
+                "toxicity":  tox.get("toxicity_scores", []),
+                "sarcasm":   sar.get("sarcasm_scores", [])}
+
+    async def add(self, text: str) -> Dict[str, Any]:
+        """Score only the new lines; run the LLM stages if a trigger fires."""
+        async with self._lock:
+            if self.ended:
+                return {"error": "Session already ended"}
+            self.touched = time.time()
+            lang = await run_in("translate", self.orch._detect_and_translate, text)
+            tr   = ParsedTranscript.parse(lang["transcript"])
+            if not tr.utterances:
+                return {"new_utterances": 0, **self.snapshot()}
+            self._chunks.append(lang["transcript"].strip("\n"))
+
+            new = await self._score(tr)
+            for s in new["sentiment"]:
+                w = AnalyzerAgent.weight(s)
+                self._sent_wsum += s * w
+                self._sent_w    += w
+            self.sentiment_scores.extend(new["sentiment"])
+            self.toxicity_scores.extend(new["toxicity"])
+            self.sarcasm_scores.extend(new["sarcasm"])
+            self.toxicity = max([self.toxicity, *new["toxicity"]])
+            self.sarcasm  = max([self.sarcasm,  *new["sarcasm"]])
+            self.utterances += len(tr.utterances)
+            self._since_llm += len(tr.utterances)
+
+            reason = self.triggers.check(new["toxicity"], new["sarcasm"],
+                                         self._since_llm)
+            if reason:
+                await self._run_llm(reason)
+            return {"new_utterances": len(tr.utterances),
+                    "new_scores": new, "trigger": reason, **self.snapshot()}
+
+    async def _run_llm(self, reason: str) -> Dict[str, Any]:
+        ctx: Dict[str, Any] = {"transcript": self.transcript, **self.aggregates()}
+        parsed = ParsedTranscript.parse(ctx["transcript"])
+        cat = await self.orch.categorizer_agent.run_parsed(parsed)
+        if isinstance(cat, dict):
+            ctx.update(cat)
+        await self.orch.run_llm_stages(ctx)
+        ctx["trigger"] = reason
+        self.last_llm   = ctx
+        self.llm_runs  += 1
+        self._since_llm = 0
+        logger.info("[LiveSession] %s LLM run #%d (%s)",
+                    self.session_id, self.llm_runs, reason)
+        return ctx
+
+    async def end(self) -> Dict[str, Any]:
+        """
+        Final full context – the same keys ``/analyze`` returns.  ``{}`` for
+        a session without utterances; a mid-session run that already covered
+        every line is reused instead of running the LLM stages again.
+        """
+        async with self._lock:
+            if not self.ended:
+                self.ended = True
+                if self._since_llm > 0:
+                    await self._run_llm("session_end")
+            if not self.utterances:
+                return {}
+            ctx = dict(self.last_llm)
+            ctx.pop("trigger", None)
+            return ctx
+
+    def snapshot(self) -> Dict[str, Any]:
+        llm_keys = ("caregiver_score", "send_notification", "notify_reason",
+                    "parent_notification", "primary_category", "trigger")
+        return {
+            "session_id": self.session_id,
+            "utterances": self.utterances,
+            "llm_runs":   self.llm_runs,
+            **{k: v for k, v in self.aggregates().items()
+               if not k.endswith("_scores")},
+            "llm": {k: self.last_llm[k] for k in llm_keys if k in self.last_llm},
+        }
+
+
+class SessionManager:
+    """Live sessions keyed by ``session_id``; idle ones are dropped."""
+
+    def __init__(self, orch_getter: Callable[[], Any],
+                 idle_s: Optional[float] = None) -> None:
+        self._orch_getter = orch_getter
+        self.idle_s = idle_s or float(os.getenv("RAGOS_SESSION_IDLE_S", 1800))
+        self._sessions: Dict[str, LiveSession] = {}
+
+    def _reap(self) -> None:
+        cutoff = time.time() - self.idle_s
+        for sid in [s for s, v in self._sessions.items() if v.touched < cutoff]:
+            logger.info("[SessionManager] dropping idle session %s", sid)
+            del self._sessions[sid]
+
+    async def get(self, session_id: str, user_id: str) -> LiveSession:
+        self._reap()
+        sess = self._sessions.get(session_id)
+        if sess is None:
+            orch = await asyncio.get_running_loop().run_in_executor(
+                None, self._orch_getter)
+            # another request may have created it while we were waiting
+            sess = self._sessions.setdefault(
+                session_id, LiveSession(session_id, user_id, orch))
+        if sess.user_id != user_id:
+            raise PermissionError("session belongs to another user")
+        return sess
+
+    def find(self, session_id: str) -> Optional[LiveSession]:
+        return self._sessions.get(session_id)
+
+    async def end(self, session_id: str) -> Dict[str, Any]:
+        sess = self._sessions.pop(session_id, None)
+        if sess is None:
+            return {"error": "Unknown session"}
+        return await sess.end()
@@ -0,0 +1,113 @@
+# agents/orchestration/speculative.py
+"""
+Speculative parent-notification drafts.
+
+Normally ResponseGenerator only starts after the notify decision came back
+true, so a flagged interaction waits for three sequential LLM calls.  When
+the HF signals are already high-risk we start the draft *next to* the
+decision and throw it away if the decision is negative:
+
+    separate mode – draft starts after StarReviewer (it sees the scores),
+                    in parallel with ShouldNotify
+    combined mode – draft starts in parallel with AssessorAgent
+
+Risk rule: toxicity ≥ RAGOS_SPECULATIVE_MIN_TOX (0.5), or weighted
+sentiment ≤ RAGOS_SPECULATIVE_MAX_SENT (-0.5), or abuse_flag already set.
+
+Tracked (``speculation_stats()``):
+    launched / used / wasted      – wasted_rate = wasted / launched; a draft
+                                    that is discarded, times out or fails
+                                    counts as wasted
+    saved_ms                      – time-to-notify gained on used drafts:
+                                    (decision + draft) − max(decision, draft end)
+
+Enable with RAGOS_SPECULATIVE_NOTIFY=1 (default off).
+"""
+from __future__ import annotations
+
+import asyncio, logging, os, threading, time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("care_monitor")
+
+_STATS = {"launched": 0, "used": 0, "wasted": 0, "saved_ms_sum": 0.0}
+_lock = threading.Lock()
+
+
+def _bump(**kw: float) -> None:
+    with _lock:
+        for k, v in kw.items():
+            _STATS[k] += v
+
+
+def speculation_stats() -> Dict[str, Any]:
+    with _lock:
+        s = dict(_STATS)
+    return {
+        "launched": s["launched"], "used": s["used"], "wasted": s["wasted"],
+        "wasted_rate": round(s["wasted"] / s["launched"], 3) if s["launched"] else 0.0,
+        "mean_saved_ms": round(s["saved_ms_sum"] / s["used"], 1) if s["used"] else 0.0,
+    }
+
+
+class Draft:
+    """A notification draft running next to the notify decision."""
+
+    def __init__(self, coro) -> None:
+        self.t0   = time.perf_counter()
+        self.done_at: Optional[float] = None
+        self.task = asyncio.ensure_future(coro)
+        self.task.add_done_callback(self._mark)
+
+    def _mark(self, _) -> None:
+        self.done_at = time.perf_counter()
+
+    async def use(self) -> Any:
+        """Decision was positive – wait for the draft, record the gain."""
+        decided = time.perf_counter()
+        try:
+            out = await self.task
+        except BaseException:                     # deadline cancel / agent error
+            _bump(wasted=1)
+            raise
+        done = self.done_at or time.perf_counter()
+        draft_ms = (done - self.t0) * 1000.0
+        # sequential: draft would have started at ``decided``
+        saved = draft_ms - max(0.0, (done - decided) * 1000.0)
+        _bump(used=1, saved_ms_sum=saved)
+        logger.info("[Speculative] draft used, %.0f ms saved", saved)
+        return out
+
+    def discard(self) -> None:
+        """Decision was negative – cancel if still running, count as wasted."""
+        self.task.cancel()
+        _bump(wasted=1)
+
+
+class SpeculativeNotifier:
+    def __init__(self, resp_agent, enabled: bool = False,
+                 min_tox: float = 0.5, max_sent: float = -0.5) -> None:
+        self.resp_agent = resp_agent
+        self.enabled    = enabled
+        self.min_tox    = min_tox
+        self.max_sent   = max_sent
+
+    @classmethod
+    def from_env(cls, resp_agent) -> "SpeculativeNotifier":
+        return cls(resp_agent,
+                   enabled=os.getenv("RAGOS_SPECULATIVE_NOTIFY", "0") == "1",
+                   min_tox=float(os.getenv("RAGOS_SPECULATIVE_MIN_TOX", 0.5)),
+                   max_sent=float(os.getenv("RAGOS_SPECULATIVE_MAX_SENT", -0.5)))
+
+    def high_risk(self, ctx: Dict[str, Any]) -> bool:
+        return (float(ctx.get("toxicity", 0.0)) >= self.min_tox
+                or float(ctx.get("sentiment_score", 0.0)) <= self.max_sent
+                or bool(ctx.get("abuse_flag", False)))
+
+    def maybe_start(self, ctx: Dict[str, Any]) -> Optional[Draft]:
+        if not self.enabled or not self.high_risk(ctx):
+            return None
+        _bump(launched=1)
+        # snapshot: the agent skips drafting when send_notification is False
+        snap = self.resp_agent.messages({**ctx, "send_notification": True})
+        return Draft(self.resp_agent.run(snap))
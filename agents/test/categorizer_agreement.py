@@ -0,0 +1,97 @@
+# agents/test/categorizer_agreement.py
+"""
+Accuracy of a candidate categorizer set-up measured against flat BART
+zero-shot (default candidate: label-embedding engine, flat mode).
+
+BART's answer is treated as the reference; for every fixture transcript
+both run and we report:
+  • top-1 label agreement
+  • category-group agreement
+  • BART label inside the candidate top-3
+  • mean latency of each
+
+$ python -m agents.test.categorizer_agreement \
+        --fixtures backend/all_analysis_results.json --limit 100
+$ python -m agents.test.categorizer_agreement --engine zeroshot --mode hierarchical
+"""
+import argparse, asyncio, json, time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from agents.analysis.categorizer_agent import CategorizerAgent
+from agents.analysis.transcript import ParsedTranscript
+
+
+def _load_fixtures(path: str, limit: int) -> List[str]:
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    seen, out = set(), []
+    for item in raw:
+        txt = item if isinstance(item, str) else item.get("transcript", "")
+        if txt.strip() and txt not in seen:
+            seen.add(txt)
+            out.append(txt)
+    return out[:limit] if limit else out
+
+
+async def _run(agent: CategorizerAgent, tr: ParsedTranscript) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    res = await agent.run_parsed(tr)
+    res["_ms"] = (time.perf_counter() - t0) * 1000.0
+    # full ranking for the top-3 check
+    res["_top3"] = [res.get("primary_category")] + res.get("secondary_categories", [])
+    return res
+
+
+async def compare(transcripts: List[str], engine: str = "embedding",
+                  mode: str = "flat") -> Dict[str, Any]:
+    bart = CategorizerAgent(engine="zeroshot", mode="flat")
+    emb  = CategorizerAgent(engine=engine, mode=mode)
+
+    rows = []
+    for txt in transcripts:
+        tr = ParsedTranscript.parse(txt)
+        ref, alt = await _run(bart, tr), await _run(emb, tr)
+        rows.append({
+            "bart": ref.get("primary_category"),
+            "candidate": alt.get("primary_category"),
+            "top1": ref.get("primary_category") == alt.get("primary_category"),
+            "group": ref.get("category_group") == alt.get("category_group"),
+            "top3": ref.get("primary_category") in alt["_top3"],
+            "bart_ms": ref["_ms"],
+            "candidate_ms": alt["_ms"],
+        })
+
+    n = len(rows) or 1
+    return {
+        "candidate": {"engine": engine, "mode": mode},
+        "fixtures": len(rows),
+        "top1_agreement":  round(sum(r["top1"] for r in rows) / n, 3),
+        "group_agreement": round(sum(r["group"] for r in rows) / n, 3),
+        "top3_recall":     round(sum(r["top3"] for r in rows) / n, 3),
+        "bart_mean_ms":      round(sum(r["bart_ms"] for r in rows) / n, 1),
+        "candidate_mean_ms": round(sum(r["candidate_ms"] for r in rows) / n, 1),
+        "rows": rows,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixtures", default="backend/all_analysis_results.json")
+    ap.add_argument("--limit", type=int, default=0)
+    ap.add_argument("--engine", default="embedding", choices=["embedding", "zeroshot"])
+    ap.add_argument("--mode", default="flat", choices=["flat", "hierarchical"])
+    ap.add_argument("--out", default="data/tests/categorizer_agreement.json")
+    args = ap.parse_args()
+
+    report = asyncio.run(compare(_load_fixtures(args.fixtures, args.limit),
+                                 engine=args.engine, mode=args.mode))
+    summary = {k: v for k, v in report.items() if k != "rows"}
+    print(json.dumps(summary, indent=2))
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
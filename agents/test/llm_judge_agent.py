@@ -56,4 +56,4 @@ class LLMEvaluatorAgent(BaseAgent):
             prompt += f"  * {rec['category']}: {rec['description']}\n"
         prompt += "\nProvide your JSON feedback now."
 
-        return self._query_ollama(prompt)
+        return await self._aquery_ollama(prompt)
@@ -0,0 +1,112 @@
+# agents/test/pregate_agreement.py
+"""
+Offline agreement of the benign pre-gate with the full LLM path.
+
+Stored analysis results already carry both the HF metrics (the gate's
+input) and the LLM answers (caregiver_score, send_notification,
+abuse_flag), so no model has to run.  For every record that went through
+the LLMs we ask the gate and report:
+  • coverage          – share of records the gate would resolve
+  • missed_notify     – gated records where the LLM DID notify  (must be 0)
+  • missed_abuse      – gated records the LLM flagged as abuse  (must be 0)
+  • score MAE / ±1    – deterministic score vs LLM caregiver_score
+  • llm_calls_saved   – StarReviewer + ShouldNotify per gated record
+
+$ python -m agents.test.pregate_agreement
+$ python -m agents.test.pregate_agreement --max-tox 0.3 --min-sent 0.0
+$ python -m agents.test.pregate_agreement --sweep
+"""
+import argparse, itertools, json
+from pathlib import Path
+from typing import Any, Dict, List
+
+from agents.orchestration.pregate import BenignGate
+
+
+def _load_records(path: str) -> List[Dict[str, Any]]:
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [r for r in raw
+            if isinstance(r, dict) and "caregiver_score" in r
+            and "send_notification" in r and r.get("llm_path", "full") == "full"]
+
+
+def evaluate(records: List[Dict[str, Any]], gate: BenignGate) -> Dict[str, Any]:
+    rows = []
+    for r in records:
+        out = gate.decide(r, force=True)
+        if out is None:
+            continue
+        rows.append({
+            "id": r.get("id") or r.get("doc_id"),
+            "gate_score": out["caregiver_score"],
+            "llm_score": int(r["caregiver_score"]),
+            "llm_notify": bool(r["send_notification"]),
+            "llm_abuse": bool(r.get("abuse_flag", False)),
+        })
+
+    n, g = len(records) or 1, len(rows) or 1
+    diffs = [abs(x["gate_score"] - x["llm_score"]) for x in rows]
+    return {
+        "gate": gate.config(),
+        "records": len(records),
+        "gated": len(rows),
+        "coverage": round(len(rows) / n, 3),
+        "missed_notify": sum(x["llm_notify"] for x in rows),
+        "missed_abuse": sum(x["llm_abuse"] for x in rows),
+        "notify_agreement": round(sum(not x["llm_notify"] for x in rows) / g, 3),
+        "score_mae": round(sum(diffs) / g, 2),
+        "score_within_1": round(sum(d <= 1 for d in diffs) / g, 3),
+        "llm_calls_saved": 2 * len(rows),
+        "rows": rows,
+    }
+
+
+def sweep(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Coverage vs. safety over a small threshold grid (safe rows first)."""
+    out = []
+    for tox, sarc, sent in itertools.product((0.1, 0.2, 0.3, 0.5),
+                                             (0.3, 0.4, 0.5),
+                                             (0.0, 0.2, 0.4)):
+        rep = evaluate(records, BenignGate(max_tox=tox, max_sarc=sarc, min_sent=sent))
+        out.append({k: v for k, v in rep.items() if k != "rows"})
+    out.sort(key=lambda r: (r["missed_notify"] + r["missed_abuse"], -r["coverage"]))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixtures", default="backend/all_analysis_results.json")
+    ap.add_argument("--max-tox", type=float, default=None)
+    ap.add_argument("--max-sarc", type=float, default=None)
+    ap.add_argument("--min-sent", type=float, default=None)
+    ap.add_argument("--min-line-sent", type=float, default=None)
+    ap.add_argument("--sweep", action="store_true")
+    ap.add_argument("--out", default="data/tests/pregate_agreement.json")
+    args = ap.parse_args()
+
+    records = _load_records(args.fixtures)
+    if args.sweep:
+        report: Any = sweep(records)
+        for r in report[:10]:
+            g = r["gate"]
+            print(f"tox≤{g['max_tox']:<4} sarc≤{g['max_sarc']:<4} sent≥{g['min_sent']:<4} "
+                  f"coverage {r['coverage']:.3f}  missed notify/abuse "
+                  f"{r['missed_notify']}/{r['missed_abuse']}  MAE {r['score_mae']}")
+    else:
+        env = BenignGate.from_env()
+        gate = BenignGate(
+            max_tox=env.max_tox if args.max_tox is None else args.max_tox,
+            max_sarc=env.max_sarc if args.max_sarc is None else args.max_sarc,
+            min_sent=env.min_sent if args.min_sent is None else args.min_sent,
+            min_line_sent=(env.min_line_sent if args.min_line_sent is None
+                           else args.min_line_sent))
+        report = evaluate(records, gate)
+        print(json.dumps({k: v for k, v in report.items() if k != "rows"}, indent=2))
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# agents/utterance_cache.py
+"""
+Bounded per-model cache of utterance-level pipeline outputs.
+
+Daycare transcripts repeat the same short phrases ("Good job!", "Time for
+bed", "Stop that") across lines, requests and users.  ``MicroBatcher``
+looks every utterance up here first and only sends misses to the model.
+
+Keys are the whitespace-normalised text plus the call kwargs (top_k, labels
+…), so different call shapes never share entries.  Cached values are shared
+between callers – treat them as read-only.
+
+Size (env): RAGOS_UTTERANCE_CACHE_ITEMS  per model, default 4096, 0 = off
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def normalize_utterance(text: str) -> str:
+    return " ".join(text.split())
+
+
+class UtteranceCache:
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = max(1, maxsize)
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock  = threading.Lock()
+        self.hits   = 0
+        self.misses = 0
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        out: List[Optional[Any]] = []
+        with self._lock:
+            for k in keys:
+                v = self._data.get(k)
+                if v is None:
+                    self.misses += 1
+                else:
+                    self._data.move_to_end(k)
+                    self.hits += 1
+                out.append(v)
+        return out
+
+    def put_many(self, keys: List[str], values: List[Any]) -> None:
+        with self._lock:
+            for k, v in zip(keys, values):
+                self._data[k] = v
+                self._data.move_to_end(k)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"items": len(self._data), "hits": self.hits,
+                    "misses": self.misses,
+                    "hit_rate": round(self.hits / total, 3) if total else 0.0}
@@ -0,0 +1,99 @@
+# agents/warmup.py
+"""
+Eager model preloading + readiness registry.
+
+``warm_up()`` loads every hf_cache pipeline in parallel and pushes a dummy
+batch through each, so the first real request does not pay for download,
+weight loading and kernel warm-up.  ``readiness()`` is what ``/ready``
+returns; load balancers should only route to a node once it is ready.
+
+    from agents.warmup import warm_up, readiness
+    warm_up()                 # blocking; run it in a background thread
+    readiness()["ready"]      # True once every component is warm
+
+States: pending → loading → ready | failed | degraded (loaded a stand-in,
+e.g. the constant sarcasm fallback – serves requests, but not ready).
+"""
+from __future__ import annotations
+
+import logging, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from agents.hf_batching import PIPELINES
+
+logger = logging.getLogger("care_monitor")
+
+_DUMMY = ["Good job, sweetheart!", "Stop that right now.", "Time for bed."]
+_LABELS = ["Bedtime Routine", "Praising", "Scolding"]
+
+_status: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _set(name: str, **fields) -> None:
+    with _lock:
+        _status.setdefault(name, {"state": "pending"}).update(fields)
+
+
+def track(name: str, fn: Callable[[], Any]) -> Any:
+    """Run ``fn`` and record it as a readiness component (state + timing)."""
+    _set(name, state="loading", error=None)
+    t0 = time.perf_counter()
+    try:
+        out = fn()
+    except Exception as exc:
+        _set(name, state="failed", error=str(exc),
+             load_s=round(time.perf_counter() - t0, 2))
+        logger.exception("[warmup] %s failed", name)
+        raise
+    if getattr(out, "is_fallback", False):
+        _set(name, state="degraded", error=getattr(out, "load_error", "fallback"),
+             load_s=round(time.perf_counter() - t0, 2))
+        logger.warning("[warmup] %s degraded – serving a fallback", name)
+    else:
+        _set(name, state="ready", load_s=round(time.perf_counter() - t0, 2))
+    return out
+
+
+def _warm_pipeline(name: str) -> None:
+    def load_and_run():
+        pipe = PIPELINES[name]()
+        if name == "categorizer":
+            pipe(_DUMMY, candidate_labels=_LABELS, multi_label=False)
+        else:
+            pipe(_DUMMY, top_k=None, batch_size=len(_DUMMY))
+        return pipe
+    track(name, load_and_run)
+
+
+def _warm_embedder() -> None:
+    from agents.hf_cache import get_embedder
+    track("embedding", lambda: get_embedder()(_DUMMY))
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Load + warm every pipeline in parallel; returns ``readiness()``."""
+    names = list(names or PIPELINES)
+    jobs: Dict[str, Callable[[], None]] = {n: (lambda n=n: _warm_pipeline(n))
+                                          for n in names}
+    if os.getenv("RAGOS_CATEGORIZER_ENGINE", "zeroshot").lower() == "embedding":
+        jobs["embedding"] = _warm_embedder
+    for n in jobs:
+        _set(n, state="pending")
+
+    with ThreadPoolExecutor(max_workers=len(jobs),
+                            thread_name_prefix="ragos-warmup") as pool:
+        for fut in [pool.submit(fn) for fn in jobs.values()]:
+            try:
+                fut.result()
+            except Exception:
+                pass                              # already recorded as failed
+    return readiness()
+
+
+def readiness() -> Dict[str, Any]:
+    with _lock:
+        models = {n: dict(s) for n, s in _status.items()}
+    ready = bool(models) and all(s["state"] == "ready" for s in models.values())
+    return {"ready": ready, "models": models}
@@ -3,6 +3,7 @@
 import asyncio
 import json
 import logging
+import os
 from typing import Dict, Any, List
 
 import nest_asyncio
@@ -33,6 +34,8 @@ except ImportError:
 
 # ‑‑‑ Local agents ─────────────────────────────────────────────────────────
 from agents.orchestration.orchestrator import Orchestrator
+from agents.analysis.transcript import ParsedTranscript
+from agents.orchestration.result_cache import cache_key
 from agents.test.evaluator_agent import evaluate_models
 from agents.test.llm_judge_agent import LLMEvaluatorAgent
 
@@ -186,43 +189,51 @@ elif page == "Analyze":
         st.session_state.show_sarcasm = False
         st.session_state.show_eval = False
 
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        ctx: Dict[str, Any] = {"transcript": txt.strip()}
-
-        # ‑‑‑ FAST ANALYSIS ----------------------------------------------------
-        with st.spinner("Computing quick results …"):
-            t_res, a_res, c_res, s_res = loop.run_until_complete(
-                asyncio.gather(
-                    orch.tox_agent.run([{"content": json.dumps({"transcript": txt})}]),   # NEW
-                    orch.analyzer_agent.run([{"content": json.dumps({"transcript": txt})}]),
-                    orch.categorizer_agent.run([{"content": json.dumps({"transcript": txt})}]),
-                    orch.sarcasm_agent.run([{"content": json.dumps({"transcript": txt})}]),
+        key = cache_key(txt.strip(), auto_tr, orch.version_tag + ":streamlit")
+        cached = orch.cache.get(key) if orch.cache else None
+        if cached is not None:
+            ctx = {**cached, "transcript": txt.strip()}   # cache stores no text
+        else:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            ctx: Dict[str, Any] = {"transcript": txt.strip()}
+
+            # ‑‑‑ FAST ANALYSIS ----------------------------------------------------
+            with st.spinner("Computing quick results …"):
+                parsed = ParsedTranscript.parse(txt)
+                t_res, a_res, c_res, s_res = loop.run_until_complete(
+                    asyncio.gather(
+                        orch.tox_agent.run_parsed(parsed),   # NEW
+                        orch.analyzer_agent.run_parsed(parsed),
+                        orch.categorizer_agent.run_parsed(parsed),
+                        orch.sarcasm_agent.run_parsed(parsed),
+                    )
                 )
-            )
-            ctx.update(t_res)      # NEW
-            ctx.update(a_res)
-            ctx.update(c_res)
-            ctx.update(s_res)   
+                ctx.update(t_res)      # NEW
+                ctx.update(a_res)
+                ctx.update(c_res)
+                ctx.update(s_res)   
 
             
 
-        # ‑‑‑ HEAVY ANALYSIS ---------------------------------------------------
+            # ‑‑‑ HEAVY ANALYSIS ---------------------------------------------------
         
-        with st.spinner("Running detailed insights …"):
-            star_raw = loop.run_until_complete(orch.star_reviewer_agent.run(ctx))
-            star = json.loads(star_raw) if isinstance(star_raw, str) else star_raw
-            ctx.update(star)
-
-            heavy = loop.run_until_complete(
-                asyncio.gather(
-                    orch.response_generator_agent.run([{"content": json.dumps(ctx)}]),
+            with st.spinner("Running detailed insights …"):
+                star_raw = loop.run_until_complete(orch.star_reviewer_agent.run(ctx))
+                star = json.loads(star_raw) if isinstance(star_raw, str) else star_raw
+                ctx.update(star)
+
+                heavy = loop.run_until_complete(
+                    asyncio.gather(
+                        orch.response_generator_agent.run([{"content": json.dumps(ctx)}]),
+                    )
                 )
-            )
-            loop.close()
-            for res in heavy:
-                if isinstance(res, dict):
-                    ctx.update(res)
+                loop.close()
+                for res in heavy:
+                    if isinstance(res, dict):
+                        ctx.update(res)
+            if orch.cache and "error" not in ctx:
+                orch.cache.put(key, ctx)
 
         # -- JSON EXPORT --------------------------------------------------------
 
@@ -430,20 +441,64 @@ elif page == "Analyze":
 # =============================================================================
 elif page == "Trends":
     st.markdown("## Trends Over Time")
-    data = {
-        "Week": ["W1", "W2", "W3", "W4"],
-        "Nutrition": [5, 6, 7, 8],
-        "Health": [3, 4, 4, 5],
-        "Learning": [4, 5, 6, 7],
-    }
-    df = pd.DataFrame(data).melt("Week", var_name="Category", value_name="Count")
-    fig = px.line(
-        df,
-        x="Week",
-        y="Count",
-        color="Category",
-        markers=True,
-        color_discrete_sequence=px.colors.qualitative.Pastel,
+    api_url = os.getenv("RAGOS_API_URL", "http://localhost:8000")
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    user_id = c1.text_input("User ID", value=st.session_state.get("trends_user", ""))
+    st.session_state.trends_user = user_id
+    span = c2.selectbox("Range", ["7 days", "30 days", "90 days", "1 year"], index=1)
+    gran = c3.selectbox("Granularity", ["hour", "day", "week"], index=1)
+    metrics = st.multiselect(
+        "Metrics",
+        ["sentiment_score", "toxicity", "sarcasm", "caregiver_score",
+         "tone", "empathy", "responsiveness"],
+        default=["sentiment_score", "toxicity"],
     )
-    fig.update_layout(margin=dict(t=20, b=40, l=40, r=20))
-    st.plotly_chart(fig, use_container_width=True)
+
+    if user_id and metrics:
+        days = {"7 days": 7, "30 days": 30, "90 days": 90, "1 year": 365}[span]
+        end = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            r = requests.get(
+                f"{api_url}/trends/{user_id}",
+                params={
+                    "start": (end - datetime.timedelta(days=days)).isoformat(),
+                    "end": end.isoformat(),
+                    "granularity": gran,
+                    "metrics": ",".join(metrics),
+                    "max_points": 200,          # server-side downsampling
+                },
+                timeout=15,
+            )
+            r.raise_for_status()
+            data = r.json()["data"]
+        except Exception as e:
+            st.error(f"Could not load trends: {e}")
+            data = None
+
+        if data:
+            t = pd.to_datetime(data["t"])
+            if data["downsample_factor"] > 1:
+                st.caption(f"{data['downsample_factor']} × {gran} per point")
+
+            df = pd.DataFrame({"Time": t, **{m: data["metrics"][m]["mean"] for m in metrics}})
+            df = df.melt("Time", var_name="Metric", value_name="Mean")
+            fig = px.line(
+                df, x="Time", y="Mean", color="Metric", markers=True,
+                color_discrete_sequence=px.colors.qualitative.Pastel,
+            )
+            fig.update_layout(margin=dict(t=20, b=40, l=40, r=20))
+            st.plotly_chart(fig, use_container_width=True)
+
+            if data["groups"]:
+                st.markdown("### Interactions per Category")
+                gdf = pd.DataFrame({"Time": t, **data["groups"]})
+                gdf = gdf.melt("Time", var_name="Category", value_name="Count")
+                fig = px.bar(
+                    gdf, x="Time", y="Count", color="Category",
+                    color_discrete_sequence=px.colors.qualitative.Pastel,
+                )
+                fig.update_layout(margin=dict(t=20, b=40, l=40, r=20))
+                st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Enter a user ID and pick at least one metric.")
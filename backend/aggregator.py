@@ -1,26 +1,37 @@
 # backend/aggregator.py  (tam dosya)
 
+import os
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any
-from firebase.firebase_init import db
 from google.cloud.firestore_v1 import DocumentSnapshot
 
-NUMERIC_KEYS = {
-    "sentiment_score", "toxicity", "sarcasm",
-    "caregiver_score", "tone", "empathy", "responsiveness",
-}
+from backend.rollups import (LEGACY_TS_SCAN, NUMERIC_KEYS, TIERS, _client, add_doc,
+                             bucket_start, read_buckets, combine, means)
 
-def _collect_since(user_id: str, since: datetime) -> List[Dict[str, Any]]:
-    coll = (db.collection("users")
+# rollups (default) → ≤168 hour-bucket reads + the docs of 3 edge hours;
+# scan → every analysis doc of the week (eski yol).  Same response either way.
+AGGREGATE_SOURCE = os.getenv("RAGOS_AGGREGATE_SOURCE", "rollups")
+# LEGACY_TS_SCAN (RAGOS_LEGACY_TS_SCAN, see backend/rollups.py) only matters
+# here with RAGOS_AGGREGATE_SOURCE=scan; the rollup path gets legacy docs via
+# ``rollups.rebuild``, which honours the same flag.
+
+WINDOWS = {"hourly": timedelta(hours=1), "daily": timedelta(days=1), "weekly": timedelta(days=7)}
+
+def _collect_since(user_id: str, since: datetime, client=None) -> List[Dict[str, Any]]:
+    coll = (_client(client).collection("users")
               .document(user_id)
               .collection("analysis_results"))
     # Eğer Firestore’ da string timestamp’ler de varsa ikili sorgu mümkün değil.
     # Çözüm: önce Timestamp tipinde sorgula, sonra string’leri filtrele.
     qs = coll.where("timestamp", ">=", since)
     docs = [d.to_dict() for d in qs.stream()]
+    if not LEGACY_TS_SCAN:
+        return docs
 
-    # Ek olarak elde kalan string timestamp kayıtlarını manuel filtrele
-    iso_docs = [d.to_dict() for d in coll.where("timestamp", "==", None).stream()]  # None olup olmadığına bakma hilesi
+    # Ek olarak elde kalan string timestamp kayıtlarını manuel filtrele.
+    # Firestore önce tipe göre sıralar: ">= ''" yalnızca string değerleri döndürür
+    # (eski "== None" sorgusu hiçbir string kaydı yakalamıyordu).
+    iso_docs = [d.to_dict() for d in coll.where("timestamp", ">=", "").stream()]
     for d in iso_docs:
         try:
             ts = datetime.fromisoformat(d["timestamp"]).replace(tzinfo=timezone.utc)
@@ -35,9 +46,47 @@ def _round(x: float) -> float:      return round(x, 1)
 def _label(v: float) -> str:
     return "positive" if v > 0.2 else "negative" if v < -0.2 else "neutral"
 
-def compute_aggregates(user_id: str) -> Dict[str, Any]:
+def compute_aggregates(user_id: str, client=None) -> Dict[str, Any]:
+    if AGGREGATE_SOURCE == "scan":
+        return _aggregates_from_scan(user_id, client)
+    return _aggregates_from_rollups(user_id, client)
+
+def _edge(user_id: str, cut: datetime, client=None) -> Dict[str, Any]:
+    """Docs of the partial hour ``[cut, end of its bucket)`` as one bucket."""
+    end = bucket_start(cut) + TIERS["hourly"][2]
+    qs  = (_client(client).collection("users").document(user_id)
+             .collection("analysis_results")
+             .where("timestamp", ">=", cut).where("timestamp", "<", end))
+    edge: Dict[str, Any] = {"count": 0}
+    for d in qs.stream():
+        add_doc(edge, d.to_dict())
+    return edge
+
+def _aggregates_from_rollups(user_id: str, client=None) -> Dict[str, Any]:
+    """
+    Exact ``now - span`` windows like the scan path: whole hour buckets
+    starting at/after the cut come from rollups, the partial hour before
+    them from its raw docs – ≤168 bucket reads plus three edge hours.
+    """
+    now  = datetime.now(timezone.utc)
+    week = read_buckets(user_id, now - WINDOWS["weekly"], client=client)
+
+    out: Dict[str, Any] = {}
+    for win, span in WINDOWS.items():
+        cut   = now - span
+        parts = [b for b in week if b["bucket_start"] >= cut]
+        if bucket_start(cut) < cut:                       # unaligned → partial edge hour
+            parts.append(_edge(user_id, cut, client))
+        total = combine(parts)
+        agg: Dict[str, Any] = {k: _round(v) for k, v in means(total).items()}
+        agg["count"]           = total["count"]
+        agg["sentiment_label"] = _label(agg["sentiment_score"])
+        out[win] = agg
+    return out
+
+def _aggregates_from_scan(user_id: str, client=None) -> Dict[str, Any]:
     now, week = datetime.now(timezone.utc), timedelta(days=7)
-    docs = _collect_since(user_id, now - week)
+    docs = _collect_since(user_id, now - week, client)
 
     hourly_cut = now - timedelta(hours=1)
     daily_cut  = now - timedelta(days=1)
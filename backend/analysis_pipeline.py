@@ -1,10 +1,13 @@
 """Lightweight wrapper around your existing Orchestrator class.
    ‑ Finds the orchestrator automatically so you *don’t* have to touch imports.
+   ‑ Builds it lazily; ``startup()`` preloads + warms every model up front.
 """
 from __future__ import annotations
 
-import importlib, asyncio, logging
-from typing import Dict, Any
+import importlib, asyncio, logging, threading
+from typing import Dict, Any, Optional
+
+from agents.warmup import track, warm_up
 
 logger = logging.getLogger("ragos.analysis_pipeline")
 
@@ -17,27 +20,50 @@ CANDIDATE_PATHS = [
     "orchestrator",  # root‑level file (uploaded example)
 ]
 
-orchestrator = None
-for mod_name in CANDIDATE_PATHS:
-    try:
-        mod = importlib.import_module(mod_name)
-        orchestrator = mod.Orchestrator()
-        logger.info("Loaded Orchestrator from %s", mod_name)
-        break
-    except (ImportError, AttributeError):
-        continue
-if orchestrator is None:  # pragma: no cover
+_orchestrator = None
+_orch_lock = threading.Lock()
+
+
+def get_orchestrator():
+    """Build the Orchestrator on first use (models may already be warm)."""
+    global _orchestrator
+    if _orchestrator is not None:
+        return _orchestrator
+    with _orch_lock:
+        if _orchestrator is None:
+            _orchestrator = track("orchestrator", _build_orchestrator)
+    return _orchestrator
+
+
+def _build_orchestrator():
+    for mod_name in CANDIDATE_PATHS:
+        try:
+            mod = importlib.import_module(mod_name)
+            orch = mod.Orchestrator()
+            logger.info("Loaded Orchestrator from %s", mod_name)
+            return orch
+        except (ImportError, AttributeError):
+            continue
     raise ImportError("Could not find an Orchestrator implementation – checked: " + ", ".join(CANDIDATE_PATHS))
 
+
+def startup() -> None:
+    """Blocking warm-up: load + warm all pipelines in parallel, then build."""
+    warm_up()
+    get_orchestrator()
+
 # ---------------------------------------------------------------------------
 #  Async helper – run pipeline
 # ---------------------------------------------------------------------------
-async def run_pipeline_async(transcript: str) -> Dict[str, Any]:
+async def run_pipeline_async(transcript: str,
+                             deadline_ms: Optional[float] = None) -> Dict[str, Any]:
     """Ensures Orchestrator.process_transcript gets an event‑loop.
     Works whether that method is async or sync.
+    ``deadline_ms`` – request budget for the LLM stages (None → env default).
     """
+    loop = asyncio.get_running_loop()
+    orchestrator = await loop.run_in_executor(None, get_orchestrator)
     if asyncio.iscoroutinefunction(orchestrator.process_transcript):
-        return await orchestrator.process_transcript(transcript)  # type: ignore[arg‑type]
+        return await orchestrator.process_transcript(transcript, deadline_ms=deadline_ms)  # type: ignore[arg‑type]
     # fallback: run in thread
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, orchestrator.process_transcript, transcript)  # type: ignore[arg‑type]
\ No newline at end of file
+    return await loop.run_in_executor(None, orchestrator.process_transcript, transcript)  # type: ignore[arg‑type]
@@ -1,15 +1,15 @@
 """FastAPI entry-point for the RAGOS Care-Monitor backend."""
 from __future__ import annotations
 
-import os, uuid, logging, asyncio, json
+import os, uuid, logging, asyncio, json, threading
 from typing import Dict, Any
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Request, UploadFile
+from fastapi import FastAPI, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel, Field
 
 # ─── Google Firestore --------------------------------------------------------
@@ -17,11 +17,20 @@ from google.cloud import firestore_v1 as fs            # NEW alias
 from google.cloud.firestore_v1 import SERVER_TIMESTAMP
 
 # ─── Local modules -----------------------------------------------------------
-from backend.timeline import update_timeline
+from backend.timeline import card_view, timeline_stats
 from backend.aggregator import compute_aggregates
-from backend.analysis_pipeline import orchestrator, run_pipeline_async  # adjust import if path differs
+from backend.rollups import record_analysis
+from backend.trends import compute_trends
+from backend.analysis_pipeline import run_pipeline_async, get_orchestrator, startup as warm_pipeline
+from agents.warmup import readiness
+from agents.executors import run_in
+from agents.orchestration.session import SessionManager
+from agents.orchestration.speculative import speculation_stats
+from agents.llm.base_agent import llm_metrics
 
 from backend.notifier import send_parent_notification
+from backend.work_queue import WorkQueue
+from backend import outbox
 
 # -----------------------------------------------------------------------------
 #  ENV & Logging
@@ -40,9 +49,9 @@ logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(m
 #  Firestore init  (expects firebase_init.py to expose `db`)
 # -----------------------------------------------------------------------------
 try:
-    from firebase.firebase_init import db  # type: ignore
+    from firebase.firebase_init import db, adb  # type: ignore
 except Exception as e:
-    raise ImportError("firebase/firebase_init.py must expose Firestore `db`: " + str(e))
+    raise ImportError("firebase/firebase_init.py must expose Firestore `db` / `adb`: " + str(e))
 
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "analysis_results")
 
@@ -58,6 +67,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Eager warm-up: load all pipelines in parallel + dummy batch, off the loop
+# so /health answers immediately.  RAGOS_EAGER_WARMUP=0 keeps it lazy.
+@app.on_event("startup")
+async def _warm_models() -> None:
+    if os.getenv("RAGOS_EAGER_WARMUP", "1") != "0":
+        threading.Thread(target=warm_pipeline, name="ragos-warmup",
+                         daemon=True).start()
+
+# timeline merge + parent notification run here, after the response
+work_queue = WorkQueue.from_env()
+
+@app.on_event("startup")
+async def _start_queue() -> None:
+    await work_queue.start()
+    if outbox.SWEEP_S > 0:
+        app.state.outbox_sweeper = asyncio.create_task(_sweep_outbox())
+
+@app.on_event("shutdown")
+async def _drain_queue() -> None:
+    sweeper = getattr(app.state, "outbox_sweeper", None)
+    if sweeper is not None:
+        sweeper.cancel()
+    await work_queue.stop()
+
+async def _sweep_outbox() -> None:
+    """Replay side-effects lost from the in-memory queue (restart / crash)."""
+    while True:
+        try:
+            for item in await run_in("io", outbox.claim_stale):
+                await work_queue.submit(f"replay:{item['task']}", outbox.run_task,
+                                        item["task"], item["user_id"], item["result_id"],
+                                        item["ts_server"])
+        except Exception:
+            logger.exception("[Outbox] sweep failed")
+        await asyncio.sleep(outbox.SWEEP_S)
+
 # -----------------------------------------------------------------------------
 #  Pydantic models
 # -----------------------------------------------------------------------------
@@ -69,6 +114,16 @@ class AnalysisOut(BaseModel):
     status: str = "success"
     data: Dict[str, Any]
 
+class UtterancesIn(BaseModel):
+    user_id: str = Field(..., example="user_123")
+    lines: str = Field(..., example="[00:01] Child: ...\n[00:02] Caregiver: ...")
+
+class SessionEndIn(BaseModel):
+    user_id: str = Field(..., example="user_123")
+
+# live sessions (agents/orchestration/session.py) – in-process, per worker
+sessions = SessionManager(get_orchestrator)
+
 # -----------------------------------------------------------------------------
 #  Routes
 # -----------------------------------------------------------------------------
@@ -76,67 +131,193 @@ class AnalysisOut(BaseModel):
 async def health_check():
     return {"status": "ok", "server_time": datetime.now(timezone.utc).isoformat()}
 
+@app.get("/ready")
+async def ready_check():
+    """Per-model load status + load time; 503 until every model is warm."""
+    status = readiness()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """LLM latency counters + speculative-notification hit/waste rates + queue."""
+    return {"llm": llm_metrics(), "speculative_notify": speculation_stats(),
+            "work_queue": work_queue.stats(), "timeline": timeline_stats()}
+
 # ------------------------------------------------------------------ /analyze
 @app.post("/analyze", response_model=AnalysisOut)
 async def analyze(payload: TranscriptIn, request: Request):
     if request.headers.get("x-api-key") != API_KEY:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
+    # optional per-request budget; LLM stages past it fall back (see orchestrator)
+    raw_deadline = request.headers.get("x-deadline-ms")
     try:
-        ctx: Dict[str, Any] = await run_pipeline_async(payload.transcript)
+        deadline_ms = float(raw_deadline) if raw_deadline else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="x-deadline-ms must be a number")
+
+    try:
+        ctx: Dict[str, Any] = await run_pipeline_async(payload.transcript, deadline_ms)
     except Exception as ex:
         logger.exception("Agent pipeline crashed")
         raise HTTPException(500, detail=str(ex))
 
+    return {"status": "success", "data": await _persist_analysis(payload.user_id, ctx)}
+
+
+async def _persist_analysis(user_id: str, ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Analysis doc + rollups + pending side-effects (backend/outbox.py) in ONE
+    async batch – awaited, so the response means "durable".  Timeline merge
+    + notification run on the work queue; the outbox sweeper replays them
+    if this process dies first.
+    """
     doc_id = uuid.uuid4().hex
+    now    = datetime.now(timezone.utc)
 
     firestore_data = {
         **ctx,
         "id": doc_id,
-        "user_id": payload.user_id,
+        "user_id": user_id,
         "timestamp": SERVER_TIMESTAMP
     }
 
     try:
-        (db.collection("users")
-           .document(payload.user_id)
-           .collection("analysis_results")
-           .document(doc_id)
-           .set(firestore_data))
-
-        # ---- timeline merge -------------
-        update_timeline(
-            user_id   = payload.user_id,
-            ctx       = ctx,
-            result_id = doc_id,
-            ts_server = datetime.now(timezone.utc)
-        )
-
-        # ---- push-notification kaydı ----
-        if ctx.get("send_notification"):
-            send_parent_notification(payload.user_id, {**ctx, "id": doc_id})
+        batch = adb.batch()
+        batch.set(adb.collection("users")
+                     .document(user_id)
+                     .collection("analysis_results")
+                     .document(doc_id), firestore_data)
+
+        # ---- hourly/daily rollups – same atomic commit --
+        record_analysis(user_id, ctx, now, client=adb, batch=batch)
+        tasks = ["timeline"] + (["notify"] if ctx.get("send_notification") else [])
+        outbox.add_pending(batch, user_id, doc_id, tasks, now, client=adb)
+        await batch.commit()
 
     except Exception as ex:
         logger.error("Firestore write failed: %s", ex)
         raise HTTPException(500, detail=str(ex))
 
+    # ---- timeline merge + push-notification kaydı (background, retried) --
+    for task in tasks:
+        await work_queue.submit(task, outbox.run_task, task, user_id, doc_id, now,
+                                ctx=dict(ctx))
+
     # Return API-friendly timestamp
     ctx.update({
         "id": doc_id,
-        "user_id": payload.user_id,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "user_id": user_id,
+        "timestamp": now.isoformat()
     })
-    return {"status": "success", "data": ctx}
+    return ctx
+
+# ------------------------------------------------------------ live sessions
+async def _session_add(session_id: str, user_id: str, lines: str) -> Dict[str, Any]:
+    try:
+        sess = await sessions.get(session_id, user_id)
+    except PermissionError as ex:
+        raise HTTPException(403, detail=str(ex))
+    snap = await sess.add(lines)
+    if "error" in snap:
+        raise HTTPException(409, detail=snap["error"])
+
+    # mid-session alert: at most one push per session, the final doc follows at /end
+    llm = sess.last_llm
+    if snap.get("trigger") and llm.get("send_notification") and not sess.notified:
+        sess.notified = True
+        await work_queue.submit("notify", send_parent_notification,
+                                user_id, {**llm, "id": f"{session_id}-live"})
+    return snap
+
+
+async def _session_end(session_id: str, user_id: str) -> Dict[str, Any]:
+    sess = sessions.find(session_id)
+    if sess is None:
+        raise HTTPException(404, detail="Unknown session")
+    if sess.user_id != user_id:
+        raise HTTPException(403, detail="session belongs to another user")
+    ctx = await sessions.end(session_id)
+    if not ctx.get("transcript"):
+        return {"session_id": session_id, "utterances": 0}
+    if sess.notified:
+        ctx["send_notification"] = False       # parent was already alerted live
+    return {**(await _persist_analysis(user_id, ctx)), "session_id": session_id}
+
+
+@app.post("/sessions/{session_id}/utterances")
+async def session_utterances(session_id: str, payload: UtterancesIn, request: Request):
+    """Append new lines; only those are scored. Returns running aggregates."""
+    if request.headers.get("x-api-key") != API_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return {"status": "success",
+            "data": await _session_add(session_id, payload.user_id, payload.lines)}
+
+
+@app.post("/sessions/{session_id}/end")
+async def session_end(session_id: str, payload: SessionEndIn, request: Request):
+    """Final LLM pass over the whole session, stored like an /analyze result."""
+    if request.headers.get("x-api-key") != API_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return {"status": "success",
+            "data": await _session_end(session_id, payload.user_id)}
+
+
+@app.websocket("/sessions/{session_id}/ws")
+async def session_ws(websocket: WebSocket, session_id: str, user_id: str,
+                     api_key: str | None = None):
+    """
+    Same as the two POST routes over one socket.
+    → {"lines": "..."}   ← snapshot
+    → {"end": true}      ← final analysis, then the socket closes
+    """
+    if (api_key or websocket.headers.get("x-api-key")) != API_KEY:
+        await websocket.close(code=4401)
+        return
+    await websocket.accept()
+    try:
+        while True:
+            msg = await websocket.receive_json()
+            try:
+                if msg.get("end"):
+                    await websocket.send_json({"status": "success",
+                                               "data": await _session_end(session_id, user_id)})
+                    await websocket.close()
+                    return
+                await websocket.send_json({"status": "success",
+                                           "data": await _session_add(session_id, user_id,
+                                                                      msg.get("lines", ""))})
+            except HTTPException as ex:
+                await websocket.send_json({"status": "error", "detail": ex.detail})
+    except WebSocketDisconnect:
+        logger.info("Live session %s: socket closed (session kept until idle)", session_id)
 
 # ---------------------------------------------------------- aggregates route
 @app.get("/aggregate/{user_id}")
 async def get_aggregates(user_id: str):
     try:
-        return {"status": "success", "data": compute_aggregates(user_id)}
+        return {"status": "success", "data": await run_in("io", compute_aggregates, user_id)}
     except Exception as ex:
         logger.exception("Aggregation failed")
         raise HTTPException(500, detail=str(ex))
 
+# -------------------------------------------------------------- trends route
+@app.get("/trends/{user_id}")
+async def get_trends(user_id: str, start: str | None = None, end: str | None = None,
+                     granularity: str = "day", metrics: str | None = None,
+                     max_points: int | None = None):
+    """Dense series from rollup buckets; ``metrics`` is comma-separated."""
+    try:
+        return {"status": "success",
+                "data": await run_in("io", compute_trends, user_id, start=start, end=end,
+                                     granularity=granularity, metrics=metrics,
+                                     max_points=max_points)}
+    except ValueError as ex:
+        raise HTTPException(400, detail=str(ex))
+    except Exception as ex:
+        logger.exception("Trends failed")
+        raise HTTPException(500, detail=str(ex))
+
 # ----------------------------------------------------------- timeline route
 @app.get("/timeline/{user_id}")
 async def get_timeline(user_id: str, day: str | None = None, limit: int = 50):
@@ -155,7 +336,8 @@ async def get_timeline(user_id: str, day: str | None = None, limit: int = 50):
     else:
         q = col.order_by("start_time", direction=fs.Query.DESCENDING).limit(limit)
 
-    docs = [{**d.to_dict(), "id": d.id} for d in q.stream()]
+    docs = await run_in("io", lambda: [card_view({**d.to_dict(), "id": d.id})
+                                       for d in q.stream()])
     for d in docs:
         for k in ("start_time", "end_time"):
             if isinstance(d.get(k), datetime):
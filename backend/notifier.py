@@ -36,7 +36,7 @@ def send_parent_notification(uid: str, ctx: dict) -> str:
         db.collection("users")
           .document(uid)
           .collection("notifications")
-          .document()        # auto-ID
+          .document(ctx["id"])   # analysis id → a retried job overwrites, no duplicate
     )
 
     notif_doc = {
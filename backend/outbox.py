@@ -0,0 +1,101 @@
+# backend/outbox.py
+"""
+Durable record of the side-effects an analysis still owes (outbox).
+
+``_persist_analysis`` writes one pending doc per task in the SAME batch as
+the analysis doc, so a committed analysis always knows what is left:
+
+    users/{uid}/pending_tasks/{result_id}_{task}
+        user_id, result_id, task ("timeline" | "notify"),
+        ts_server (analysis time), created
+
+The work-queue job (``run_task``) deletes its pending doc after the task
+succeeded.  Anything still pending after ``RAGOS_OUTBOX_GRACE_S`` – process
+restart, crash, dead letter – is found by ``claim_stale`` (collection-group
+query) and replayed from the stored analysis doc.
+
+Replays are safe: the timeline merge is idempotent per result id (marker
+docs) and the notification doc id is the analysis id.  The FCM push itself
+is at-least-once – a replay after a crash between push and delete can
+push twice.
+
+Firestore: the ``pending_tasks`` collection-group query on ``created``
+needs a single-field index exemption with collection-group scope.
+
+Env: RAGOS_OUTBOX_GRACE_S (600), RAGOS_OUTBOX_SWEEP_S (300, 0 = off)
+"""
+from __future__ import annotations
+
+import logging, os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from backend.rollups import _client
+
+logger = logging.getLogger("care_monitor")
+
+TASKS       = ("timeline", "notify")
+GRACE_S     = float(os.getenv("RAGOS_OUTBOX_GRACE_S", 600))
+SWEEP_S     = float(os.getenv("RAGOS_OUTBOX_SWEEP_S", 300))
+SWEEP_LIMIT = 200
+
+
+def pending_ref(user_id: str, result_id: str, task: str, client=None):
+    return (_client(client).collection("users").document(user_id)
+                           .collection("pending_tasks").document(f"{result_id}_{task}"))
+
+
+def add_pending(batch, user_id: str, result_id: str, tasks: List[str],
+                ts_server: datetime, client=None) -> None:
+    """Queue ``tasks`` durably – inside the analysis doc's batch."""
+    now = datetime.now(timezone.utc)
+    for task in tasks:
+        batch.set(pending_ref(user_id, result_id, task, client),
+                  {"user_id": user_id, "result_id": result_id, "task": task,
+                   "ts_server": ts_server, "created": now})
+
+
+def run_task(task: str, user_id: str, result_id: str, ts_server: datetime,
+             ctx: Optional[Dict[str, Any]] = None, client=None) -> None:
+    """
+    Run one side-effect, then clear its pending doc.  ``ctx=None`` (replay)
+    reads the stored analysis doc.  Raises on failure → work-queue retry.
+    """
+    db = _client(client)
+    if ctx is None:
+        snap = (db.collection("users").document(user_id)
+                  .collection("analysis_results").document(result_id).get())
+        if not snap.exists:
+            logger.warning("[Outbox] %s/%s: analysis gone, dropping %s", user_id, result_id, task)
+            pending_ref(user_id, result_id, task, db).delete()
+            return
+        ctx = snap.to_dict()
+
+    if task == "timeline":
+        from backend.timeline import update_timeline
+        update_timeline(user_id=user_id, ctx=ctx, result_id=result_id,
+                        ts_server=ts_server, client=db)
+    elif task == "notify":
+        from backend.notifier import send_parent_notification   # firebase_admin init
+        send_parent_notification(user_id, {**ctx, "id": result_id})
+    else:
+        raise ValueError(f"unknown outbox task {task!r}")
+    pending_ref(user_id, result_id, task, db).delete()
+
+
+def claim_stale(grace_s: float = GRACE_S, limit: int = SWEEP_LIMIT,
+                client=None) -> List[Dict[str, Any]]:
+    """
+    Pending tasks older than ``grace_s`` (lost from an in-memory queue).
+    Their ``created`` is reset, so the next sweep – here or in another
+    process – leaves them alone for another grace period.
+    """
+    now = datetime.now(timezone.utc)
+    q = (_client(client).collection_group("pending_tasks")
+                        .where("created", "<", now - timedelta(seconds=grace_s))
+                        .limit(limit))
+    items = []
+    for snap in q.stream():
+        snap.reference.update({"created": now})
+        items.append(snap.to_dict())
+    return items
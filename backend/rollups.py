@@ -0,0 +1,235 @@
+# backend/rollups.py
+"""
+Hourly / daily rollups of the analysis metrics, maintained at write time.
+
+Every stored analysis bumps one bucket doc per tier
+
+    users/{uid}/rollups_hourly/{YYYYMMDDHH}      users/{uid}/rollups_daily/{YYYYMMDD}
+        bucket_start : bucket start (UTC timestamp)
+        count        : Increment(1)
+        sums.{k}     : Increment(value)      k ∈ NUMERIC_KEYS
+        counts.{k}   : Increment(1)          only when the key was numeric
+        max.{k}      : Maximum(value)
+        groups.{g}   : Increment(1)          g = category_group
+
+with ``set(..., merge=True)`` in one batch – no read, no transaction, and
+concurrent analyses in the same bucket simply add up.  Any window then
+costs one read per bucket (≤168 hourly for a week, 365 daily for a year)
+instead of one per analysis.
+
+Existing data / repair:
+    $ python -m backend.rollups --rebuild USER_ID [--days 30]
+
+RAGOS_LEGACY_TS_SCAN (default 1) – also query the legacy ISO-string
+timestamps (``timestamp >= ""``; Firestore orders by type, so this returns
+exactly the string values).  Set 0 once backend/timestamp_backfill.py has
+run.  Read by ``rebuild`` and the aggregator's scan path; the rollup read
+path never scans analysis docs by string timestamp.
+"""
+from __future__ import annotations
+
+import argparse, logging, os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from google.cloud.firestore_v1 import Increment, Maximum
+
+logger = logging.getLogger("care_monitor")
+
+LEGACY_TS_SCAN = os.getenv("RAGOS_LEGACY_TS_SCAN", "1") == "1"
+
+NUMERIC_KEYS = {
+    "sentiment_score", "toxicity", "sarcasm",
+    "caregiver_score", "tone", "empathy", "responsiveness",
+}
+# tier → (collection, doc-id format, bucket width)
+TIERS = {
+    "hourly": ("rollups_hourly", "%Y%m%d%H", timedelta(hours=1)),
+    "daily":  ("rollups_daily",  "%Y%m%d",   timedelta(days=1)),
+}
+
+
+def _client(client=None):
+    """Injected client (emulator / fake) or the app-wide Firestore ``db``."""
+    if client is not None:
+        return client
+    from firebase.firebase_init import db      # lazy – no credentials at import
+    return db
+
+
+def _as_utc(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def bucket_start(ts: datetime, tier: str = "hourly") -> datetime:
+    ts = _as_utc(ts).replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if tier == "daily" else ts
+
+
+def bucket_id(ts: datetime, tier: str = "hourly") -> str:
+    return bucket_start(ts, tier).strftime(TIERS[tier][1])
+
+
+def group_key(group: Any) -> str:
+    """Category group as a single field-path segment."""
+    return str(group or "General").replace(".", "_").replace("/", "_")
+
+
+def _numeric(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _coll(user_id: str, tier: str, client=None):
+    return (_client(client).collection("users").document(user_id)
+                           .collection(TIERS[tier][0]))
+
+
+def rollup_ref(user_id: str, ts: datetime, client=None, tier: str = "hourly"):
+    return _coll(user_id, tier, client).document(bucket_id(ts, tier))
+
+
+# ─────────────────────────────────────────────── write path
+def rollup_delta(ctx: Dict[str, Any], ts: datetime, tier: str = "hourly") -> Dict[str, Any]:
+    """Merge-set payload for one analysis."""
+    vals = {k: float(ctx[k]) for k in NUMERIC_KEYS if _numeric(ctx.get(k))}
+    return {"bucket_start": bucket_start(ts, tier), "count": Increment(1),
+            "sums":   {k: Increment(v) for k, v in vals.items()},
+            "counts": {k: Increment(1) for k in vals},
+            "max":    {k: Maximum(v) for k, v in vals.items()},
+            "groups": {group_key(ctx.get("category_group")): Increment(1)}}
+
+
+def record_analysis(user_id: str, ctx: Dict[str, Any],
+                    ts: Optional[datetime] = None, client=None, batch=None) -> str:
+    """Add one analysis to its hourly + daily buckets (inside ``batch`` if given)."""
+    ts  = ts or datetime.now(timezone.utc)
+    own = batch is None
+    if own:
+        batch = _client(client).batch()
+    for tier in TIERS:
+        batch.set(rollup_ref(user_id, ts, client, tier), rollup_delta(ctx, ts, tier), merge=True)
+    if own:
+        batch.commit()
+    return bucket_id(ts)
+
+
+# ─────────────────────────────────────────────── read path
+def read_buckets(user_id: str, start: datetime, end: Optional[datetime] = None,
+                 client=None, tier: str = "hourly") -> List[Dict[str, Any]]:
+    """Buckets with ``start ≤ bucket_start < end`` – one read per bucket."""
+    q = _coll(user_id, tier, client).where("bucket_start", ">=", bucket_start(start, tier))
+    if end is not None:
+        q = q.where("bucket_start", "<", _as_utc(end))
+    return [d.to_dict() for d in q.stream()]
+
+
+def combine(buckets: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fold several buckets → {count, sums{k}, counts{k}, max{k}, groups{g}}."""
+    out = {"count": 0, "sums": defaultdict(float), "counts": defaultdict(int),
+           "max": {}, "groups": defaultdict(int)}
+    for b in buckets:
+        out["count"] += int(b.get("count", 0))
+        for k, v in (b.get("sums") or {}).items():
+            out["sums"][k] += float(v)
+        for k, v in (b.get("counts") or {}).items():
+            out["counts"][k] += int(v)
+        for k, v in (b.get("max") or {}).items():
+            out["max"][k] = max(out["max"].get(k, v), v)
+        for g, v in (b.get("groups") or {}).items():
+            out["groups"][g] += int(v)
+    return out
+
+
+def add_doc(bucket: Dict[str, Any], d: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold one raw analysis doc into a plain (non-transform) bucket dict."""
+    bucket["count"] = bucket.get("count", 0) + 1
+    g = group_key(d.get("category_group"))
+    groups = bucket.setdefault("groups", {})
+    groups[g] = groups.get(g, 0) + 1
+    sums, counts, mx = (bucket.setdefault(k, {}) for k in ("sums", "counts", "max"))
+    for k in NUMERIC_KEYS:
+        if _numeric(d.get(k)):
+            v = float(d[k])
+            sums[k]   = sums.get(k, 0.0) + v
+            counts[k] = counts.get(k, 0) + 1
+            mx[k]     = max(mx.get(k, v), v)
+    return bucket
+
+
+def means(total: Dict[str, Any]) -> Dict[str, float]:
+    return {k: (total["sums"].get(k, 0.0) / total["counts"][k]
+                if total["counts"].get(k) else 0.0)
+            for k in NUMERIC_KEYS}
+
+
+# ─────────────────────────────────────────────── rebuild (backfill / repair)
+def _doc_ts(d: Dict[str, Any]) -> Optional[datetime]:
+    ts = d.get("timestamp")
+    if isinstance(ts, str):
+        try:
+            return _as_utc(datetime.fromisoformat(ts))
+        except ValueError:
+            return None
+    return _as_utc(ts) if isinstance(ts, datetime) else None
+
+
+def rebuild(user_id: str, days: int = 30, client=None) -> Dict[str, int]:
+    """
+    Recompute the user's buckets from ``analysis_results``.
+    Run while writes are quiet – analyses stored meanwhile may be lost
+    from (or double counted in) the rebuilt hours.
+    """
+    db    = _client(client)
+    since = bucket_start(datetime.now(timezone.utc) - timedelta(days=days), "daily")
+    user  = db.collection("users").document(user_id)
+
+    totals: Dict[str, Dict[str, Dict[str, Any]]] = {tier: {} for tier in TIERS}
+    n_docs = 0
+    coll  = user.collection("analysis_results")
+    snaps = list(coll.where("timestamp", ">=", since).stream())
+    if LEGACY_TS_SCAN:
+        snaps += coll.where("timestamp", ">=", "").stream()
+    for snap in snaps:
+        d  = snap.to_dict() or {}
+        ts = _doc_ts(d)
+        if ts is None or ts < since:
+            continue
+        n_docs += 1
+        for tier in TIERS:
+            add_doc(totals[tier].setdefault(bucket_id(ts, tier), {
+                "bucket_start": bucket_start(ts, tier), "count": 0,
+                "sums": {}, "counts": {}, "max": {}, "groups": {}}), d)
+
+    batch, ops = db.batch(), 0
+    for tier in TIERS:
+        coll  = _coll(user_id, tier, db)
+        stale = [s.id for s in coll.where("bucket_start", ">=", since).stream()]
+        writes = [("delete", i, None) for i in stale if i not in totals[tier]]
+        writes += [("set", i, data) for i, data in totals[tier].items()]   # full overwrite
+        for op, doc_id, data in writes:
+            if op == "delete":
+                batch.delete(coll.document(doc_id))
+            else:
+                batch.set(coll.document(doc_id), data)
+            ops += 1
+            if ops % 500 == 0:
+                batch.commit(); batch = db.batch()
+    batch.commit()
+
+    logger.info("[Rollups] rebuilt %s: %d analyses → %d hourly / %d daily buckets",
+                user_id, n_docs, len(totals["hourly"]), len(totals["daily"]))
+    return {"analyses": n_docs, **{tier: len(b) for tier, b in totals.items()}}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Rebuild hourly rollups from analysis_results")
+    ap.add_argument("--rebuild", metavar="USER_ID", required=True)
+    ap.add_argument("--days", type=int, default=30)
+    args = ap.parse_args()
+    print(rebuild(args.rebuild, args.days))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,14 +1,91 @@
 # backend/timeline.py
+"""
+Timeline cards: consecutive visible analyses of the same category group
+(within its merge window) are merged into one card.
+
+Per user a head doc ``users/{uid}/timeline_meta/head`` names the latest
+card and carries what the merge decision needs (group, end_time, last
+result id).  Every write touches the head, so its ``update_time`` is the
+user's timeline version.  Cards keep running sums – ``metrics.sentiment_sum``
+/ ``metrics.count`` – written with transforms, never a recomputed average;
+``avg_sentiment`` is derived on read (``card_view``).
+
+Write paths:
+  fast  – the head is cached in-process: card write + head update in one
+          batch, preconditioned on the cached head ``update_time``.  No read.
+  txn   – cache miss or precondition failed (another worker / process
+          wrote meanwhile): read head → decide → write card + head inside
+          a Firestore transaction (retried on contention).
+
+Writers of one user inside this process are serialised by a striped lock,
+so only other processes can invalidate the cached head.
+
+Idempotency: every write also creates ``timeline_meta/applied_<result_id>``
+in the same commit.  A redelivered analysis (work-queue retry, possibly
+after later analyses) makes the fast batch fail with AlreadyExists and is
+seen by the transaction, so counts and sums are never applied twice.
+Markers carry ``expire_at`` (now + 7 days) for a Firestore TTL policy.
+"""
 from __future__ import annotations
-from datetime import datetime, timezone
+
+import logging, threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
 from google.cloud import firestore_v1 as fs
 from agents.analysis.category_utils import merge_window_of
 from backend.timeline_visibility import is_visible   # NEW
+from backend.rollups import _client
+
+logger = logging.getLogger("care_monitor")
+
+TXN_ATTEMPTS = 10
+MARKER_TTL   = timedelta(days=7)
+_USER_LOCKS  = [threading.Lock() for _ in range(64)]
+
+_STATS = {"fast_path": 0, "transaction": 0, "precondition_failed": 0, "duplicate": 0}
+_stats_lock = threading.Lock()
+
+
+def _bump(key: str) -> None:
+    with _stats_lock:
+        _STATS[key] += 1
+
+
+def timeline_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_STATS)
+
+
+class HeadCache:
+    """user_id → (head dict, head update_time); LRU-bounded."""
 
-try:
-    from firebase.firebase_init import db  # type: ignore
-except Exception as exc:
-    raise ImportError("firebase/firebase_init.py must expose `db`: " + str(exc))
+    def __init__(self, max_users: int = 10_000) -> None:
+        self.max_users = max_users
+        self._heads: "OrderedDict[str, Tuple[Dict[str, Any], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Tuple[Dict[str, Any], Any]]:
+        with self._lock:
+            hit = self._heads.get(user_id)
+            if hit is not None:
+                self._heads.move_to_end(user_id)
+            return hit
+
+    def put(self, user_id: str, head: Dict[str, Any], update_time: Any) -> None:
+        with self._lock:
+            self._heads[user_id] = (head, update_time)
+            self._heads.move_to_end(user_id)
+            while len(self._heads) > self.max_users:
+                self._heads.popitem(last=False)
+
+    def drop(self, user_id: str) -> None:
+        with self._lock:
+            self._heads.pop(user_id, None)
+
+
+_CACHE = HeadCache()
 
 # ---------------------------------------------------------------------------
 def _minutes(a: datetime, b: datetime) -> float:
@@ -18,62 +95,170 @@ def _should_merge(prev: dict, ctx: dict, now: datetime) -> bool:
     same_group  = prev["category_group"] == ctx["category_group"]
     window_mins = merge_window_of(ctx["category_group"])
     return same_group and _minutes(now, prev["end_time"]) <= window_mins
+
+def card_view(doc: dict) -> dict:
+    """API view of a card: ``avg_sentiment`` from the running sum."""
+    m = doc.get("metrics") or {}
+    if "sentiment_sum" in m:
+        m["avg_sentiment"] = m["sentiment_sum"] / m["count"] if m.get("count") else 0.0
+    return doc
 # ---------------------------------------------------------------------------
-def update_timeline(*, user_id: str, ctx: dict,
-                    result_id: str, ts_server: datetime) -> str | None:
-    """
-    Create/merge a timeline card **only if ctx is_visible**.
-    Returns timeline-doc id or None if nothing was stored.
-    """
-    visible = is_visible(ctx)
-    if not visible:
-        return None                    # ←  early-exit: keep DB clean
+def _refs(db, user_id: str):
+    user = db.collection("users").document(user_id)
+    return user.collection("timeline"), user.collection("timeline_meta").document("head")
 
-    if ts_server.tzinfo is None:       # normalise
-        ts_server = ts_server.replace(tzinfo=timezone.utc)
 
-    tl_ref = (db.collection("users")
-                .document(user_id)
-                .collection("timeline"))
+def _marker(db, user_id: str, result_id: str):
+    return (db.collection("users").document(user_id)
+              .collection("timeline_meta").document(f"applied_{result_id}"))
+
+
+def _marker_doc(card_id: str) -> Dict[str, Any]:
+    return {"card_id": card_id, "expire_at": datetime.now(timezone.utc) + MARKER_TTL}
+
 
-    last = next(iter(
-        tl_ref.order_by("end_time", direction=fs.Query.DESCENDING)
-              .limit(1).stream()), None)
+def _plan(head: Optional[dict], ctx: dict, result_id: str, ts: datetime,
+          tl_ref) -> Tuple[Any, str, Dict[str, Any], Dict[str, Any]]:
+    """(card_ref, op, card_data, new_head) for one analysis – pure, no I/O."""
+    s, tox = float(ctx["sentiment_score"]), float(ctx["toxicity"])
 
     # ---------- merge -------------------------------------------------------
-    if last and _should_merge(last.to_dict(), ctx, ts_server):
-        doc_id  = last.id
-        doc     = last.to_dict()
-        n_old   = doc["metrics"]["count"]
-        tl_ref.document(doc_id).update({
-            "end_time"              : ts_server,
-            "summary"               : ctx.get("summary", doc["summary"]),
-            "metrics.avg_sentiment" : (doc["metrics"]["avg_sentiment"]*n_old
-                                       + ctx["sentiment_score"]) / (n_old+1),
-            "metrics.max_toxicity"  : max(doc["metrics"]["max_toxicity"],
-                                          ctx["toxicity"]),
+    if head and _should_merge(head, ctx, ts):
+        end = max(head["end_time"], ts)
+        card = {
+            "end_time"              : end,
+            "metrics.sentiment_sum" : fs.Increment(s),
+            "metrics.max_toxicity"  : fs.Maximum(tox),
             "metrics.count"         : fs.Increment(1),
             "result_ids"            : fs.ArrayUnion([result_id]),
-            "abuse_flag"            : doc["abuse_flag"] or ctx["abuse_flag"],
-        })
-        return doc_id
+        }
+        if ctx.get("summary"):
+            card["summary"] = ctx["summary"]
+        if ctx.get("abuse_flag"):
+            card["abuse_flag"] = True
+        if "sentiment_sum_base" in head:            # legacy card → switch to sums
+            card["metrics.sentiment_sum"] = head["sentiment_sum_base"] + s
+        new_head = {**head, "end_time": end, "count": head.get("count", 0) + 1,
+                    "last_result_id": result_id}
+        new_head.pop("sentiment_sum_base", None)
+        return tl_ref.document(head["card_id"]), "update", card, new_head
 
     # ---------- create new card --------------------------------------------
-    new_doc = {
-        "start_time"       : ts_server,
-        "end_time"         : ts_server,
+    ref = tl_ref.document()
+    card = {
+        "start_time"       : ts,
+        "end_time"         : ts,
         "primary_category" : ctx["primary_category"],
         "category_group"   : ctx["category_group"],
         "snippet"          : ctx["transcript"].splitlines()[0][:120],
         "summary"          : ctx.get("summary", ""),
         "metrics": {
-            "avg_sentiment": ctx["sentiment_score"],
-            "max_toxicity" : ctx["toxicity"],
+            "sentiment_sum": s,
+            "max_toxicity" : tox,
             "count"        : 1
         },
         "result_ids" : [result_id],
-        "abuse_flag" : ctx["abuse_flag"],
+        "abuse_flag" : bool(ctx["abuse_flag"]),
     }
-    ref = tl_ref.document()
-    ref.set(new_doc)
-    return ref.id
+    new_head = {"card_id": ref.id, "category_group": ctx["category_group"],
+                "end_time": ts, "count": 1, "last_result_id": result_id}
+    return ref, "create", card, new_head
+
+
+def _legacy_head(tl_ref, transaction) -> Optional[dict]:
+    """No head doc yet: derive it from the newest pre-existing card."""
+    last = next(iter(tl_ref.order_by("end_time", direction=fs.Query.DESCENDING)
+                           .limit(1).stream(transaction=transaction)), None)
+    if last is None:
+        return None
+    doc, m = last.to_dict(), last.to_dict().get("metrics", {})
+    head = {"card_id": last.id, "category_group": doc["category_group"],
+            "end_time": doc["end_time"], "count": m.get("count", 0),
+            "last_result_id": (doc.get("result_ids") or [None])[-1]}
+    if "sentiment_sum" not in m:
+        head["sentiment_sum_base"] = m.get("avg_sentiment", 0.0) * m.get("count", 0)
+    return head
+
+
+def _write_fast(db, user_id: str, ctx: dict, result_id: str, ts: datetime,
+                cache: HeadCache) -> Optional[str]:
+    hit = cache.get(user_id)
+    if hit is None:
+        return None
+    head, head_ut = hit
+    if head.get("last_result_id") == result_id:
+        _bump("duplicate")
+        return head["card_id"]
+    tl_ref, head_ref = _refs(db, user_id)
+    card_ref, op, card, new_head = _plan(head, ctx, result_id, ts, tl_ref)
+
+    batch = db.batch()
+    batch.create(_marker(db, user_id, result_id), _marker_doc(card_ref.id))
+    if op == "update":
+        batch.update(card_ref, card)
+    else:
+        batch.create(card_ref, card)
+    batch.update(head_ref, new_head, option=db.write_option(last_update_time=head_ut))
+    try:
+        results = batch.commit()
+    except Exception as ex:     # FailedPrecondition (someone else wrote) / AlreadyExists (redelivery)
+        cache.drop(user_id)
+        _bump("precondition_failed")
+        logger.debug("[Timeline] fast path lost for %s: %s", user_id, ex)
+        return None
+    cache.put(user_id, new_head, results[-1].update_time)
+    _bump("fast_path")
+    return card_ref.id
+
+
+def _write_txn(db, user_id: str, ctx: dict, result_id: str, ts: datetime,
+               cache: HeadCache) -> str:
+    tl_ref, head_ref = _refs(db, user_id)
+    marker_ref = _marker(db, user_id, result_id)
+
+    @fs.transactional
+    def run(transaction):
+        snap = head_ref.get(transaction=transaction)
+        head = snap.to_dict() if snap.exists else _legacy_head(tl_ref, transaction)
+        applied = marker_ref.get(transaction=transaction)
+        if applied.exists:                        # already merged – redelivery
+            return applied.get("card_id"), head, snap.update_time, False
+        card_ref, op, card, new_head = _plan(head, ctx, result_id, ts, tl_ref)
+        transaction.create(marker_ref, _marker_doc(card_ref.id))
+        if op == "update":
+            transaction.update(card_ref, card)
+        else:
+            transaction.create(card_ref, card)
+        transaction.set(head_ref, new_head)      # last write → its update_time
+        return card_ref.id, new_head, None, True
+
+    transaction = db.transaction(max_attempts=TXN_ATTEMPTS)
+    card_id, head, head_ut, wrote = run(transaction)
+    if wrote:
+        head_ut = transaction.write_results[-1].update_time
+    else:
+        _bump("duplicate")
+    if head is not None and head_ut is not None:
+        cache.put(user_id, head, head_ut)
+    _bump("transaction")
+    return card_id
+
+
+def update_timeline(*, user_id: str, ctx: dict, result_id: str, ts_server: datetime,
+                    client=None, cache: Optional[HeadCache] = None) -> str | None:
+    """
+    Create/merge a timeline card **only if ctx is_visible**.
+    Returns timeline-doc id or None if nothing was stored.
+    """
+    visible = is_visible(ctx)
+    if not visible:
+        return None                    # ←  early-exit: keep DB clean
+
+    if ts_server.tzinfo is None:       # normalise
+        ts_server = ts_server.replace(tzinfo=timezone.utc)
+
+    db    = _client(client)
+    cache = _CACHE if cache is None else cache
+    with _USER_LOCKS[hash(user_id) % len(_USER_LOCKS)]:
+        return (_write_fast(db, user_id, ctx, result_id, ts_server, cache)
+                or _write_txn(db, user_id, ctx, result_id, ts_server, cache))
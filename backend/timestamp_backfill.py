@@ -0,0 +1,166 @@
+# backend/timestamp_backfill.py
+"""
+One-off backfill: legacy ISO-string ``timestamp`` fields → native Firestore
+timestamps, so ``_collect_since`` can drop its second (unbounded) scan.
+
+Firestore orders values by type first, so ``timestamp >= ""`` returns
+exactly the string-typed timestamps of a user – the docs still to fix.
+They are paged by the string value (cursor) and rewritten with bulk
+``batch.update`` (≤500 ops per commit):
+
+    timestamp        : datetime (naive strings are read as UTC)
+    timestamp_legacy : original string (audit / rollback)
+
+Strings that do not parse are left alone and counted as ``unparseable``.
+
+Resume: after every committed batch the checkpoint file records finished
+users and the current user's cursor; re-running with the same
+``--checkpoint`` continues where it stopped (already converted docs have
+left the string range anyway).
+
+After the backfill has run for every user, set RAGOS_LEGACY_TS_SCAN=0 so
+``rollups.rebuild`` and the aggregator's scan path (RAGOS_AGGREGATE_SOURCE=scan)
+skip the legacy query.  The default rollup read path does not use it.
+
+$ python -m backend.timestamp_backfill --report USER_ID        # read counts only
+$ python -m backend.timestamp_backfill [--user USER_ID] [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse, json, logging, time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.rollups import _client, _doc_ts
+
+logger = logging.getLogger("care_monitor")
+
+BATCH_LIMIT = 500                      # Firestore write-batch maximum
+PAGE_SIZE   = BATCH_LIMIT              # one page → at most one batch commit
+CHECKPOINT  = "data/backfill/timestamp_checkpoint.json"
+
+
+def _results(user_id: str, client=None):
+    return (_client(client).collection("users").document(user_id)
+                           .collection("analysis_results"))
+
+
+# ─────────────────────────────────────────────── checkpoint
+def _load_checkpoint(path: Optional[str]) -> Dict[str, Any]:
+    p = Path(path) if path else None
+    if p and p.exists():
+        return json.loads(p.read_text(encoding="utf-8"))
+    return {"users_done": [], "current": None, "cursor": None,
+            "stats": {"scanned": 0, "converted": 0, "unparseable": 0, "batches": 0}}
+
+
+def _save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    tmp.replace(p)                     # atomic – a crash never leaves half a file
+
+
+# ─────────────────────────────────────────────── backfill
+def backfill_user(user_id: str, state: Dict[str, Any], checkpoint: Optional[str],
+                  client=None, dry_run: bool = False) -> None:
+    db    = _client(client)
+    coll  = _results(user_id, db)
+    stats = state["stats"]
+    resume = state.get("current") == user_id          # interrupted mid-user
+    cursor, inclusive = (state.get("cursor") or "") if resume else "", True
+    state["current"], state["cursor"] = user_id, cursor
+
+    while True:
+        q = (coll.where("timestamp", ">=" if inclusive else ">", cursor)
+                 .order_by("timestamp").limit(PAGE_SIZE))
+        page = list(q.stream())
+        if not page:
+            break
+        batch, n_ops = db.batch(), 0
+        for snap in page:
+            raw = snap.get("timestamp")
+            ts  = _doc_ts({"timestamp": raw})
+            stats["scanned"] += 1
+            if ts is None:
+                stats["unparseable"] += 1
+                continue
+            if not dry_run:
+                batch.update(snap.reference, {"timestamp": ts, "timestamp_legacy": raw})
+            n_ops += 1
+            stats["converted"] += 1
+        if n_ops and not dry_run:
+            batch.commit()
+            stats["batches"] += 1
+
+        # converted docs left the string range; equal values behind an
+        # unparseable last one are unparseable too → skip them (">")
+        last = page[-1].get("timestamp")
+        inclusive = _doc_ts({"timestamp": last}) is not None and not dry_run
+        cursor = last
+        state["cursor"] = cursor
+        if checkpoint and not dry_run:
+            _save_checkpoint(checkpoint, state)
+        if len(page) < PAGE_SIZE:
+            break
+
+    state["users_done"].append(user_id)
+    state["current"], state["cursor"] = None, None
+    if checkpoint and not dry_run:
+        _save_checkpoint(checkpoint, state)
+
+
+def backfill(user_id: Optional[str] = None, checkpoint: Optional[str] = CHECKPOINT,
+             client=None, dry_run: bool = False) -> Dict[str, Any]:
+    db    = _client(client)
+    state = _load_checkpoint(checkpoint)
+    users = [user_id] if user_id else [r.id for r in db.collection("users").list_documents()]
+    t0 = time.perf_counter()
+    for uid in users:
+        if uid in state["users_done"]:
+            continue
+        backfill_user(uid, state, checkpoint, db, dry_run)
+        logger.info("[Backfill] %s done – %s", uid, state["stats"])
+    return {**state["stats"], "users": len(users), "dry_run": dry_run,
+            "seconds": round(time.perf_counter() - t0, 2)}
+
+
+# ─────────────────────────────────────────────── read-count report
+def _reads(q) -> int:
+    """Documents a query bills: one per result, at least one."""
+    return max(1, sum(1 for _ in q.stream()))
+
+
+def read_report(user_id: str, days: int = 7, client=None) -> Dict[str, Any]:
+    """What one scan-path ``_collect_since`` costs with / without the legacy query."""
+    coll  = _results(user_id, client)
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    typed  = _reads(coll.where("timestamp", ">=", since))
+    legacy = _reads(coll.where("timestamp", ">=", ""))
+    return {"user_id": user_id, "typed_query_reads": typed, "legacy_scan_reads": legacy,
+            "reads_with_legacy_scan": typed + legacy, "reads_without_legacy_scan": typed}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backfill legacy string timestamps")
+    ap.add_argument("--user", help="only this user (default: every users/* doc)")
+    ap.add_argument("--checkpoint", default=CHECKPOINT)
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--report", metavar="USER_ID", help="print read counts and exit")
+    args = ap.parse_args()
+
+    if args.report:
+        out = read_report(args.report)
+    else:
+        before = read_report(args.user) if args.user else None
+        out = {"backfill": backfill(args.user, args.checkpoint, dry_run=args.dry_run)}
+        if args.user:
+            out.update(before=before, after=read_report(args.user))
+    print(json.dumps(out, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
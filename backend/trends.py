@@ -0,0 +1,140 @@
+# backend/trends.py
+"""
+Dense metric time series for ``GET /trends/{user_id}``, built from the
+rollup buckets (backend/rollups.py) – never from raw analysis docs.
+
+    granularity  hour | day | week      (bins aligned to UTC; weeks start Monday)
+    metrics      subset of NUMERIC_KEYS (default: all)
+    max_points   server-side downsampling: when the range has more bins,
+                 k consecutive bins are merged (sums / counts added, max
+                 maxed) – exact statistics, fewer points.
+                 default RAGOS_TRENDS_MAX_POINTS (400), 0 = off
+
+Source tier: hourly buckets for hour bins, daily buckets whenever the
+(possibly downsampled) bin is a whole number of days – a year of day bins
+costs ≤366 reads.  Empty bins come back as count 0 and mean/max ``None``.
+"""
+from __future__ import annotations
+
+import math, os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from backend.rollups import NUMERIC_KEYS, _as_utc, bucket_start, read_buckets
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+DEFAULT_RANGE = timedelta(days=30)
+MAX_POINTS = int(os.getenv("RAGOS_TRENDS_MAX_POINTS", "400"))
+
+DAY = timedelta(days=1)
+
+
+def _parse_ts(v: Union[str, datetime, None]) -> Optional[datetime]:
+    if v is None or isinstance(v, datetime):
+        return _as_utc(v) if v else None
+    try:
+        return _as_utc(datetime.fromisoformat(v.replace("Z", "+00:00")))
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {v!r}")
+
+
+def _align(ts: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return bucket_start(ts)
+    day = bucket_start(ts, "daily")
+    return day - timedelta(days=day.weekday()) if granularity == "week" else day
+
+
+def _metrics(metrics: Union[str, Iterable[str], None]) -> List[str]:
+    if not metrics:
+        return sorted(NUMERIC_KEYS)
+    names = [m.strip() for m in metrics.split(",")] if isinstance(metrics, str) else list(metrics)
+    unknown = [m for m in names if m not in NUMERIC_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {unknown} (allowed: {sorted(NUMERIC_KEYS)})")
+    return names
+
+
+def _series(a: np.ndarray, nd: int = 3) -> List[Optional[float]]:
+    """NaN → None so the JSON has explicit gaps."""
+    return np.where(np.isnan(a), None, np.round(a, nd)).tolist()
+
+
+def compute_trends(user_id: str, *, start: Union[str, datetime, None] = None,
+                   end: Union[str, datetime, None] = None, granularity: str = "day",
+                   metrics: Union[str, Iterable[str], None] = None,
+                   max_points: Optional[int] = None, client=None) -> Dict[str, Any]:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {list(GRANULARITIES)}")
+    names = _metrics(metrics)
+    end   = _parse_ts(end) or datetime.now(timezone.utc)
+    start = _parse_ts(start) or end - DEFAULT_RANGE
+    if start >= end:
+        raise ValueError("start must be before end")
+    max_points = MAX_POINTS if max_points is None else max_points
+
+    # ── bins (+ downsampling) -------------------------------------------------
+    origin = _align(start, granularity)
+    step   = GRANULARITIES[granularity]
+    n      = math.ceil((end - origin) / step)
+    factor = 1
+    if max_points and n > max_points:
+        factor = math.ceil(n / max_points)
+        if granularity == "hour" and factor > 12:       # round to whole days → daily tier
+            factor = math.ceil(factor / 24) * 24
+            origin = _align(start, "day")
+        step *= factor
+        n = math.ceil((end - origin) / step)
+    tier = "daily" if step % DAY == timedelta(0) else "hourly"
+
+    # ── one read per bucket, then vectorised binning -------------------------
+    buckets = read_buckets(user_id, origin, end, client=client, tier=tier)
+    secs = np.array([(_as_utc(b["bucket_start"]) - origin).total_seconds() for b in buckets],
+                    dtype=np.float64)
+    idx  = (secs // step.total_seconds()).astype(np.int64)
+    keep = (idx >= 0) & (idx < n)
+    idx  = idx[keep]
+    rows = [b for b, k in zip(buckets, keep) if k]
+
+    def col(field: str, key: str) -> np.ndarray:
+        return np.array([float((b.get(field) or {}).get(key, np.nan)) for b in rows],
+                        dtype=np.float64)
+
+    count = np.bincount(idx, weights=[float(b.get("count", 0)) for b in rows], minlength=n)
+
+    series: Dict[str, Any] = {}
+    for k in names:
+        sums, cnts, mx = col("sums", k), col("counts", k), col("max", k)
+        has   = ~np.isnan(cnts)
+        s_bin = np.bincount(idx[has], weights=sums[has], minlength=n)
+        c_bin = np.bincount(idx[has], weights=cnts[has], minlength=n)
+        m_bin = np.full(n, -np.inf)
+        has_m = ~np.isnan(mx)
+        np.maximum.at(m_bin, idx[has_m], mx[has_m])
+        mean = np.divide(s_bin, c_bin, out=np.full(n, np.nan), where=c_bin > 0)
+        m_bin[np.isinf(m_bin)] = np.nan
+        series[k] = {"mean": _series(mean), "max": _series(m_bin),
+                     "count": c_bin.astype(np.int64).tolist()}
+
+    group_names = sorted({g for b in rows for g in (b.get("groups") or {})})
+    groups = {g: np.bincount(idx, weights=np.nan_to_num(col("groups", g)),   # NaN = absent
+                             minlength=n).astype(np.int64).tolist()
+              for g in group_names}
+
+    times = [(origin + i * step).isoformat() for i in range(n)]
+    return {
+        "user_id": user_id,
+        "start": origin.isoformat(),
+        "end": end.isoformat(),
+        "granularity": granularity,
+        "bin_seconds": int(step.total_seconds()),
+        "downsample_factor": factor,
+        "source_tier": tier,
+        "buckets_read": len(buckets),
+        "t": times,
+        "count": count.astype(np.int64).tolist(),
+        "metrics": series,
+        "groups": groups,
+    }
@@ -0,0 +1,149 @@
+# backend/work_queue.py
+"""
+In-process background queue for side-effects of a stored analysis
+(timeline merge, parent notification).
+
+The HTTP response only waits for the analysis doc; everything that can be
+redone later is ``submit``-ted here and executed by a few asyncio workers.
+Failed jobs are retried with exponential backoff; after the last attempt
+they land in ``dead`` (last 100 kept, also logged) and show up in
+``/metrics``.
+
+    queue = WorkQueue.from_env()
+    await queue.start()                               # FastAPI startup
+    await queue.submit("timeline", update_timeline, user_id=..., ...)
+    await queue.stop()                                # drains on shutdown
+
+Jobs may be coroutine functions (awaited on the loop) or blocking callables
+(run on the "io" executor pool); ``submit`` only blocks while the queue is
+full.  Delivery is at-least-once – a job that fails after a partial write
+is run again, so jobs must be idempotent.
+
+Env: RAGOS_QUEUE_WORKERS (2), RAGOS_QUEUE_MAX_ATTEMPTS (5),
+     RAGOS_QUEUE_BASE_DELAY_S (0.5), RAGOS_QUEUE_MAXSIZE (1000)
+"""
+from __future__ import annotations
+
+import asyncio, inspect, logging, os, time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from agents.executors import run_in
+
+logger = logging.getLogger("care_monitor")
+
+
+@dataclass
+class Job:
+    name: str
+    fn: Callable[..., Any]
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+
+
+class WorkQueue:
+    def __init__(self, workers: int = 2, max_attempts: int = 5,
+                 base_delay_s: float = 0.5, maxsize: int = 1000) -> None:
+        self.n_workers    = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay_s = base_delay_s
+        self.maxsize      = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retries: set = set()                 # pending backoff timers
+        self.dead: Deque[Dict[str, Any]] = deque(maxlen=100)
+        self.counts = {"submitted": 0, "done": 0, "retried": 0, "failed": 0}
+
+    @classmethod
+    def from_env(cls) -> "WorkQueue":
+        return cls(workers=int(os.getenv("RAGOS_QUEUE_WORKERS", 2)),
+                   max_attempts=int(os.getenv("RAGOS_QUEUE_MAX_ATTEMPTS", 5)),
+                   base_delay_s=float(os.getenv("RAGOS_QUEUE_BASE_DELAY_S", 0.5)),
+                   maxsize=int(os.getenv("RAGOS_QUEUE_MAXSIZE", 1000)))
+
+    # ─────────────────────────────────────────────── lifecycle
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [asyncio.create_task(self._worker(i), name=f"ragos-queue-{i}")
+                         for i in range(self.n_workers)]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Wait (≤ timeout) for queued jobs, then cancel the workers."""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("[Queue] shutdown with %d job(s) still queued", self._queue.qsize())
+        for t in self._workers + list(self._retries):
+            t.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers, self._retries = [], set()
+
+    async def join(self) -> None:
+        """Until the queue is empty and no retry is pending."""
+        while True:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*self._retries, return_exceptions=True)
+
+    # ─────────────────────────────────────────────── submit / run
+    async def submit(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> None:
+        """Enqueue a job; waits only while the queue is full (backpressure)."""
+        if self._queue is None:
+            raise RuntimeError("WorkQueue.start() was not awaited")
+        self.counts["submitted"] += 1
+        await self._queue.put(Job(name, fn, args, kwargs))
+
+    async def _run(self, job: Job) -> Any:
+        if inspect.iscoroutinefunction(job.fn):
+            return await job.fn(*job.args, **job.kwargs)
+        return await run_in("io", job.fn, *job.args, **job.kwargs)
+
+    async def _worker(self, i: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                job.attempts += 1
+                await self._run(job)
+                self.counts["done"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                job.last_error = f"{type(ex).__name__}: {ex}"
+                self._failed(job)
+            finally:
+                self._queue.task_done()
+
+    def _failed(self, job: Job) -> None:
+        if job.attempts >= self.max_attempts:
+            self.counts["failed"] += 1
+            self.dead.append({"name": job.name, "attempts": job.attempts,
+                              "error": job.last_error, "created": job.created})
+            logger.error("[Queue] %s gave up after %d attempts: %s",
+                         job.name, job.attempts, job.last_error)
+            return
+        delay = self.base_delay_s * 2 ** (job.attempts - 1)
+        self.counts["retried"] += 1
+        logger.warning("[Queue] %s attempt %d failed (%s) – retry in %.1fs",
+                       job.name, job.attempts, job.last_error, delay)
+        t = asyncio.create_task(self._requeue(job, delay))
+        self._retries.add(t)
+        t.add_done_callback(self._retries.discard)
+
+    async def _requeue(self, job: Job, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.put(job)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counts,
+                "queued": self._queue.qsize() if self._queue else 0,
+                "retry_pending": len(self._retries),
+                "dead": list(self.dead)[-10:]}
@@ -0,0 +1,115 @@
+"""
+Parity check + throughput/memory benchmark for the hf_cache backends.
+
+For every classifier it loads the fp32 ``torch`` pipeline as reference and
+each requested alternative backend (int8, onnx), then reports:
+  • parity   – top-label agreement and max |Δscore| against fp32
+  • speed    – utterances per second for one padded batch
+  • memory   – resident-set growth while loading the backend (MB)
+
+$ python bench_hf_backends.py --backends int8 onnx --models sentiment toxicity
+"""
+import argparse, gc, json, os, time
+
+from agents.hf_cache import build_pipe, BACKENDS
+
+SAMPLES = [
+    "Good job! You finished all your broccoli.",
+    "Stop that right now or you're going straight to bed.",
+    "Oh, perfect—because that’s exactly where priceless art belongs, right?",
+    "Time for bed, sweetheart, let's brush your teeth first.",
+    "You never listen, you are so annoying.",
+    "Let’s grab a damp cloth and make it a portable masterpiece instead.",
+    "I miss mommy.",
+    "Can we go to the park after lunch?",
+]
+LABELS = ["Breakfast", "Bedtime Routine", "Scolding", "Praising", "Park Visit"]
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:                              # non-Linux: peak RSS instead
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _scores(name: str, out) -> list:
+    """Normalise any pipeline output to [{label: score}] per input."""
+    rows = []
+    for r in out:
+        if name == "categorizer":
+            rows.append(dict(zip(r["labels"], r["scores"])))
+        else:
+            r = r if isinstance(r, list) else [r]
+            rows.append({x["label"]: x["score"] for x in r})
+    return rows
+
+
+def _run(name: str, pipe, texts):
+    if name == "categorizer":
+        return pipe(texts, candidate_labels=LABELS, multi_label=False)
+    return pipe(texts, top_k=None, batch_size=len(texts))
+
+
+def bench(name: str, backend: str, texts, repeats: int):
+    gc.collect()
+    before = _rss_mb()
+    t0 = time.perf_counter()
+    pipe = build_pipe(name, backend)
+    load_s = time.perf_counter() - t0
+    mem_mb = _rss_mb() - before
+
+    _run(name, pipe, texts)                      # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        out = _run(name, pipe, texts)
+    ips = len(texts) * repeats / (time.perf_counter() - t0)
+    return pipe, _scores(name, out), {"load_s": round(load_s, 2),
+                                      "rss_mb": round(mem_mb, 1),
+                                      "items_per_s": round(ips, 1)}
+
+
+def parity(ref, alt) -> dict:
+    top = sum(max(a, key=a.get) == max(r, key=r.get) for r, a in zip(ref, alt))
+    diff = max(abs(r[k] - a.get(k, 0.0)) for r, a in zip(ref, alt) for k in r)
+    return {"top_label_agreement": round(top / len(ref), 3),
+            "max_abs_diff": round(diff, 4)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models", nargs="+",
+                    default=["sentiment", "toxicity", "sarcasm", "categorizer"])
+    ap.add_argument("--backends", nargs="+", default=["int8", "onnx"],
+                    choices=[b for b in BACKENDS if b != "torch"])
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--out", default="data/tests/hf_backend_bench.json")
+    args = ap.parse_args()
+
+    texts = SAMPLES * 4
+    report = {}
+    for name in args.models:
+        ref_pipe, ref, stats = bench(name, "torch", texts, args.repeats)
+        report[name] = {"torch": stats}
+        del ref_pipe
+        for backend in args.backends:
+            try:
+                pipe, alt, stats = bench(name, backend, texts, args.repeats)
+                stats.update(parity(ref, alt))
+                del pipe
+            except Exception as e:               # e.g. optimum not installed
+                stats = {"error": str(e)}
+            report[name][backend] = stats
+        print(name, json.dumps(report[name], indent=2))
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Import-time profile of the agents package + startup budget check.
+
+Every target module is imported in a fresh interpreter with
+``python -X importtime`` and we report:
+  • total     – cumulative import time of the target (ms)
+  • top       – the slowest transitively imported modules
+  • heavy     – modules from HEAVY that got pulled in at import time
+                (torch, transformers, chromadb … must stay lazy)
+
+Budgets live in ``import_budget.json`` (ms per target).  ``--record``
+stores the profile next to it so later runs can be diffed against it;
+the exit code is 1 when a budget is blown or a heavy module leaks in.
+
+$ python bench_import_time.py
+$ python bench_import_time.py --record data/import_profile.json
+"""
+import argparse, json, re, subprocess, sys
+from pathlib import Path
+
+TARGETS = [
+    "agents.orchestration.orchestrator",
+    "agents.hf_cache",
+    "agents.warmup",
+    "backend.analysis_pipeline",
+]
+HEAVY = ("torch", "transformers", "argostranslate", "langdetect",
+         "chromadb", "langchain", "langchain_chroma", "langchain_community")
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _subtree(rows: list, module: str) -> list:
+    """Only the rows imported by ``module`` (drops interpreter start-up)."""
+    end = next((i for i, r in enumerate(rows) if r[0] == module and r[3]), None)
+    if end is None:
+        return [r[:3] for r in rows]
+    start = end
+    while start > 0 and not rows[start - 1][3]:
+        start -= 1
+    return [r[:3] for r in rows[start:end + 1]]
+
+
+def profile(module: str, runs: int = 3) -> dict:
+    """Best of ``runs`` cold imports (the OS file cache stays warm)."""
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                               f"import {module}"],
+                              capture_output=True, text=True)
+        rows = []
+        for line in proc.stderr.splitlines():
+            m = _LINE.match(line)
+            if m:
+                rows.append((m.group(4), int(m.group(1)), int(m.group(2)),
+                             len(m.group(3)) == 1))
+        rows = _subtree(rows, module)
+        total = next((cum for name, _, cum in rows if name == module), None)
+        res = {
+            "module": module,
+            "ok": proc.returncode == 0,
+            "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+            "total_ms": round(total / 1000, 1) if total is not None else None,
+            "top": [{"module": n, "cum_ms": round(c / 1000, 1)}
+                    for n, _, c in sorted(rows, key=lambda r: -r[2])
+                    if n != module][:10],
+            "heavy": sorted({n for n, _, _ in rows if n.split(".")[0] in HEAVY}),
+        }
+        if best is None or (res["total_ms"] or 1e9) < (best["total_ms"] or 1e9):
+            best = res
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("modules", nargs="*", default=TARGETS)
+    ap.add_argument("--budget", default="import_budget.json")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--record", help="write the profile to this JSON file")
+    args = ap.parse_args()
+
+    budget = {}
+    if Path(args.budget).exists():
+        budget = json.loads(Path(args.budget).read_text(encoding="utf-8"))
+
+    failed, report = False, []
+    for mod in args.modules:
+        res = profile(mod, args.runs)
+        limit = budget.get(mod, budget.get("default"))
+        res["budget_ms"] = limit
+        over = (res["total_ms"] is not None and limit is not None
+                and res["total_ms"] > limit)
+        failed |= over or bool(res["heavy"]) or not res["ok"]
+        report.append(res)
+
+        status = ("FAIL" if not res["ok"] else
+                  "OVER" if over else "HEAVY" if res["heavy"] else "ok")
+        print(f"{mod:40s} {res['total_ms']!s:>8} ms  budget {limit!s:>6}  {status}")
+        if res["error"]:
+            print(f"    {res['error']}")
+        for h in res["heavy"][:5]:
+            print(f"    heavy import: {h}")
+        for t in res["top"][:3]:
+            print(f"    {t['cum_ms']:8.1f} ms  {t['module']}")
+
+    if args.record:
+        Path(args.record).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.record).write_text(json.dumps(
+            {"python": sys.version.split()[0], "profiles": report}, indent=2),
+            encoding="utf-8")
+        print(f"Saved → {args.record}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
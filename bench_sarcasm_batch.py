@@ -0,0 +1,57 @@
+"""
+Micro-benchmark: per-line vs batched sarcasm inference.
+
+Times the old "one pipeline call per caregiver line" loop against a single
+batched call for growing transcript sizes and prints a latency table.
+
+$ python bench_sarcasm_batch.py --lines 1 5 15 30 60 120 --batch-size 8
+"""
+import argparse, statistics, time
+
+from agents.hf_cache import get_sarcasm_pipe
+
+SAMPLE_LINES = [
+    "Oh, perfect—because that’s exactly where priceless art belongs, right?",
+    "Absolutely, the Louvre is going to beg to borrow our wall now.",
+    "Let’s grab a damp cloth and make it a portable masterpiece instead.",
+    "Good job!",
+    "Time for bed, sweetheart, let's brush your teeth first.",
+    "Wow, thanks for spilling the juice all over the floor again.",
+]
+
+
+def _lines(n: int):
+    return [SAMPLE_LINES[i % len(SAMPLE_LINES)] for i in range(n)]
+
+
+def _time(fn, repeats: int) -> float:
+    runs = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs) * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, nargs="+", default=[1, 5, 15, 30, 60, 120])
+    ap.add_argument("--batch-size", type=int, default=8)
+    ap.add_argument("--repeats", type=int, default=3)
+    args = ap.parse_args()
+
+    pipe = get_sarcasm_pipe()
+    pipe(SAMPLE_LINES, top_k=None, batch_size=args.batch_size)      # warm-up
+
+    print(f"{'lines':>6} | {'per-line ms':>12} | {'batched ms':>11} | {'speed-up':>8}")
+    print("-" * 48)
+    for n in args.lines:
+        lines = _lines(n)
+        loop_ms  = _time(lambda: [pipe(l, top_k=None) for l in lines], args.repeats)
+        batch_ms = _time(lambda: pipe(lines, top_k=None,
+                                      batch_size=args.batch_size), args.repeats)
+        print(f"{n:>6} | {loop_ms:>12.1f} | {batch_ms:>11.1f} | {loop_ms / batch_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 # firebase/firebase_init.py
 import firebase_admin
-from firebase_admin import credentials, firestore, storage
+from firebase_admin import credentials, firestore, firestore_async, storage
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -18,4 +18,5 @@ if not firebase_admin._apps:
 
 # Firestore & Storage clients
 db = firestore.client()
+adb = firestore_async.client()      # AsyncClient – used by the async /analyze write path
 bucket = storage.bucket()
@@ -0,0 +1,111 @@
+"""
+Tiny stand-in for Ollama's OpenAI-compatible ``/v1/chat/completions``.
+
+Returns one canned JSON object that satisfies every LLM agent, after an
+optional delay, and can fail a share of requests with 503 so the client's
+retry/backoff path gets exercised.  Requests with ``"stream": true`` get an
+SSE stream of small deltas followed by trailing chatter, so early JSON
+termination is visible (the stub logs how many deltas went unsent).
+
+$ python ollama_stub_server.py --port 11435 --delay 0.2 --fail-rate 0.1 \
+        --token-delay 0.02
+$ OLLAMA_BASE_URL=http://127.0.0.1:11435/v1 python quick_cli.py
+"""
+import argparse, json, random, sys, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED = {
+    "caregiver_score": 8, "tone": 8, "empathy": 7, "responsiveness": 8,
+    "summary": "Stub summary.", "abuse_flag": False,
+    "justification": "Stub justification.",
+    "notify": False, "reason": "stub",
+    "send_notification": True,
+    "parent_notification": "Stub notification.",
+    "recommendations": [{"category": "General", "description": "Stub tip."}],
+}
+CHATTER = ("\n\nI hope this assessment helps! Let me know if you would like "
+           "a more detailed breakdown of each score.")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"          # keep-alive, like the real server
+    delay       = 0.0
+    fail_rate   = 0.0
+    token_delay = 0.0
+    requests    = 0
+
+    def log_message(self, *_):             # keep stdout quiet
+        pass
+
+    def _send(self, code: int, body: dict) -> None:
+        raw = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self):
+        length  = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        type(self).requests += 1
+
+        if not self.path.endswith("/chat/completions"):
+            return self._send(404, {"error": "not found"})
+        if random.random() < self.fail_rate:
+            return self._send(503, {"error": "stub overloaded"})
+
+        time.sleep(self.delay)
+        if payload.get("stream"):
+            return self._stream(json.dumps(CANNED) + CHATTER)
+        self._send(200, {
+            "id": f"stub-{self.requests}",
+            "object": "chat.completion",
+            "model": payload.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(CANNED)},
+            }],
+        })
+
+
+    def _stream(self, text: str, step: int = 8) -> None:
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        deltas = [text[i:i + step] for i in range(0, len(text), step)]
+        for n, delta in enumerate(deltas):
+            event = {"choices": [{"index": 0, "delta": {"content": delta}}]}
+            try:
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                print(f"client hung up – {len(deltas) - n} deltas unsent",
+                      file=sys.stderr)
+                return
+            time.sleep(self.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11435)
+    ap.add_argument("--delay", type=float, default=0.0, help="seconds per reply")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="share of 503s")
+    ap.add_argument("--token-delay", type=float, default=0.0,
+                    help="seconds between streamed deltas")
+    args = ap.parse_args()
+
+    StubHandler.delay, StubHandler.fail_rate = args.delay, args.fail_rate
+    StubHandler.token_delay = args.token_delay
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Ollama stub on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
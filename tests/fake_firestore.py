@@ -0,0 +1,494 @@
+# tests/fake_firestore.py
+"""
+In-memory stand-in for the google-cloud-firestore client.
+
+Covers the subset the backend uses – collections / documents /
+``collection_group``, ``set`` (incl. ``merge=True``), ``update`` with
+dotted paths, ``where`` / ``order_by`` / ``limit`` / ``stream``, write
+batches and the transforms
+``Increment``, ``Maximum``, ``Minimum``, ``ArrayUnion``, ``ArrayRemove``,
+``SERVER_TIMESTAMP`` and ``DELETE_FIELD``.  Transforms are recognised by
+class name, so the fake also runs where google-cloud-firestore is not
+installed.
+
+Range filters follow Firestore's typed ordering: ``timestamp >= <datetime>``
+never matches a string or null value – exactly why the legacy ISO-string
+timestamps need their own query.
+
+Transactions follow the surface ``google.cloud.firestore_v1.transactional``
+drives (``_begin`` / ``_commit`` / ``_rollback``), so production code runs
+unchanged: reads are tracked and the commit raises ``Aborted`` when one of
+them changed meanwhile (optimistic – the decorator retries).  Write
+preconditions (``client.write_option(last_update_time=…)``) raise
+``FailedPrecondition``, ``create`` on an existing doc ``AlreadyExists``.
+Update times are strictly increasing.
+
+``reads`` / ``writes`` count documents returned and written, so tests and
+reports can assert on cost:
+
+    from tests.fake_firestore import FakeFirestore
+    db = FakeFirestore()
+    compute_aggregates("u1", client=db);  db.reads
+"""
+from __future__ import annotations
+
+import copy, threading, time, uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:                                   # same exceptions as the real client
+    from google.api_core.exceptions import Aborted, AlreadyExists, FailedPrecondition, NotFound
+except ImportError:                    # pragma: no cover
+    class Aborted(Exception):
+        pass
+
+    class AlreadyExists(Exception):
+        pass
+
+    class FailedPrecondition(Exception):
+        pass
+
+    class NotFound(Exception):
+        pass
+
+_MISSING = object()
+
+
+# ─────────────────────────────────────────────── field helpers
+def _get_path(data: Dict[str, Any], path: str) -> Any:
+    cur: Any = data
+    for part in path.split("."):
+        if not isinstance(cur, dict) or part not in cur:
+            return _MISSING
+        cur = cur[part]
+    return cur
+
+
+def _set_path(data: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    cur = data
+    for part in parts[:-1]:
+        nxt = cur.get(part)
+        if not isinstance(nxt, dict):
+            nxt = cur[part] = {}
+        cur = nxt
+    cur[parts[-1]] = value
+
+
+def _del_path(data: Dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    cur = data
+    for part in parts[:-1]:
+        cur = cur.get(part)
+        if not isinstance(cur, dict):
+            return
+    cur.pop(parts[-1], None)
+
+
+def _kind(value: Any) -> str:
+    name = type(value).__name__
+    if name == "Sentinel":
+        desc = getattr(value, "description", "").lower()
+        return "delete" if "delete" in desc else "server_ts"
+    return name
+
+
+def _apply(data: Dict[str, Any], path: str, value: Any) -> None:
+    """Write one field, resolving Firestore transforms / sentinels."""
+    kind = _kind(value)
+    old  = _get_path(data, path)
+    if kind == "delete":
+        _del_path(data, path)
+    elif kind == "server_ts":
+        _set_path(data, path, datetime.now(timezone.utc))
+    elif kind == "Increment":
+        base = old if isinstance(old, (int, float)) and old is not _MISSING else 0
+        _set_path(data, path, base + value.value)
+    elif kind == "Maximum":
+        _set_path(data, path, value.value if not isinstance(old, (int, float))
+                  else max(old, value.value))
+    elif kind == "Minimum":
+        _set_path(data, path, value.value if not isinstance(old, (int, float))
+                  else min(old, value.value))
+    elif kind == "ArrayUnion":
+        arr = list(old) if isinstance(old, list) else []
+        arr += [v for v in value.values if v not in arr]
+        _set_path(data, path, arr)
+    elif kind == "ArrayRemove":
+        arr = list(old) if isinstance(old, list) else []
+        _set_path(data, path, [v for v in arr if v not in value.values])
+    else:
+        _set_path(data, path, copy.deepcopy(value))
+
+
+def _flatten(data: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    """Nested dict → (dotted path, leaf) pairs; transforms are leaves."""
+    for k, v in data.items():
+        path = f"{prefix}{k}"
+        if isinstance(v, dict) and v:
+            yield from _flatten(v, path + ".")
+        else:
+            yield path, v
+
+
+# ─────────────────────────────────────────────── comparisons
+def _family(v: Any) -> str:
+    if v is None:
+        return "null"
+    if isinstance(v, bool):
+        return "bool"
+    if isinstance(v, (int, float)):
+        return "number"
+    if isinstance(v, datetime):
+        return "timestamp"
+    return type(v).__name__
+
+
+def _norm(v: Any) -> Any:
+    if isinstance(v, datetime) and v.tzinfo is None:
+        return v.replace(tzinfo=timezone.utc)
+    return v
+
+
+def _match(value: Any, op: str, target: Any) -> bool:
+    if value is _MISSING:
+        return False
+    value, target = _norm(value), _norm(target)
+    if op == "==":
+        return _family(value) == _family(target) and value == target
+    if op == "!=":
+        return not (_family(value) == _family(target) and value == target)
+    if op == "in":
+        return any(_match(value, "==", t) for t in target)
+    if op == "not-in":
+        return not any(_match(value, "==", t) for t in target)
+    if op == "array_contains":
+        return isinstance(value, list) and target in value
+    if op == "array_contains_any":
+        return isinstance(value, list) and any(t in value for t in target)
+    if _family(value) != _family(target):          # typed range filters
+        return False
+    return {"<": value < target, "<=": value <= target,
+            ">": value > target, ">=": value >= target}[op]
+
+
+# ─────────────────────────────────────────────── snapshots / refs
+class FakeSnapshot:
+    def __init__(self, ref: "FakeDocRef", data: Optional[Dict[str, Any]],
+                 update_time: Optional[datetime] = None) -> None:
+        self.reference   = ref
+        self.id          = ref.id
+        self._data       = data
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field: str) -> Any:
+        v = _get_path(self._data or {}, field)
+        return None if v is _MISSING else copy.deepcopy(v)
+
+
+class FakeDocRef:
+    def __init__(self, db: "FakeFirestore", path: str) -> None:
+        self._db  = db
+        self.path = path
+        self.id   = path.rsplit("/", 1)[-1]
+
+    def collection(self, name: str) -> "FakeCollection":
+        return FakeCollection(self._db, f"{self.path}/{name}")
+
+    def get(self, transaction=None, **_) -> FakeSnapshot:
+        return self._db._read(self, transaction)
+
+    def set(self, data: Dict[str, Any], merge: bool = False) -> "FakeWriteResult":
+        return self._db._commit([("set", self, data, merge, None)])[0]
+
+    def update(self, data: Dict[str, Any], option=None) -> "FakeWriteResult":
+        return self._db._commit([("update", self, data, False, option)])[0]
+
+    def create(self, data: Dict[str, Any]) -> "FakeWriteResult":
+        return self._db._commit([("create", self, data, False, None)])[0]
+
+    def delete(self, option=None) -> None:
+        self._db._commit([("delete", self, None, False, option)])
+
+
+class FakeQuery:
+    def __init__(self, db: "FakeFirestore", parent: str,
+                 filters: Tuple = (), orders: Tuple = (),
+                 limit: Optional[int] = None, group: bool = False) -> None:
+        self._db      = db
+        self._parent  = parent          # collection path, or its id for a group query
+        self._filters = filters
+        self._orders  = orders
+        self._limit   = limit
+        self._group   = group
+
+    def _with(self, **kw: Any) -> "FakeQuery":
+        args = {"filters": self._filters, "orders": self._orders,
+                "limit": self._limit, "group": self._group, **kw}
+        return FakeQuery(self._db, self._parent, **args)
+
+    def where(self, field: Optional[str] = None, op: Optional[str] = None,
+              value: Any = None, *, filter=None) -> "FakeQuery":
+        if filter is not None:                       # FieldFilter(...)
+            field, op, value = filter.field_path, filter.op_string, filter.value
+        return self._with(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return self._with(orders=self._orders + ((field, str(direction)),))
+
+    def limit(self, n: int) -> "FakeQuery":
+        return self._with(limit=n)
+
+    def _in_scope(self, path: str) -> bool:
+        coll = path.rsplit("/", 1)[0]
+        return coll.rsplit("/", 1)[-1] == self._parent if self._group else coll == self._parent
+
+    def _run(self, transaction=None) -> List[FakeSnapshot]:
+        self._db._rtt()
+        with self._db._lock:
+            rows = [(path, data) for path, data in self._db._docs.items()
+                    if self._in_scope(path)]
+            rows = [(p, d) for p, d in rows
+                    if all(_match(_get_path(d, f), op, v) for f, op, v in self._filters)]
+            for field, direction in reversed(self._orders):
+                rows = [r for r in rows if _get_path(r[1], field) is not _MISSING]
+                rows.sort(key=lambda r: (_family(_get_path(r[1], field)),
+                                         _norm(_get_path(r[1], field))),
+                          reverse=direction.upper().endswith("DESCENDING"))
+            if self._limit is not None:
+                rows = rows[:self._limit]
+            self._db.reads += len(rows) or 1           # empty result bills 1 read
+            if transaction is not None:
+                for p, _ in rows:
+                    transaction._track(p)
+            return [FakeSnapshot(FakeDocRef(self._db, p), copy.deepcopy(d),
+                                 self._db._times.get(p)) for p, d in rows]
+
+    def stream(self, transaction=None) -> Iterator[FakeSnapshot]:
+        return iter(self._run(transaction))
+
+    def get(self, transaction=None) -> List[FakeSnapshot]:
+        return self._run(transaction)
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db: "FakeFirestore", path: str) -> None:
+        super().__init__(db, path)
+        self.path = path
+        self.id   = path.rsplit("/", 1)[-1]
+
+    def document(self, doc_id: Optional[str] = None) -> FakeDocRef:
+        return FakeDocRef(self._db, f"{self.path}/{doc_id or uuid.uuid4().hex[:20]}")
+
+    def list_documents(self) -> Iterator[FakeDocRef]:
+        """Direct children, incl. "missing" parents that only hold subcollections."""
+        prefix = self.path + "/"
+        with self._db._lock:
+            ids = {p[len(prefix):].split("/", 1)[0]
+                   for p in self._db._docs if p.startswith(prefix)}
+        return iter([self.document(i) for i in sorted(ids)])
+
+    def add(self, data: Dict[str, Any]) -> Tuple[datetime, FakeDocRef]:
+        ref = self.document()
+        return ref.set(data).update_time, ref
+
+
+class FakeWriteResult:
+    def __init__(self, update_time: Optional[datetime]) -> None:
+        self.update_time = update_time
+
+
+class _WriteOption:
+    def __init__(self, last_update_time: Optional[datetime] = None,
+                 exists: Optional[bool] = None) -> None:
+        self.last_update_time = last_update_time
+        self.exists           = exists
+
+
+class FakeWriteBatch:
+    def __init__(self, db: "FakeFirestore") -> None:
+        self._db  = db
+        self._ops: List[Tuple] = []
+
+    def set(self, ref: FakeDocRef, data: Dict[str, Any], merge: bool = False) -> None:
+        self._ops.append(("set", ref, data, merge, None))
+
+    def update(self, ref: FakeDocRef, data: Dict[str, Any], option=None) -> None:
+        self._ops.append(("update", ref, data, False, option))
+
+    def create(self, ref: FakeDocRef, data: Dict[str, Any]) -> None:
+        self._ops.append(("create", ref, data, False, None))
+
+    def delete(self, ref: FakeDocRef, option=None) -> None:
+        self._ops.append(("delete", ref, None, False, option))
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def commit(self) -> List[FakeWriteResult]:
+        if len(self._ops) > 500:
+            raise ValueError("a write batch holds at most 500 operations")
+        ops, self._ops = self._ops, []
+        return self._db._commit(ops)
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Optimistic transaction, driven by ``firestore_v1.transactional``."""
+
+    def __init__(self, db: "FakeFirestore", max_attempts: int = 5,
+                 read_only: bool = False) -> None:
+        super().__init__(db)
+        self._max_attempts = max_attempts
+        self._read_only    = read_only
+        self._id: Optional[bytes] = None
+        self._reads: Dict[str, Optional[datetime]] = {}
+        self.write_results: Optional[List[FakeWriteResult]] = None
+
+    @property
+    def in_progress(self) -> bool:
+        return self._id is not None
+
+    def get(self, ref_or_query) -> Iterator[FakeSnapshot]:
+        if isinstance(ref_or_query, FakeDocRef):
+            return iter([ref_or_query.get(transaction=self)])
+        return ref_or_query.stream(transaction=self)
+
+    def _track(self, path: str) -> None:
+        self._reads.setdefault(path, self._db._times.get(path))
+
+    # ---------------------------------------------------------------- driver
+    def _clean_up(self) -> None:
+        self._ops, self._reads, self._id = [], {}, None
+
+    def _begin(self, retry_id: Optional[bytes] = None) -> None:
+        if self.in_progress:
+            raise ValueError("transaction already in progress")
+        self._id = uuid.uuid4().bytes
+
+    def _rollback(self) -> None:
+        self._clean_up()
+
+    def _commit(self) -> List[FakeWriteResult]:
+        if not self.in_progress:
+            raise ValueError("no transaction in progress")
+        self._db._rtt()
+        with self._db._lock:
+            changed = [p for p, t in self._reads.items() if self._db._times.get(p) != t]
+            if changed:
+                self._clean_up()
+                raise Aborted(f"Transaction contention on {changed[0]}")
+            results = self._db._apply(self._ops)
+        self._clean_up()
+        self.write_results = results
+        return results
+
+
+# ─────────────────────────────────────────────── client
+class FakeFirestore:
+    """``latency_s`` sleeps before every read / commit (outside the lock) –
+    a stand-in for the network round trip that lets racing writers interleave."""
+
+    def __init__(self, latency_s: float = 0.0) -> None:
+        self.latency_s = latency_s
+        self._docs:  Dict[str, Dict[str, Any]] = {}
+        self._times: Dict[str, datetime] = {}
+        self._lock   = threading.RLock()
+        self._clock  = datetime.min.replace(tzinfo=timezone.utc)
+        self.reads   = 0
+        self.writes  = 0
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+    def collection_group(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name, group=True)
+
+    def document(self, path: str) -> FakeDocRef:
+        return FakeDocRef(self, path)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def transaction(self, max_attempts: int = 5, read_only: bool = False) -> FakeTransaction:
+        return FakeTransaction(self, max_attempts, read_only)
+
+    @staticmethod
+    def write_option(**kwargs) -> _WriteOption:
+        return _WriteOption(**kwargs)
+
+    def reset_counters(self) -> None:
+        self.reads = self.writes = 0
+
+    # ---------------------------------------------------------------- core
+    def _rtt(self) -> None:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def _read(self, ref: FakeDocRef, transaction=None) -> FakeSnapshot:
+        self._rtt()
+        with self._lock:
+            self.reads += 1
+            if transaction is not None:
+                transaction._track(ref.path)
+            data = self._docs.get(ref.path)
+            return FakeSnapshot(ref, copy.deepcopy(data), self._times.get(ref.path))
+
+    def _tick(self) -> datetime:
+        """Commit time – strictly increasing, so update_time works as a version."""
+        now = datetime.now(timezone.utc)
+        self._clock = now if now > self._clock else self._clock + timedelta(microseconds=1)
+        return self._clock
+
+    def _check(self, op: str, ref: FakeDocRef, option) -> None:
+        exists = ref.path in self._docs
+        if op == "update" and not exists:
+            raise NotFound(f"No document to update: {ref.path}")
+        if op == "create" and exists:
+            raise AlreadyExists(f"Document already exists: {ref.path}")
+        if option is None:
+            return
+        if option.exists is not None and option.exists != exists:
+            raise FailedPrecondition(f"exists={option.exists} failed for {ref.path}")
+        if (option.last_update_time is not None
+                and self._times.get(ref.path) != option.last_update_time):
+            raise FailedPrecondition(f"{ref.path} was modified since last_update_time")
+
+    def _commit(self, ops: List[Tuple]) -> List[FakeWriteResult]:
+        self._rtt()
+        return self._apply(ops)
+
+    def _apply(self, ops: List[Tuple]) -> List[FakeWriteResult]:
+        """Apply all ops atomically (validate first, then write)."""
+        with self._lock:
+            for op, ref, _, _, option in ops:
+                self._check(op, ref, option)
+            now = self._tick()
+            results = []
+            for op, ref, data, merge, _ in ops:
+                self.writes += 1
+                results.append(FakeWriteResult(now))
+                if op == "delete":
+                    self._docs.pop(ref.path, None)
+                    self._times.pop(ref.path, None)
+                    continue
+                if op in ("set", "create") and not merge:
+                    doc: Dict[str, Any] = {}
+                    fields = _flatten(data)
+                elif op == "set":                      # merge=True → nested
+                    doc = copy.deepcopy(self._docs.get(ref.path, {}))
+                    fields = _flatten(data)
+                else:                                  # update → dotted keys
+                    doc = copy.deepcopy(self._docs[ref.path])
+                    fields = data.items()
+                for path, value in fields:
+                    _apply(doc, path, value)
+                self._docs[ref.path]  = doc
+                self._times[ref.path] = now
+            return results
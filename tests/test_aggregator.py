@@ -0,0 +1,35 @@
+# tests/test_aggregator.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("google.cloud.firestore_v1")
+
+from backend import aggregator
+from backend.rollups import record_analysis
+from tests.fake_firestore import FakeFirestore
+
+# minutes ago → toxicity; every window edge has a doc just inside and outside
+AGES = {10: 0.1, 50: 0.2, 70: 0.9, 23 * 60: 0.3, 25 * 60: 0.8,
+        7 * 24 * 60 - 20: 0.4, 7 * 24 * 60 + 20: 0.7}
+
+
+@pytest.fixture
+def db():
+    db, now = FakeFirestore(), datetime.now(timezone.utc)
+    coll = db.collection("users").document("u1").collection("analysis_results")
+    for i, (mins, tox) in enumerate(AGES.items()):
+        ts  = now - timedelta(minutes=mins)
+        ctx = {"toxicity": tox, "sentiment_score": 0.5, "category_group": "Meals"}
+        coll.document(f"a{i}").set({**ctx, "timestamp": ts})
+        record_analysis("u1", ctx, ts, client=db)
+    return db
+
+
+def test_rollup_windows_match_the_scan(db):
+    rolled, scanned = (aggregator._aggregates_from_rollups("u1", db),
+                       aggregator._aggregates_from_scan("u1", db))
+    assert rolled == scanned
+    assert [rolled[w]["count"] for w in ("hourly", "daily", "weekly")] == [2, 4, 6]
+    assert rolled["hourly"]["toxicity"] == pytest.approx(0.2)         # _round → 1 decimal
+
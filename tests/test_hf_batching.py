@@ -0,0 +1,66 @@
+# tests/test_hf_batching.py
+import asyncio, threading, time
+
+import pytest
+
+from agents.hf_batching import MicroBatcher
+from agents.utterance_cache import UtteranceCache, normalize_utterance
+
+
+class _SlowPipe:
+    """Blocks until released; records what it was asked to score."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.calls   = []
+
+    def __call__(self, texts, **kwargs):
+        self.release.wait(5)
+        self.calls.append(list(texts))
+        return [len(t) for t in texts]
+
+
+def test_cancelled_job_does_not_strand_the_rest_of_its_group():
+    pipe = _SlowPipe()
+    mb   = MicroBatcher("toxicity", lambda: pipe, max_wait_ms=50)
+    a = mb.submit_future(["aa"])
+    b = mb.submit_future(["bbb"])
+    c = mb.submit_future(["c"])
+    assert b.cancel()                       # caller gave up before the batch ran
+    pipe.release.set()
+
+    assert a.result(timeout=5) == [2] and c.result(timeout=5) == [1]
+    assert pipe.calls == [["aa", "c"]]      # cancelled texts never reach the model
+
+
+def test_cancelled_submit_still_fills_the_cache(caplog):
+    pipe = _SlowPipe()
+    mb   = MicroBatcher("toxicity", lambda: pipe, max_wait_ms=1, cache=UtteranceCache(16))
+
+    async def scenario():
+        task = asyncio.ensure_future(mb.submit(["hello"]))
+        await asyncio.sleep(0.05)              # batch is running inside the pipe
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(scenario())
+    pipe.release.set()
+
+    # the running batch finishes, fills the cache and resolves nothing twice
+    key = "{}\x00" + normalize_utterance("hello")
+    deadline = time.monotonic() + 5
+    while mb.cache.get_many([key])[0] is None and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert mb.submit_sync(["hello"]) == [5]
+    assert pipe.calls == [["hello"]]
+    assert "InvalidStateError" not in caplog.text
+
+
+def test_cancel_before_the_batch_runs_skips_the_model():
+    pipe = _SlowPipe()
+    mb   = MicroBatcher("toxicity", lambda: pipe, max_wait_ms=50, cache=UtteranceCache(16))
+    fut  = mb.submit_future(["bye"])
+    assert fut.cancel()
+    pipe.release.set()
+    assert mb.submit_sync(["again"]) == [5]
+    assert pipe.calls == [["again"]]
@@ -0,0 +1,17 @@
+# tests/test_model_host.py
+import pytest
+
+from agents import model_host
+
+
+def test_authkey_is_required(monkeypatch):
+    monkeypatch.delenv("RAGOS_MODEL_HOST_AUTHKEY", raising=False)
+    with pytest.raises(RuntimeError):
+        model_host._authkey()
+    with pytest.raises(RuntimeError):                 # before binding the port
+        model_host.serve("127.0.0.1:0", warm=False)
+
+
+def test_authkey_from_env(monkeypatch):
+    monkeypatch.setenv("RAGOS_MODEL_HOST_AUTHKEY", "s3cret")
+    assert model_host._authkey() == b"s3cret"
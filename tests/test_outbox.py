@@ -0,0 +1,67 @@
+# tests/test_outbox.py
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("google.cloud.firestore_v1")
+
+from backend import outbox
+from backend.timeline import HeadCache, update_timeline
+from tests.fake_firestore import FakeFirestore
+
+TS  = datetime(2026, 3, 4, 10, 0, tzinfo=timezone.utc)
+CTX = {"category_group": "Meals", "primary_category": "Lunch", "sentiment_score": 0.5,
+       "toxicity": 0.1, "abuse_flag": False, "transcript": "[00:01] Caregiver: eat up"}
+
+
+def _store(db, result_id="r1"):
+    """What _persist_analysis commits: analysis doc + pending tasks, one batch."""
+    user  = db.collection("users").document("u1")
+    batch = db.batch()
+    batch.set(user.collection("analysis_results").document(result_id), {**CTX, "id": result_id})
+    outbox.add_pending(batch, "u1", result_id, ["timeline"], TS, client=db)
+    batch.commit()
+    return user
+
+
+def _pending(user):
+    return [s.id for s in user.collection("pending_tasks").stream()]
+
+
+def _card_counts(user):
+    return [c.to_dict()["metrics"]["count"] for c in user.collection("timeline").stream()]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_head_cache(monkeypatch):
+    from backend import timeline
+    monkeypatch.setattr(timeline, "_CACHE", HeadCache())
+
+
+def test_task_clears_its_pending_doc():
+    db   = FakeFirestore()
+    user = _store(db)
+    assert _pending(user) == ["r1_timeline"]
+    outbox.run_task("timeline", "u1", "r1", TS, ctx=dict(CTX), client=db)
+    assert _pending(user) == [] and _card_counts(user) == [1]
+
+
+def test_lost_task_is_claimed_and_replayed_from_the_analysis_doc():
+    db   = FakeFirestore()
+    user = _store(db)                                  # process died before the job ran
+    assert outbox.claim_stale(grace_s=3600, client=db) == []        # still in grace
+    (item,) = outbox.claim_stale(grace_s=0, client=db)
+    assert outbox.claim_stale(grace_s=1, client=db) == []           # claim reset "created"
+
+    outbox.run_task(item["task"], item["user_id"], item["result_id"], item["ts_server"],
+                    client=db)
+    assert _pending(user) == [] and _card_counts(user) == [1]
+
+
+def test_replay_after_the_job_already_ran_does_not_double_count():
+    db   = FakeFirestore()
+    user = _store(db)
+    update_timeline(user_id="u1", ctx=dict(CTX), result_id="r1", ts_server=TS, client=db)
+    # crashed before deleting the pending doc → replay
+    outbox.run_task("timeline", "u1", "r1", TS, client=db)
+    assert _card_counts(user) == [1] and _pending(user) == []
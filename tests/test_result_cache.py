@@ -0,0 +1,18 @@
+# tests/test_result_cache.py
+from agents.orchestration.result_cache import ResultCache, cache_from_env, cache_key
+
+
+def test_off_by_default(monkeypatch):
+    monkeypatch.delenv("RAGOS_RESULT_CACHE", raising=False)
+    assert cache_from_env() is None
+
+
+def test_transcript_text_is_not_stored(tmp_path):
+    path  = tmp_path / "cache.sqlite3"
+    cache = ResultCache(str(path))
+    key   = cache_key("[00:01] Child: secret", False, "v1")
+    cache.put(key, {"transcript": "[00:01] Child: secret", "toxicity": 0.2})
+
+    assert cache.get(key) == {"toxicity": 0.2}
+    assert not any(b"secret" in f.read_bytes() for f in tmp_path.iterdir())   # db + WAL
+    assert ResultCache(str(path)).get(key) == {"toxicity": 0.2}     # disk tier
@@ -0,0 +1,41 @@
+# tests/test_review_prompt.py
+import asyncio
+
+import pytest
+
+from agents.llm.review_prompt import as_bool, build_prompt, parse_review
+
+
+@pytest.mark.parametrize("v, want", [
+    (True, True), ("true", True), (" TRUE ", True),
+    (False, False), ("false", False), ("no", False), (1, False), (None, False),
+])
+def test_as_bool_is_strict(v, want):
+    assert as_bool(v) is want
+
+
+def test_parse_review_clamps_and_parses_flags():
+    out = parse_review({"caregiver_score": "12", "tone": 0.4, "empathy": "x",
+                        "abuse_flag": "false"})
+    assert (out["caregiver_score"], out["tone"], out["empathy"]) == (10, 1, 0)
+    assert out["abuse_flag"] is False
+
+
+def test_assessor_prompt_extends_the_review_prompt():
+    ctx = {"transcript": "[00:01] Caregiver: hi", "primary_category": "Meals"}
+    base = build_prompt(ctx)
+    ext  = build_prompt(ctx, extra_format=(("notify", "true/false"),))
+    assert ext.replace(',\n"notify": true/false', "") == base
+
+
+def test_assessor_string_false_does_not_notify(monkeypatch):
+    pytest.importorskip("httpx")
+    from agents.llm.assessor_agent import AssessorAgent
+
+    async def reply(self, prompt):
+        return {"caregiver_score": 7, "abuse_flag": "false", "notify": "false",
+                "reason": "calm"}
+    monkeypatch.setattr(AssessorAgent, "_aquery_ollama", reply)
+    out = asyncio.run(AssessorAgent().run({"transcript": ""}))
+    assert out["notify"] is False and out["abuse_flag"] is False
+    assert out["caregiver_score"] == 7
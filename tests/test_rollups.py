@@ -0,0 +1,59 @@
+# tests/test_rollups.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("google.cloud.firestore_v1")
+
+from backend.rollups import bucket_id, combine, means, read_buckets, record_analysis, rollup_ref
+from tests.fake_firestore import FakeFirestore
+
+TS = datetime(2026, 3, 4, 10, 15, tzinfo=timezone.utc)
+
+
+def test_increment_and_maximum_merge_into_one_bucket():
+    db = FakeFirestore()
+    record_analysis("u1", {"toxicity": 0.2, "sentiment_score": 0.5,
+                           "category_group": "Meals"}, TS, client=db)
+    record_analysis("u1", {"toxicity": 0.7, "sentiment_score": -0.1, "sarcasm": "n/a",
+                           "category_group": "Sleep"}, TS + timedelta(minutes=30), client=db)
+
+    b = rollup_ref("u1", TS, db).get().to_dict()
+    assert b["bucket_start"] == datetime(2026, 3, 4, 10, tzinfo=timezone.utc)
+    assert b["count"] == 2
+    assert b["sums"]["toxicity"] == pytest.approx(0.9)
+    assert b["sums"]["sentiment_score"] == pytest.approx(0.4)
+    assert b["counts"] == {"toxicity": 2, "sentiment_score": 2}     # "n/a" not numeric
+    assert b["max"]["toxicity"] == 0.7
+    assert b["groups"] == {"Meals": 1, "Sleep": 1}
+
+    daily = rollup_ref("u1", TS, db, "daily").get().to_dict()
+    assert daily["count"] == 2 and bucket_id(TS, "daily") == "20260304"
+
+
+def test_read_buckets_is_one_read_per_bucket():
+    db = FakeFirestore()
+    for h in range(5):
+        for _ in range(3):
+            record_analysis("u1", {"toxicity": 0.1}, TS + timedelta(hours=h), client=db)
+    db.reset_counters()
+    end = datetime(2026, 3, 4, 14, tzinfo=timezone.utc)           # exclusive bucket start
+    got = read_buckets("u1", TS + timedelta(hours=1), end, client=db)
+    assert len(got) == 3 and db.reads == 3
+
+
+def test_combine_and_means():
+    total = combine([
+        {"count": 2, "sums": {"toxicity": 0.9}, "counts": {"toxicity": 2},
+         "max": {"toxicity": 0.7}, "groups": {"Meals": 2}},
+        {"count": 1, "sums": {"toxicity": 0.3, "tone": 8.0},
+         "counts": {"toxicity": 1, "tone": 1},
+         "max": {"toxicity": 0.3, "tone": 8.0}, "groups": {"Meals": 1}},
+    ])
+    assert total["count"] == 3
+    assert total["max"] == {"toxicity": 0.7, "tone": 8.0}
+    assert dict(total["groups"]) == {"Meals": 3}
+    m = means(total)
+    assert m["toxicity"] == pytest.approx(0.4)
+    assert m["tone"] == 8.0
+    assert m["empathy"] == 0.0                     # no samples → 0, not a ZeroDivisionError
@@ -0,0 +1,71 @@
+# tests/test_session.py
+import asyncio
+from types import SimpleNamespace
+
+from agents.orchestration.session import LiveSession, Triggers
+
+
+class _Agent:
+    def __init__(self, key, score):
+        self.key, self.score = key, score
+
+    async def run_parsed(self, tr):
+        return {self.key: [self.score] * len(tr.utterances)}
+
+
+class _Orch:
+    """Scores every line ``tox``; counts categorizer + LLM-stage runs."""
+
+    def __init__(self, tox=0.1):
+        self.analyzer_agent = _Agent("sentiment_scores", 0.2)
+        self.tox_agent      = _Agent("toxicity_scores", tox)
+        self.sarcasm_agent  = _Agent("sarcasm_scores", 0.0)
+        self.categorizer_agent = SimpleNamespace(run_parsed=self._categorize)
+        self.llm_calls = 0
+
+    def _detect_and_translate(self, text):
+        return {"transcript": text}
+
+    async def _categorize(self, tr):
+        return {"primary_category": "Meals"}
+
+    async def run_llm_stages(self, ctx):
+        self.llm_calls += 1
+        ctx["caregiver_score"] = 4
+
+
+def _session(orch):
+    return LiveSession("s1", "u1", orch, Triggers(toxicity=0.7))
+
+
+def test_empty_session_ends_without_llm_run():
+    orch = _Orch()
+    assert asyncio.run(_session(orch).end()) == {}
+    assert orch.llm_calls == 0
+
+
+def test_end_reuses_a_run_that_saw_every_line():
+    orch = _Orch(tox=0.9)                       # every line is a toxicity spike
+    sess = _session(orch)
+
+    async def go():
+        snap = await sess.add("[00:01] Caregiver: stop that")
+        assert snap["trigger"] == "toxicity_spike"
+        return await sess.end()
+
+    ctx = asyncio.run(go())
+    assert orch.llm_calls == 1
+    assert ctx["transcript"] == "[00:01] Caregiver: stop that"
+    assert ctx["caregiver_score"] == 4 and "trigger" not in ctx
+
+
+def test_end_runs_llm_for_lines_after_the_last_trigger():
+    orch = _Orch()
+    sess = _session(orch)
+
+    async def go():
+        await sess.add("[00:01] Child: hi")
+        return await sess.end()
+
+    assert asyncio.run(go())["primary_category"] == "Meals"
+    assert orch.llm_calls == 1
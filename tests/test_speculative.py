@@ -0,0 +1,52 @@
+# tests/test_speculative.py
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from agents.orchestration import speculative
+from agents.orchestration.speculative import Draft, SpeculativeNotifier
+
+
+@pytest.fixture(autouse=True)
+def _fresh_stats(monkeypatch):
+    monkeypatch.setattr(speculative, "_STATS",
+                        {"launched": 0, "used": 0, "wasted": 0, "saved_ms_sum": 0.0})
+
+
+def test_timed_out_draft_counts_as_wasted():
+    async def scenario():
+        draft = Draft(asyncio.sleep(1.0))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(draft.use(), 0.01)
+    asyncio.run(scenario())
+    s = speculative.speculation_stats()
+    assert (s["used"], s["wasted"]) == (0, 1)
+
+
+def test_used_draft():
+    async def scenario():
+        async def answer():
+            return {"parent_notification": "hi"}
+        return await Draft(answer()).use()
+    assert asyncio.run(scenario()) == {"parent_notification": "hi"}
+    assert speculative.speculation_stats()["used"] == 1
+
+
+def test_draft_serialises_like_the_main_path(monkeypatch):
+    pytest.importorskip("httpx")
+    from agents.llm.response_generator_agent import ResponseGeneratorAgent
+
+    seen = []
+    async def run(self, messages):
+        seen.append(messages)
+        return {}
+    monkeypatch.setattr(ResponseGeneratorAgent, "run", run)
+    agent = ResponseGeneratorAgent()
+    ctx   = {"toxicity": 0.9, "timestamp": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+
+    async def scenario():
+        draft = SpeculativeNotifier(agent, enabled=True).maybe_start(ctx)
+        await draft.task
+    asyncio.run(scenario())
+    assert seen[0] == agent.messages({**ctx, "send_notification": True})
@@ -0,0 +1,65 @@
+# tests/test_timeline.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("google.cloud.firestore_v1")
+
+from backend import timeline
+from backend.timeline import HeadCache, card_view, update_timeline
+from tests.fake_firestore import FakeFirestore
+from tests.timeline_stress import run
+
+TS = datetime(2026, 3, 4, 12, 0, tzinfo=timezone.utc)
+
+
+def _ctx(s: float, tox: float, group: str = "Meals") -> dict:
+    return {"category_group": group, "primary_category": "Lunch", "sentiment_score": s,
+            "toxicity": tox, "abuse_flag": False, "transcript": "[00:01] Caregiver: eat up"}
+
+
+def _cards(db):
+    return [c.to_dict() for c in
+            db.collection("users").document("u1").collection("timeline").stream()]
+
+
+# ─────────────────────────────────────────────── concurrency (stress harness)
+@pytest.mark.parametrize("scenario", ["burst", "mixed"])
+def test_concurrent_writers_keep_every_invariant(scenario):
+    report = run(scenario, users=3, workers=8, per_worker=15, processes=2,
+                 retry_rate=0.25, latency_ms=0.5, seed=11)
+    assert report["ok"], report["errors"]
+    assert report["paths"]["duplicate"] > 0                 # redeliveries were exercised
+    if scenario == "burst":
+        assert set(report["cards"].values()) == {1}
+
+
+# ─────────────────────────────────────────────── idempotency markers
+@pytest.mark.parametrize("warm_cache", [True, False], ids=["fast-path", "transaction"])
+def test_late_redelivery_is_not_applied_twice(warm_cache):
+    db, cache = FakeFirestore(), HeadCache()
+    for i, (s, tox) in enumerate([(0.5, 0.1), (-0.5, 0.8), (0.25, 0.2)]):
+        update_timeline(user_id="u1", ctx=_ctx(s, tox), result_id=f"r{i}",
+                        ts_server=TS + timedelta(minutes=i), client=db, cache=cache)
+    if not warm_cache:
+        cache = HeadCache()
+    # r0 again, after r1/r2 – head.last_result_id no longer catches it
+    update_timeline(user_id="u1", ctx=_ctx(0.5, 0.1), result_id="r0",
+                    ts_server=TS, client=db, cache=cache)
+
+    (card,) = _cards(db)
+    assert card["metrics"]["count"] == 3
+    assert card["metrics"]["sentiment_sum"] == pytest.approx(0.25)
+    assert card["metrics"]["max_toxicity"] == 0.8
+    assert sorted(card["result_ids"]) == ["r0", "r1", "r2"]
+    assert card_view(card)["metrics"]["avg_sentiment"] == pytest.approx(0.25 / 3)
+
+
+def test_warm_cache_merge_needs_no_read():
+    db, cache = FakeFirestore(), HeadCache()
+    update_timeline(user_id="u1", ctx=_ctx(0.5, 0.1), result_id="r0",
+                    ts_server=TS, client=db, cache=cache)
+    db.reset_counters()
+    update_timeline(user_id="u1", ctx=_ctx(0.1, 0.1), result_id="r1",
+                    ts_server=TS + timedelta(minutes=5), client=db, cache=cache)
+    assert db.reads == 0 and _cards(db)[0]["metrics"]["count"] == 2
@@ -0,0 +1,60 @@
+# tests/test_timestamp_backfill.py
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("google.cloud.firestore_v1")
+
+from backend import rollups, timestamp_backfill
+from backend.timestamp_backfill import backfill, read_report
+from tests.fake_firestore import FakeFirestore
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+@pytest.fixture
+def db():
+    db   = FakeFirestore()
+    coll = db.collection("users").document("u1").collection("analysis_results")
+    for i in range(7):                                   # legacy: naive ISO strings
+        coll.document(f"legacy{i}").set(
+            {"timestamp": (NOW - timedelta(hours=i)).replace(tzinfo=None).isoformat(),
+             "toxicity": 0.1 * i})
+    for i in range(3):
+        coll.document(f"native{i}").set({"timestamp": NOW - timedelta(minutes=i)})
+    coll.document("broken").set({"timestamp": "not-a-date"})
+    return db
+
+
+def _doc(db, doc_id):
+    return (db.collection("users").document("u1").collection("analysis_results")
+              .document(doc_id).get().to_dict())
+
+
+def test_converts_strings_and_keeps_the_original(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(timestamp_backfill, "PAGE_SIZE", 3)      # several pages
+    ckpt  = tmp_path / "ckpt.json"
+    stats = backfill("u1", str(ckpt), db)
+
+    assert (stats["converted"], stats["unparseable"]) == (7, 1)
+    d = _doc(db, "legacy2")
+    assert d["timestamp"] == NOW - timedelta(hours=2)             # naive → UTC
+    assert d["timestamp_legacy"] == (NOW - timedelta(hours=2)).replace(tzinfo=None).isoformat()
+    assert _doc(db, "broken")["timestamp"] == "not-a-date"
+    assert json.loads(ckpt.read_text())["users_done"] == ["u1"]
+
+    # legacy query now only sees the unparseable doc
+    assert read_report("u1", client=db)["legacy_scan_reads"] == 1
+    assert backfill("u1", None, db)["converted"] == 0             # re-run is a no-op
+
+
+def test_dry_run_writes_nothing(db):
+    assert backfill("u1", None, db, dry_run=True)["converted"] == 7
+    assert isinstance(_doc(db, "legacy0")["timestamp"], str)
+
+
+@pytest.mark.parametrize("legacy_scan, counted", [(True, 10), (False, 3)])
+def test_rebuild_honours_the_legacy_flag(db, monkeypatch, legacy_scan, counted):
+    monkeypatch.setattr(rollups, "LEGACY_TS_SCAN", legacy_scan)
+    assert rollups.rebuild("u1", days=1, client=db)["analyses"] == counted
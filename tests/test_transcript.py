@@ -0,0 +1,24 @@
+# tests/test_transcript.py
+from agents.analysis.transcript import ParsedTranscript
+
+
+def test_speaker_is_the_line_prefix_only():
+    tr = ParsedTranscript.parse("[00:01] Caregiver: Child: stop that now!\n"
+                                "[00:02] Child: no")
+    assert [u.speaker for u in tr.utterances] == ["Caregiver", "Child"]
+    assert tr.caregiver_lines() == ["Child: stop that now!"]
+    assert tr.child_lines() == ["no"]
+
+
+def test_tag_inside_narration_is_not_a_speaker():
+    tr = ParsedTranscript.parse("Later the Child: cried\n(15:01) Mum: hush")
+    assert tr.speaker_lines() == ["hush"]
+    assert tr.utterances[0].timestamp == "15:01"
+
+
+def test_long_timestamps_and_offsets():
+    raw = "intro\n[1:02:33] Dad: ok\n"
+    tr  = ParsedTranscript.parse(raw)
+    u   = tr.utterances[0]
+    assert (u.speaker, u.timestamp, u.text) == ("Dad", "1:02:33", "ok")
+    assert raw[u.offset:].startswith("[1:02:33]")
@@ -0,0 +1,35 @@
+# tests/test_warmup.py
+import pytest
+
+from agents import hf_cache, warmup
+
+
+@pytest.fixture(autouse=True)
+def _fresh(monkeypatch):
+    monkeypatch.setattr(warmup, "_status", {})
+    monkeypatch.delenv("RAGOS_MODEL_HOST", raising=False)
+    hf_cache.get_sarcasm_pipe.cache_clear()
+    yield
+    hf_cache.get_sarcasm_pipe.cache_clear()
+
+
+def test_sarcasm_fallback_is_degraded_not_ready(monkeypatch):
+    def broken(*_a, **_kw):
+        raise OSError("weights not found")
+    monkeypatch.setattr(hf_cache, "build_pipe", broken)
+
+    warmup._warm_pipeline("sarcasm")
+    status = warmup.readiness()
+    assert status["models"]["sarcasm"]["state"] == "degraded"
+    assert "weights not found" in status["models"]["sarcasm"]["error"]
+    assert status["ready"] is False
+
+
+def test_real_pipeline_is_ready(monkeypatch):
+    monkeypatch.setattr(hf_cache, "build_pipe",
+                        lambda *_a, **_kw: lambda texts, **_: [[{"label": "irony", "score": 0.1}]
+                                                               for _ in texts])
+    warmup._warm_pipeline("sarcasm")
+    assert warmup.readiness() == {"ready": True, "models": {
+        "sarcasm": {"state": "ready", "error": None,
+                    "load_s": warmup._status["sarcasm"]["load_s"]}}}
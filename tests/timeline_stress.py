@@ -0,0 +1,166 @@
+# tests/timeline_stress.py
+"""
+Concurrency stress for ``update_timeline`` on the in-memory Firestore fake.
+
+Worker threads push analyses for a few users at the same time.  Each
+worker belongs to one of ``--processes`` simulated API processes (own
+``HeadCache``), so cached heads go stale and both write paths race.
+About ``--retry-rate`` of the analyses are delivered twice, as a work-queue
+retry would.  The fake sleeps ``--latency-ms`` per read / commit so the
+writers actually interleave.
+
+Scenarios
+  burst – one group, all inside the merge window → exactly ONE card per
+          user holding every analysis
+  mixed – random visible groups → totals, sums and max per card must match
+          the analyses the card references
+
+Invariants (per user): Σ card counts == distinct analyses, every result id
+in exactly one card, card count == len(result_ids), sentiment_sum and
+max_toxicity match those results, head points at a card holding
+head.last_result_id, every analysis has an ``applied_<id>`` marker naming
+its card.
+
+tests/test_timeline.py runs both scenarios under pytest; the CLI is for
+bigger manual runs:
+
+$ python -m tests.timeline_stress --users 4 --workers 16 --per-worker 40 --processes 3
+"""
+from __future__ import annotations
+
+import argparse, json, random, sys, threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from tests.fake_firestore import FakeFirestore
+from backend import timeline
+from backend.timeline import HeadCache, update_timeline
+
+GROUPS = {"Meals": "Lunch", "Sleep": "Nap", "Hygiene": "Bath",
+          "Health": "Fever", "Safety": "Running Off"}
+
+
+def _analyses(scenario: str, users: List[str], n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    base = datetime.now(timezone.utc)
+    out = []
+    for i in range(n):
+        group = "Meals" if scenario == "burst" else rng.choice(list(GROUPS))
+        # burst: every ts inside the 30-min Meals window; mixed: ~3 min apart
+        offset = rng.uniform(0, 600) if scenario == "burst" else i * 180 + rng.uniform(0, 60)
+        out.append({
+            "user_id": rng.choice(users),
+            "result_id": f"r{i:05d}",
+            "ts": base + timedelta(seconds=offset),
+            "ctx": {
+                "category_group": group, "primary_category": GROUPS[group],
+                "sentiment_score": round(rng.uniform(-1, 1), 3),
+                "toxicity": round(rng.random(), 3),
+                "abuse_flag": rng.random() < 0.05, "summary": f"analysis {i}",
+                "transcript": f"[00:0{i % 10}] Caregiver: line {i}",
+            },
+        })
+    return out
+
+
+def _check(db: FakeFirestore, user_id: str, sent: Dict[str, Dict[str, Any]],
+           scenario: str) -> List[str]:
+    user  = db.collection("users").document(user_id)
+    cards = [(s.id, s.to_dict()) for s in user.collection("timeline").stream()]
+    head  = user.collection("timeline_meta").document("head").get().to_dict()
+    errs: List[str] = []
+
+    seen: Dict[str, str] = {}
+    for cid, c in cards:
+        m, rids = c["metrics"], c["result_ids"]
+        if m["count"] != len(rids):
+            errs.append(f"{cid}: count {m['count']} != {len(rids)} result ids")
+        for r in rids:
+            if r in seen:
+                errs.append(f"{r} in two cards ({seen[r]}, {cid})")
+            seen[r] = cid
+        rows = [sent[r]["ctx"] for r in rids if r in sent]
+        if rows and abs(m["sentiment_sum"] - sum(x["sentiment_score"] for x in rows)) > 1e-6:
+            errs.append(f"{cid}: sentiment_sum drift")
+        if rows and abs(m["max_toxicity"] - max(x["toxicity"] for x in rows)) > 1e-9:
+            errs.append(f"{cid}: max_toxicity wrong")
+    if sum(c["metrics"]["count"] for _, c in cards) != len(sent):
+        errs.append(f"Σ counts {sum(c['metrics']['count'] for _, c in cards)} != {len(sent)}")
+    if set(seen) != set(sent):
+        errs.append(f"{len(set(sent) - set(seen))} analyses missing from cards")
+    if scenario == "burst" and len(cards) != 1:
+        errs.append(f"burst produced {len(cards)} cards (expected 1)")
+    if sent and (head is None or head["last_result_id"] not in
+                 dict(cards).get(head["card_id"], {}).get("result_ids", [])):
+        errs.append("head does not point at the card holding last_result_id")
+    meta = user.collection("timeline_meta")
+    for r in sent:                                  # idempotency marker per analysis
+        marker = meta.document(f"applied_{r}").get()
+        if not marker.exists or marker.get("card_id") != seen.get(r):
+            errs.append(f"{r}: marker missing or names the wrong card")
+    return errs
+
+
+def run(scenario: str, users: int = 3, workers: int = 12, per_worker: int = 30,
+        processes: int = 2, retry_rate: float = 0.1, latency_ms: float = 1.0,
+        seed: int = 7) -> Dict[str, Any]:
+    rng   = random.Random(seed)
+    db    = FakeFirestore(latency_s=latency_ms / 1000.0)
+    uids  = [f"user{u}" for u in range(users)]
+    jobs  = _analyses(scenario, uids, workers * per_worker, rng)
+    jobs += [j for j in jobs if rng.random() < retry_rate]          # duplicate deliveries
+    rng.shuffle(jobs)
+    caches = [HeadCache() for _ in range(processes)]
+    with timeline._stats_lock:
+        for k in timeline._STATS:
+            timeline._STATS[k] = 0
+
+    barrier = threading.Barrier(workers)
+    def worker(w: int) -> None:
+        cache = caches[w % processes]
+        barrier.wait()                                              # start together
+        for j in jobs[w::workers]:
+            update_timeline(user_id=j["user_id"], ctx=j["ctx"], result_id=j["result_id"],
+                            ts_server=j["ts"], client=db, cache=cache)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, range(workers)))
+
+    sent: Dict[str, Dict[str, Dict[str, Any]]] = {u: {} for u in uids}
+    for j in jobs:
+        sent[j["user_id"]][j["result_id"]] = j
+    errors = {u: _check(db, u, sent[u], scenario) for u in uids}
+    stats = timeline.timeline_stats()
+    calls = len(jobs)
+    return {
+        "scenario": scenario, "calls": calls,
+        "distinct_analyses": sum(len(v) for v in sent.values()),
+        "cards": {u: len(list(db.collection("users").document(u)
+                                .collection("timeline").stream())) for u in uids},
+        "paths": stats,
+        "reads_per_call": round(db.reads / calls, 2),
+        "ok": not any(errors.values()),
+        "errors": {u: e[:5] for u, e in errors.items() if e},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=3)
+    ap.add_argument("--workers", type=int, default=12)
+    ap.add_argument("--per-worker", type=int, default=30)
+    ap.add_argument("--processes", type=int, default=2)
+    ap.add_argument("--retry-rate", type=float, default=0.1)
+    ap.add_argument("--latency-ms", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    reports = [run(s, args.users, args.workers, args.per_worker, args.processes,
+                   args.retry_rate, args.latency_ms, args.seed)
+               for s in ("burst", "mixed")]
+    print(json.dumps(reports, indent=2))
+    sys.exit(0 if all(r["ok"] for r in reports) else 1)
+
+
+if __name__ == "__main__":
+    main()